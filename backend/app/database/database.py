@@ -23,6 +23,15 @@ def to_naive_utc(dt: Optional[datetime]) -> Optional[datetime]:
         return dt.astimezone(timezone.utc).replace(tzinfo=None)
     return dt
 
+
+def dialect_insert(table):
+    if database.url.dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(table)
+
+
 base_ormar_config = OrmarConfig(
     metadata=metadata,
     database=database,
@@ -30,6 +39,15 @@ base_ormar_config = OrmarConfig(
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    from app.utils.attempt_timer import attempt_timer
+    from app.utils.quiz_closer import quiz_closer
+    from app.utils.counters import counter_reconciler
+    from app.utils.images import shutdown_pool
+    from app.utils.uploads import blob_collector
+    from app.utils.registrations import registration_approver
+
+    jobs = [attempt_timer, quiz_closer, counter_reconciler, blob_collector, registration_approver]
+
     async_engine = create_async_engine(settings.database_url)
     async with async_engine.begin() as conn:
         # await conn.run_sync(metadata.drop_all)
@@ -38,7 +56,16 @@ async def lifespan(app: FastAPI):
     if not database.is_connected:
         await database.connect()
 
+    if settings.background_jobs_enabled:
+        for job in jobs:
+            job.start()
+
     yield
 
+    for job in jobs:
+        await job.stop()
+
+    shutdown_pool()
+
     if database.is_connected:
         await database.disconnect()
@@ -1,4 +1,4 @@
-from ormar import Model, Integer, Float, ForeignKey, DateTime, Text, Boolean, String
+from ormar import Model, Integer, Float, ForeignKey, DateTime, Text, Boolean, String, LargeBinary, UniqueColumns
 from app.database.database import base_ormar_config, utc_now
 from datetime import datetime
 from enum import Enum
@@ -25,20 +25,26 @@ class QuizAttempt(Model):
     started_at: datetime = DateTime(default=utc_now)
     completed_at: datetime = DateTime(nullable=True)
     time_spent: int = Integer(nullable=True)
+    last_answered_at: datetime = DateTime(nullable=True)
     is_completed: bool = Boolean(default=False)
     status: str = String(max_length=20, default="opened")
-    questions_order: str = Text(nullable=True)
+    # packed int32 question ids, see app.utils.packed_ids
+    questions_order: bytes = LargeBinary(max_length=65536, nullable=True)
     needs_manual_grading: bool = Boolean(default=False)
     created_at: datetime = DateTime(default=utc_now)
 
 
 class Answer(Model):
-    ormar_config = base_ormar_config.copy(tablename="answers")
+    ormar_config = base_ormar_config.copy(
+        tablename="answers",
+        constraints=[UniqueColumns("attempt", "question")],
+    )
 
     id: int = Integer(primary_key=True)
     attempt: QuizAttempt = ForeignKey(QuizAttempt, related_name="answers")
     question: Question = ForeignKey(Question)
-    selected_options: str = Text()
+    # packed int32 option ids
+    selected_options: bytes = LargeBinary(max_length=65536)
     text_answer: str = Text(nullable=True)
     is_correct: bool = Boolean(default=False)
     points_earned: float = Float(default=0.0)
@@ -54,4 +60,57 @@ class AntiCheatingEvent(Model):
     attempt: QuizAttempt = ForeignKey(QuizAttempt, related_name="anti_cheating_events")
     event_type: str = String(max_length=30)
     details: str = Text(nullable=True)
-    created_at: datetime = DateTime(default=utc_now)
\ No newline at end of file
+    created_at: datetime = DateTime(default=utc_now)
+
+
+# Reissued attempts kept for the record. quiz, student, attempt_id and
+# question are plain columns so the history outlives the rows they
+# pointed at; SQLite may hand a deleted attempt's id to a new one, so
+# archived rows get ids of their own.
+
+
+class ArchivedAttempt(Model):
+    ormar_config = base_ormar_config.copy(tablename="attempts_archive")
+
+    id: int = Integer(primary_key=True)
+    attempt_id: int = Integer(index=True)
+    quiz: int = Integer(index=True)
+    student: int = Integer(index=True)
+    score: float = Float(default=0.0)
+    max_score: float = Float()
+    started_at: datetime = DateTime(nullable=True)
+    completed_at: datetime = DateTime(nullable=True)
+    time_spent: int = Integer(nullable=True)
+    last_answered_at: datetime = DateTime(nullable=True)
+    is_completed: bool = Boolean(default=False)
+    status: str = String(max_length=20, nullable=True)
+    questions_order: bytes = LargeBinary(max_length=65536, nullable=True)
+    needs_manual_grading: bool = Boolean(default=False)
+    created_at: datetime = DateTime(nullable=True)
+    archived_at: datetime = DateTime(default=utc_now)
+    archived_by: int = Integer(nullable=True)
+
+
+class ArchivedAnswer(Model):
+    ormar_config = base_ormar_config.copy(tablename="answers_archive")
+
+    id: int = Integer(primary_key=True)
+    attempt: ArchivedAttempt = ForeignKey(ArchivedAttempt, related_name="answers")
+    question: int = Integer()
+    selected_options: bytes = LargeBinary(max_length=65536)
+    text_answer: str = Text(nullable=True)
+    is_correct: bool = Boolean(default=False)
+    points_earned: float = Float(default=0.0)
+    manually_graded: bool = Boolean(default=False)
+    time_spent: int = Integer(nullable=True)
+    answered_at: datetime = DateTime(nullable=True)
+
+
+class ArchivedAntiCheatingEvent(Model):
+    ormar_config = base_ormar_config.copy(tablename="anti_cheating_events_archive")
+
+    id: int = Integer(primary_key=True)
+    attempt: ArchivedAttempt = ForeignKey(ArchivedAttempt, related_name="anti_cheating_events")
+    event_type: str = String(max_length=30)
+    details: str = Text(nullable=True)
+    created_at: datetime = DateTime(nullable=True)
@@ -0,0 +1,18 @@
+from ormar import Model, Integer, String, DateTime
+from app.database.database import base_ormar_config, utc_now
+from datetime import datetime
+
+
+# Uploaded files stored once per content, keyed by the SHA-256 of their
+# bytes. A blob is referenced by every Question.image_url and
+# User.avatar_url holding its URL; app.utils.uploads collects the rest.
+
+
+class Blob(Model):
+    ormar_config = base_ormar_config.copy(tablename="blobs")
+
+    digest: str = String(max_length=64, primary_key=True)
+    extension: str = String(max_length=8)
+    size: int = Integer()
+    # last upload of this content; younger blobs may not be referenced yet
+    touched_at: datetime = DateTime(default=utc_now, index=True, nullable=False)
@@ -1,4 +1,4 @@
-from ormar import Model, Integer, String, ForeignKey, DateTime
+from ormar import Model, Integer, String, ForeignKey, DateTime, UniqueColumns
 from app.database.database import base_ormar_config, utc_now
 from datetime import datetime
 from app.database.models.user import User
@@ -13,14 +13,28 @@ class Group(Model):
     code: str = String(max_length=6, unique=True, index=True)
     color: str = String(max_length=7, nullable=True, default="#6366f1")
     teacher: User = ForeignKey(User, related_name="groups")
+    member_count: int = Integer(default=0, server_default="0")
     created_at: datetime = DateTime(default=utc_now)
     updated_at: datetime = DateTime(default=utc_now)
 
 
 class GroupMember(Model):
-    ormar_config = base_ormar_config.copy(tablename="members")
+    ormar_config = base_ormar_config.copy(
+        tablename="members",
+        constraints=[UniqueColumns("group", "user")],
+    )
 
     id: int = Integer(primary_key=True)
     group: Group = ForeignKey(Group, related_name="members")
     user: User = ForeignKey(User, related_name="group_memberships")
-    joined_at: datetime = DateTime(default=utc_now)
\ No newline at end of file
+    joined_at: datetime = DateTime(default=utc_now)
+
+
+# Unused join codes in random order; create_group claims the lowest position.
+
+
+class GroupCode(Model):
+    ormar_config = base_ormar_config.copy(tablename="group_codes")
+
+    position: int = Integer(primary_key=True, autoincrement=False)
+    code: str = String(max_length=6, unique=True)
\ No newline at end of file
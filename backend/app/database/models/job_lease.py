@@ -0,0 +1,11 @@
+from ormar import Model, String, DateTime
+from app.database.database import base_ormar_config
+from datetime import datetime
+
+
+class JobLease(Model):
+    ormar_config = base_ormar_config.copy(tablename="job_leases")
+
+    name: str = String(max_length=100, primary_key=True)
+    owner: str = String(max_length=255)
+    expires_at: datetime = DateTime()
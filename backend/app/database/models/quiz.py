@@ -1,4 +1,5 @@
-from ormar import Model, Integer, String, Text, Boolean, ForeignKey, DateTime, Float
+import sqlalchemy
+from ormar import Model, Integer, String, Text, Boolean, ForeignKey, DateTime, Float, IndexColumns
 from app.database.database import base_ormar_config, utc_now
 from datetime import datetime
 from enum import Enum
@@ -32,7 +33,13 @@ class QuestionDisplayMode(str, Enum):
 
 
 class Quiz(Model):
-    ormar_config = base_ormar_config.copy(tablename="quizzes")
+    ormar_config = base_ormar_config.copy(
+        tablename="quizzes",
+        constraints=[
+            IndexColumns("group", "is_expired"),
+            IndexColumns("is_expired", "available_until"),
+        ],
+    )
 
     id: int = Integer(primary_key=True)
     title: str = String(max_length=255)
@@ -47,6 +54,8 @@ class Quiz(Model):
     is_active: bool = Boolean(default=True)
     available_until: datetime = DateTime(nullable=True)
     manual_close: bool = Boolean(default=False) 
+    is_expired: bool = Boolean(default=False, server_default=sqlalchemy.false())
+    question_count: int = Integer(default=0, server_default="0")
     allow_show_answers: bool = Boolean(default=True) 
     show_results: bool = Boolean(default=True) 
     question_display_mode: str = String(max_length=20, default="all_on_page")
@@ -67,7 +76,9 @@ class Question(Model):
     order: int = Integer()
     points: float = Float(default=1.0)
     correct_text_answer: str = Text(nullable=True)
-    image_url: str = String(max_length=512, nullable=True)
+    image_url: str = String(max_length=512, nullable=True, index=True)
+    # resized, metadata-free copy of image_url for display
+    image_display_url: str = String(max_length=512, nullable=True)
     created_at: datetime = DateTime(default=utc_now)
     updated_at: datetime = DateTime(default=utc_now)
 
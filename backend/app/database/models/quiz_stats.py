@@ -0,0 +1,45 @@
+from ormar import Model, Integer, Float, DateTime, UniqueColumns
+from app.database.database import base_ormar_config, utc_now
+from datetime import datetime
+
+
+# Materialized aggregates over completed attempts. Rows are keyed by plain ids
+# rather than foreign keys: they are a cache that is dropped and rebuilt, and
+# must never block deleting a quiz or question.
+
+
+class QuizStats(Model):
+    ormar_config = base_ormar_config.copy(tablename="quiz_stats")
+
+    quiz_id: int = Integer(primary_key=True, autoincrement=False)
+    attempt_count: int = Integer(default=0)
+    percentage_sum: float = Float(default=0.0)
+    percentage_sq_sum: float = Float(default=0.0)
+    time_spent_sum: int = Integer(default=0)
+    time_spent_count: int = Integer(default=0)
+    updated_at: datetime = DateTime(default=utc_now)
+
+
+class QuizScoreBucket(Model):
+    ormar_config = base_ormar_config.copy(
+        tablename="quiz_score_buckets",
+        constraints=[UniqueColumns("quiz_id", "bucket")],
+    )
+
+    id: int = Integer(primary_key=True)
+    quiz_id: int = Integer()
+    bucket: int = Integer()
+    count: int = Integer(default=0)
+
+
+class QuestionStats(Model):
+    ormar_config = base_ormar_config.copy(
+        tablename="question_stats",
+        constraints=[UniqueColumns("quiz_id", "question_id")],
+    )
+
+    id: int = Integer(primary_key=True)
+    quiz_id: int = Integer()
+    question_id: int = Integer()
+    answered_count: int = Integer(default=0)
+    correct_count: int = Integer(default=0)
@@ -30,3 +30,32 @@ class RegistrationRequest(Model):
     reviewed_by: User = ForeignKey(User, nullable=True, related_name="reviewed_requests")
     reviewed_at: datetime = DateTime(nullable=True)
     created_at: datetime = DateTime(default=utc_now)
+
+
+class ApprovalRunStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class RegistrationApprovalRun(Model):
+    """A background "approve all" over the pending queue, with its progress."""
+
+    ormar_config = base_ormar_config.copy(tablename="reg_approval_runs")
+
+    id: int = Integer(primary_key=True)
+    role: str = String(max_length=20)
+    requested_by: int = Integer(nullable=True)
+    status: str = String(max_length=20, default=ApprovalRunStatus.QUEUED.value)
+    total: int = Integer(default=0)
+    processed: int = Integer(default=0)
+    approved: int = Integer(default=0)
+    skipped: int = Integer(default=0)
+    # keyset position: requests up to this id have been looked at
+    last_request_id: int = Integer(default=0)
+    # highest pending id when the run was queued; later requests are left alone
+    until_request_id: int = Integer(default=0)
+    error: str = String(max_length=1000, nullable=True)
+    created_at: datetime = DateTime(default=utc_now)
+    finished_at: datetime = DateTime(nullable=True)
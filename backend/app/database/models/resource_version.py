@@ -0,0 +1,13 @@
+from ormar import Model, Integer, String
+from app.database.database import base_ormar_config
+
+
+# Monotonic change counters for HTTP revalidation, keyed like "quiz:12".
+# A missing row reads as version 0.
+
+
+class ResourceVersion(Model):
+    ormar_config = base_ormar_config.copy(tablename="resource_versions")
+
+    key: str = String(max_length=100, primary_key=True)
+    version: int = Integer(default=0)
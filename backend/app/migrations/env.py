@@ -7,17 +7,23 @@ from alembic import context
 from config import settings
 
 from app.database.models.user import User
-from app.database.models.attempt import QuizAttempt, Answer
-from app.database.models.group import Group, GroupMember
+from app.database.models.attempt import (
+    QuizAttempt, Answer, ArchivedAttempt, ArchivedAnswer, ArchivedAntiCheatingEvent,
+)
+from app.database.models.group import Group, GroupMember, GroupCode
 from app.database.models.quiz import Quiz, Question, Option
 from app.database.models.registration_code import RegistrationCode
-from app.database.models.registration_request import RegistrationRequest
+from app.database.models.registration_request import RegistrationRequest, RegistrationApprovalRun
 from app.database.models.contact_message import ContactMessage
 from app.database.models.blog_post import BlogPost
 from app.database.models.system_setting import SystemSetting
 from app.database.database import base_ormar_config
 from app.database.models.system_setting import SystemSetting
 from app.database.models.audit_log import AuditLog
+from app.database.models.job_lease import JobLease
+from app.database.models.quiz_stats import QuizStats, QuizScoreBucket, QuestionStats
+from app.database.models.resource_version import ResourceVersion
+from app.database.models.blob import Blob
 
 config = context.config
 
@@ -0,0 +1,33 @@
+"""resource versions
+
+Revision ID: 0a7d3e6c9b21
+Revises: f5b2c8d41e07
+Create Date: 2026-10-19 17:12:40.281655
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0a7d3e6c9b21'
+down_revision: Union[str, Sequence[str], None] = 'f5b2c8d41e07'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'resource_versions',
+        sa.Column('key', sa.String(length=100), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=True),
+        sa.PrimaryKeyConstraint('key'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('resource_versions')
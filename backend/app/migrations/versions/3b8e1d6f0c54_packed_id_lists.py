@@ -0,0 +1,82 @@
+"""packed id lists
+
+Revision ID: 3b8e1d6f0c54
+Revises: 0a7d3e6c9b21
+Create Date: 2026-10-19 18:40:03.551872
+
+"""
+import json
+import struct
+from typing import Callable, Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b8e1d6f0c54'
+down_revision: Union[str, Sequence[str], None] = '0a7d3e6c9b21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+BATCH_SIZE = 5000
+
+# (table, column, nullable)
+COLUMNS = [
+    ('attempts', 'questions_order', True),
+    ('answers', 'selected_options', False),
+]
+
+
+def _from_json(value):
+    # little-endian int32 per id, as app.utils.packed_ids writes them
+    try:
+        ids = [int(v) for v in json.loads(value)]
+        return struct.pack(f'<{len(ids)}i', *ids)
+    except (TypeError, ValueError, struct.error):
+        return b''
+
+
+def _to_json(value):
+    value = bytes(value or b'')
+    return json.dumps(list(struct.unpack(f'<{len(value) // 4}i', value)))
+
+
+def _convert(table: str, column: str, new_type, nullable: bool, convert: Callable) -> None:
+    """Rewrite column into a new_type column through convert, in id order batches."""
+    tmp = f'{column}_new'
+    op.add_column(table, sa.Column(tmp, new_type, nullable=True))
+
+    conn = op.get_bind()
+    select = sa.text(
+        f'SELECT id, {column} FROM {table} WHERE id > :last ORDER BY id LIMIT :limit'
+    )
+    update = sa.text(f'UPDATE {table} SET {tmp} = :value WHERE id = :id')
+    last = 0
+    while True:
+        rows = conn.execute(select, {'last': last, 'limit': BATCH_SIZE}).fetchall()
+        if not rows:
+            break
+        params = [
+            {'id': row[0], 'value': None if row[1] is None and nullable else convert(row[1])}
+            for row in rows
+        ]
+        conn.execute(update, params)
+        last = rows[-1][0]
+
+    with op.batch_alter_table(table) as batch:
+        batch.drop_column(column)
+        batch.alter_column(tmp, new_column_name=column, existing_type=new_type, nullable=nullable)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table, column, nullable in COLUMNS:
+        _convert(table, column, sa.LargeBinary(length=65536), nullable, _from_json)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table, column, nullable in COLUMNS:
+        _convert(table, column, sa.Text(), nullable, _to_json)
@@ -0,0 +1,35 @@
+"""group code pool
+
+Revision ID: 3f9a6d2b8e41
+Revises: c7b3f18e2d65
+Create Date: 2026-10-19 22:03:17.448190
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f9a6d2b8e41'
+down_revision: Union[str, Sequence[str], None] = 'c7b3f18e2d65'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # filled on first use by app.utils.group_codes.refill_group_codes
+    op.create_table(
+        'group_codes',
+        sa.Column('position', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('code', sa.String(length=6), nullable=False),
+        sa.PrimaryKeyConstraint('position'),
+        sa.UniqueConstraint('code'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('group_codes')
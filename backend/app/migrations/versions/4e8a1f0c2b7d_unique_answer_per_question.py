@@ -0,0 +1,49 @@
+"""unique answer per question
+
+Revision ID: 4e8a1f0c2b7d
+Revises: 35c71bcea035
+Create Date: 2026-10-19 09:12:41.218305
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4e8a1f0c2b7d'
+down_revision: Union[str, Sequence[str], None] = '35c71bcea035'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # recompute scores inflated by duplicate answers, keeping the first answer per question
+    op.execute(
+        """
+        UPDATE attempts SET score = COALESCE((
+            SELECT SUM(a.points_earned) FROM answers a
+            WHERE a.attempt = attempts.id
+              AND a.id IN (SELECT MIN(id) FROM answers GROUP BY attempt, question)
+        ), 0)
+        WHERE id IN (
+            SELECT attempt FROM answers GROUP BY attempt, question HAVING COUNT(*) > 1
+        )
+        """
+    )
+    op.execute(
+        """
+        DELETE FROM answers
+        WHERE id NOT IN (SELECT MIN(id) FROM answers GROUP BY attempt, question)
+        """
+    )
+    with op.batch_alter_table('answers') as batch:
+        batch.create_unique_constraint('uc_answers_attempt_question', ['attempt', 'question'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('answers') as batch:
+        batch.drop_constraint('uc_answers_attempt_question', type_='unique')
@@ -0,0 +1,30 @@
+"""image derivatives
+
+Revision ID: 5d0e9a3c7f18
+Revises: 3b8e1d6f0c54
+Create Date: 2026-10-19 19:22:47.104381
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d0e9a3c7f18'
+down_revision: Union[str, Sequence[str], None] = '3b8e1d6f0c54'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('questions', sa.Column('image_display_url', sa.String(length=512), nullable=True))
+    op.add_column('users', sa.Column('avatar_thumb_url', sa.String(length=512), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('users', 'avatar_thumb_url')
+    op.drop_column('questions', 'image_display_url')
@@ -0,0 +1,87 @@
+"""attempt archive
+
+Revision ID: 6b2e8d4f1a07
+Revises: 3f9a6d2b8e41
+Create Date: 2026-10-19 22:41:09.305527
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6b2e8d4f1a07'
+down_revision: Union[str, Sequence[str], None] = '3f9a6d2b8e41'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'attempts_archive',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('attempt_id', sa.Integer(), nullable=False),
+        sa.Column('quiz', sa.Integer(), nullable=False),
+        sa.Column('student', sa.Integer(), nullable=False),
+        sa.Column('score', sa.Float(), nullable=True),
+        sa.Column('max_score', sa.Float(), nullable=False),
+        sa.Column('started_at', sa.DateTime(), nullable=True),
+        sa.Column('completed_at', sa.DateTime(), nullable=True),
+        sa.Column('time_spent', sa.Integer(), nullable=True),
+        sa.Column('last_answered_at', sa.DateTime(), nullable=True),
+        sa.Column('is_completed', sa.Boolean(), nullable=True),
+        sa.Column('status', sa.String(length=20), nullable=True),
+        sa.Column('questions_order', sa.LargeBinary(), nullable=True),
+        sa.Column('needs_manual_grading', sa.Boolean(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('archived_at', sa.DateTime(), nullable=True),
+        sa.Column('archived_by', sa.Integer(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_attempts_archive_attempt_id', 'attempts_archive', ['attempt_id'])
+    op.create_index('ix_attempts_archive_quiz', 'attempts_archive', ['quiz'])
+    op.create_index('ix_attempts_archive_student', 'attempts_archive', ['student'])
+    op.create_table(
+        'answers_archive',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('attempt', sa.Integer(), nullable=True),
+        sa.Column('question', sa.Integer(), nullable=False),
+        sa.Column('selected_options', sa.LargeBinary(), nullable=False),
+        sa.Column('text_answer', sa.Text(), nullable=True),
+        sa.Column('is_correct', sa.Boolean(), nullable=True),
+        sa.Column('points_earned', sa.Float(), nullable=True),
+        sa.Column('manually_graded', sa.Boolean(), nullable=True),
+        sa.Column('time_spent', sa.Integer(), nullable=True),
+        sa.Column('answered_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(
+            ['attempt'], ['attempts_archive.id'],
+            name='fk_answers_archive_attempts_archive_id_attempt',
+        ),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_table(
+        'anti_cheating_events_archive',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('attempt', sa.Integer(), nullable=True),
+        sa.Column('event_type', sa.String(length=30), nullable=False),
+        sa.Column('details', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(
+            ['attempt'], ['attempts_archive.id'],
+            name='fk_anti_cheating_events_archive_attempts_archive_id_attempt',
+        ),
+        sa.PrimaryKeyConstraint('id'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('anti_cheating_events_archive')
+    op.drop_table('answers_archive')
+    op.drop_index('ix_attempts_archive_student', table_name='attempts_archive')
+    op.drop_index('ix_attempts_archive_quiz', table_name='attempts_archive')
+    op.drop_index('ix_attempts_archive_attempt_id', table_name='attempts_archive')
+    op.drop_table('attempts_archive')
@@ -0,0 +1,35 @@
+"""attempt last answered at
+
+Revision ID: 7c3d9e5a1f42
+Revises: 4e8a1f0c2b7d
+Create Date: 2026-10-19 10:03:17.540912
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c3d9e5a1f42'
+down_revision: Union[str, Sequence[str], None] = '4e8a1f0c2b7d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('attempts', sa.Column('last_answered_at', sa.DateTime(), nullable=True))
+    op.execute(
+        """
+        UPDATE attempts SET last_answered_at = (
+            SELECT MAX(answered_at) FROM answers WHERE answers.attempt = attempts.id
+        )
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('attempts', 'last_answered_at')
@@ -0,0 +1,42 @@
+"""blob store
+
+Revision ID: 8c4f2a6e1b93
+Revises: 5d0e9a3c7f18
+Create Date: 2026-10-19 20:05:31.640217
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c4f2a6e1b93'
+down_revision: Union[str, Sequence[str], None] = '5d0e9a3c7f18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'blobs',
+        sa.Column('digest', sa.String(length=64), nullable=False),
+        sa.Column('extension', sa.String(length=8), nullable=False),
+        sa.Column('size', sa.Integer(), nullable=False),
+        sa.Column('touched_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('digest'),
+    )
+    op.create_index('ix_blobs_touched_at', 'blobs', ['touched_at'])
+    # the collector looks blobs up by URL in both columns
+    op.create_index('ix_questions_image_url', 'questions', ['image_url'])
+    op.create_index('ix_users_avatar_url', 'users', ['avatar_url'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_users_avatar_url', table_name='users')
+    op.drop_index('ix_questions_image_url', table_name='questions')
+    op.drop_index('ix_blobs_touched_at', table_name='blobs')
+    op.drop_table('blobs')
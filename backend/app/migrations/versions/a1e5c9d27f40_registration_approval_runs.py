@@ -0,0 +1,44 @@
+"""registration approval runs
+
+Revision ID: a1e5c9d27f40
+Revises: 8c4f2a6e1b93
+Create Date: 2026-10-19 20:48:12.377094
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a1e5c9d27f40'
+down_revision: Union[str, Sequence[str], None] = '8c4f2a6e1b93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'reg_approval_runs',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('role', sa.String(length=20), nullable=False),
+        sa.Column('requested_by', sa.Integer(), nullable=True),
+        sa.Column('status', sa.String(length=20), nullable=True),
+        sa.Column('total', sa.Integer(), nullable=True),
+        sa.Column('processed', sa.Integer(), nullable=True),
+        sa.Column('approved', sa.Integer(), nullable=True),
+        sa.Column('skipped', sa.Integer(), nullable=True),
+        sa.Column('last_request_id', sa.Integer(), nullable=True),
+        sa.Column('until_request_id', sa.Integer(), nullable=True),
+        sa.Column('error', sa.String(length=1000), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('reg_approval_runs')
@@ -0,0 +1,44 @@
+"""unique group members
+
+Revision ID: c7b3f18e2d65
+Revises: a1e5c9d27f40
+Create Date: 2026-10-19 21:14:56.902311
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7b3f18e2d65'
+down_revision: Union[str, Sequence[str], None] = 'a1e5c9d27f40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # concurrent joins could add the same membership twice; keep the first
+    op.execute(
+        """
+        DELETE FROM members
+        WHERE id NOT IN (SELECT MIN(id) FROM members GROUP BY "group", "user")
+        """
+    )
+    op.execute(
+        """
+        UPDATE groups SET member_count = (
+            SELECT COUNT(*) FROM members WHERE members."group" = groups.id
+        )
+        """
+    )
+    with op.batch_alter_table('members') as batch:
+        batch.create_unique_constraint('uc_members_group_user', ['group', 'user'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('members') as batch:
+        batch.drop_constraint('uc_members_group_user', type_='unique')
@@ -0,0 +1,38 @@
+"""quiz is expired
+
+Revision ID: d1a6e3b84c57
+Revises: b5f0c7e2d913
+Create Date: 2026-10-19 12:41:08.377215
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd1a6e3b84c57'
+down_revision: Union[str, Sequence[str], None] = 'b5f0c7e2d913'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # quizzes already past available_until are picked up by the closer on its first run
+    op.add_column(
+        'quizzes',
+        sa.Column('is_expired', sa.Boolean(), nullable=True, server_default=sa.false()),
+    )
+    op.create_index('ix_quizzes_group_is_expired', 'quizzes', ['group', 'is_expired'])
+    op.create_index(
+        'ix_quizzes_is_expired_available_until', 'quizzes', ['is_expired', 'available_until']
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_quizzes_is_expired_available_until', table_name='quizzes')
+    op.drop_index('ix_quizzes_group_is_expired', table_name='quizzes')
+    op.drop_column('quizzes', 'is_expired')
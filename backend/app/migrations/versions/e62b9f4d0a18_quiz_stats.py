@@ -0,0 +1,60 @@
+"""quiz stats
+
+Revision ID: e62b9f4d0a18
+Revises: d1a6e3b84c57
+Create Date: 2026-10-19 14:22:51.904173
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e62b9f4d0a18'
+down_revision: Union[str, Sequence[str], None] = 'd1a6e3b84c57'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # tables start empty; stats are built per quiz on first read
+    op.create_table(
+        'quiz_stats',
+        sa.Column('quiz_id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('attempt_count', sa.Integer(), nullable=True),
+        sa.Column('percentage_sum', sa.Float(), nullable=True),
+        sa.Column('percentage_sq_sum', sa.Float(), nullable=True),
+        sa.Column('time_spent_sum', sa.Integer(), nullable=True),
+        sa.Column('time_spent_count', sa.Integer(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('quiz_id'),
+    )
+    op.create_table(
+        'quiz_score_buckets',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('quiz_id', sa.Integer(), nullable=False),
+        sa.Column('bucket', sa.Integer(), nullable=False),
+        sa.Column('count', sa.Integer(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('quiz_id', 'bucket', name='uc_quiz_score_buckets_quiz_id_bucket'),
+    )
+    op.create_table(
+        'question_stats',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('quiz_id', sa.Integer(), nullable=False),
+        sa.Column('question_id', sa.Integer(), nullable=False),
+        sa.Column('answered_count', sa.Integer(), nullable=True),
+        sa.Column('correct_count', sa.Integer(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('quiz_id', 'question_id', name='uc_question_stats_quiz_id_question_id'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('question_stats')
+    op.drop_table('quiz_score_buckets')
+    op.drop_table('quiz_stats')
@@ -0,0 +1,44 @@
+"""counter columns
+
+Revision ID: f5b2c8d41e07
+Revises: e62b9f4d0a18
+Create Date: 2026-10-19 16:05:12.417390
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f5b2c8d41e07'
+down_revision: Union[str, Sequence[str], None] = 'e62b9f4d0a18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        'groups',
+        sa.Column('member_count', sa.Integer(), nullable=True, server_default='0'),
+    )
+    op.add_column(
+        'quizzes',
+        sa.Column('question_count', sa.Integer(), nullable=True, server_default='0'),
+    )
+    op.execute(
+        'UPDATE groups SET member_count = '
+        '(SELECT COUNT(*) FROM members WHERE members."group" = groups.id)'
+    )
+    op.execute(
+        'UPDATE quizzes SET question_count = '
+        '(SELECT COUNT(*) FROM questions WHERE questions.quiz = quizzes.id)'
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('quizzes', 'question_count')
+    op.drop_column('groups', 'member_count')
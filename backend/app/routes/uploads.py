@@ -0,0 +1,82 @@
+import os
+import re
+import stat
+from email.utils import parsedate_to_datetime
+from mimetypes import guess_type
+from typing import Dict
+
+from fastapi import APIRouter, HTTPException, Request, Response, status
+from fastapi.responses import FileResponse
+from starlette.concurrency import run_in_threadpool
+
+from app.utils.http_cache import etag_matches
+from app.utils.uploads import UPLOADS_DIR
+from config import settings
+
+router = APIRouter(prefix="/uploads", tags=["Uploads"])
+
+# Every stored name is unique to its content: <sha256><ext> in the blob
+# store, <id>_<uuid12><ext> for older uploads, plus .<size><ext> for
+# derivatives. Such URLs can be cached for good.
+VERSIONED_NAME = re.compile(r"^(?:[0-9a-f]{64}|\d+_[0-9a-f]{12})(?:\.\d+)?\.[a-z0-9]+$")
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "public, no-cache"
+
+
+def _not_found() -> HTTPException:
+    return HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="File not found")
+
+
+def _not_modified(request: Request, etag: str, stat_result: os.stat_result) -> bool:
+    if request.headers.get("if-none-match") is not None:
+        return etag_matches(request, etag)
+    since = request.headers.get("if-modified-since")
+    if not since:
+        return False
+    try:
+        return int(stat_result.st_mtime) <= parsedate_to_datetime(since).timestamp()
+    except (TypeError, ValueError):
+        return False
+
+
+@router.api_route("/{file_path:path}", methods=["GET", "HEAD"], include_in_schema=False)
+async def serve_upload(file_path: str, request: Request):
+    """Serve a stored upload with validators, ranges and long-lived caching.
+
+    The bytes go out through FileResponse, which handles Range/If-Range and
+    hands the path to the server (ASGI pathsend) where it supports that. With
+    upload_accel_redirect set, only headers are sent and the front proxy
+    serves the file from its internal location, e.g. for nginx:
+
+        location /_uploads/ { internal; alias /srv/backend/static/uploads/; }
+    """
+    parts = file_path.split("/")
+    # no traversal and no hidden files (uploads still being written)
+    if not file_path or any(not part or part.startswith(".") for part in parts):
+        raise _not_found()
+    path = UPLOADS_DIR.joinpath(*parts)
+    try:
+        stat_result = await run_in_threadpool(os.stat, path)
+    except (OSError, ValueError):
+        # ValueError: a name with an embedded null byte
+        raise _not_found()
+    if not stat.S_ISREG(stat_result.st_mode):
+        raise _not_found()
+
+    headers: Dict[str, str] = {
+        "Cache-Control": IMMUTABLE_CACHE_CONTROL if VERSIONED_NAME.match(parts[-1])
+        else REVALIDATE_CACHE_CONTROL,
+        "X-Content-Type-Options": "nosniff",
+    }
+    media_type = guess_type(parts[-1])[0] or "application/octet-stream"
+
+    if settings.upload_accel_redirect:
+        headers["X-Accel-Redirect"] = settings.upload_accel_redirect.rstrip("/") + "/" + "/".join(parts)
+        return Response(status_code=status.HTTP_200_OK, media_type=media_type, headers=headers)
+
+    response = FileResponse(path, stat_result=stat_result, media_type=media_type, headers=headers)
+    if _not_modified(request, response.headers["etag"], stat_result):
+        for name in ("etag", "last-modified"):
+            headers[name] = response.headers[name]
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return response
@@ -1,19 +1,20 @@
-import os
-from pathlib import Path
-
 from fastapi import APIRouter, Depends, HTTPException, status, Request
 from typing import List
+import sqlalchemy
 from schemas import (
     AdminInitRequest, UserResponse, RegistrationRequestResponse,
     ReviewRegistrationRequest, AdminUpdateUserRequest, GroupResponse,
-    AdminSettingsResponse, AdminSettingsUpdate, AdminStatsResponse, AuditLogResponse
+    AdminSettingsResponse, AdminSettingsUpdate, AdminStatsResponse, AuditLogResponse,
+    BulkApprovalResponse, ApprovalRunResponse
 )
 from app.database.models.user import User, UserRole
 from app.database.models.audit_log import AuditLog
 from app.database.models.group import Group, GroupMember
 from app.database.models.quiz import Quiz, Question, Option
 from app.database.models.attempt import QuizAttempt, Answer, AntiCheatingEvent
-from app.database.models.registration_request import RegistrationRequest, RegistrationStatus
+from app.database.models.registration_request import (
+    RegistrationRequest, RegistrationStatus, RegistrationApprovalRun
+)
 from app.database.models.registration_code import RegistrationCode
 from app.database.models.blog_post import BlogPost
 from app.database.models.contact_message import ContactMessage
@@ -21,11 +22,18 @@ from app.database.models.system_setting import SystemSetting
 from app.utils.auth import get_password_hash, get_current_admin, get_current_developer
 from app.database.database import utc_now
 from app.utils.audit import log_audit
+from app.utils.quiz_stats import invalidate_quiz_stats
+from app.utils.counters import recount_members
+from app.utils.registrations import approve_pending, start_approval_run
+from app.utils.http_cache import bump_versions, quiz_key, user_key, BLOG_KEY, SETTINGS_KEY
+from app.utils.rows import Record, fetch_records, count_rows, paginate, icontains
+from app.utils.serialization import trusted_json
+from app.utils.uploads import UPLOADS_DIR, remove_upload, blob_collector
 from config import settings
 
 router = APIRouter(prefix="/admin", tags=["Admin"])
 
-UPLOADS_AVATARS_DIR = Path(__file__).resolve().parent.parent.parent.parent / "static" / "uploads" / "avatars"
+UPLOADS_AVATARS_DIR = UPLOADS_DIR / "avatars"
 
 
 @router.get("/can-initialize", response_model=bool)
@@ -159,6 +167,7 @@ async def update_settings(
         await _set_json_setting("home_banner_text", payload["home_banner_text"] or {})
     if "home_banner_style" in payload:
         await _set_str_setting("home_banner_style", payload["home_banner_style"] or "warning")
+    await bump_versions(SETTINGS_KEY)
     auto_reg = await _get_bool_setting("auto_registration_enabled", False)
     reg_enabled = await _get_bool_setting("registration_enabled", True)
     maintenance = await _get_bool_setting("maintenance_mode", False)
@@ -218,6 +227,10 @@ async def get_admin_stats(current_admin: User = Depends(get_current_admin)):
     )
 
 
+class _AuditLogRow(Record):
+    __slots__ = tuple(AuditLogResponse.model_fields)
+
+
 @router.get("/audit-logs", response_model=dict)
 async def get_audit_logs(
     page: int = 1,
@@ -229,33 +242,36 @@ async def get_audit_logs(
     search_field: str = None,
     current_admin: User = Depends(get_current_admin)
 ):
-    query = AuditLog.objects
+    table = AuditLog.ormar_config.table
+    query = sqlalchemy.select(*_AuditLogRow.columns(table))
     if action:
-        query = query.filter(action=action)
+        query = query.where(table.c.action == action)
     if resource_type:
-        query = query.filter(resource_type=resource_type)
+        query = query.where(table.c.resource_type == resource_type)
     if user_id is not None:
-        query = query.filter(user_id=user_id)
+        query = query.where(table.c.user_id == user_id)
     if search and search_field:
         term = search.strip().lower()
         if search_field == "username":
-            query = query.filter(username__icontains=term)
+            query = query.where(icontains(table.c.username, term))
         elif search_field == "ip":
-            query = query.filter(ip_address__icontains=term)
+            query = query.where(icontains(table.c.ip_address, term))
         elif search_field == "all":
-            from ormar.queryset.clause import or_
-            query = query.filter(or_(username__icontains=term, ip_address__icontains=term))
-    total = await query.count()
-    offset = (page - 1) * per_page
-    logs = await query.order_by("-created_at").offset(offset).limit(per_page).all()
+            query = query.where(
+                sqlalchemy.or_(icontains(table.c.username, term), icontains(table.c.ip_address, term))
+            )
+    total = await count_rows(query)
+    logs = await fetch_records(
+        _AuditLogRow, paginate(query.order_by(table.c.created_at.desc()), page, per_page)
+    )
     total_pages = (total + per_page - 1) // per_page if per_page > 0 else 0
-    return {
-        "logs": [AuditLogResponse.model_validate(log) for log in logs],
+    return trusted_json({
+        "logs": [log.as_dict() for log in logs],
         "total": total,
         "page": page,
         "per_page": per_page,
         "total_pages": total_pages,
-    }
+    })
 
 
 @router.get("/registration-requests")
@@ -289,47 +305,64 @@ async def get_registration_requests(
     }
 
 
-@router.post("/registration-requests/approve-all")
+@router.post("/registration-requests/approve-all", response_model=BulkApprovalResponse)
 async def approve_all_registration_requests(
     request: Request,
     role: UserRole = UserRole.STUDENT,
     current_admin: User = Depends(get_current_admin)
 ):
-    pending = await RegistrationRequest.objects.filter(
-        status=RegistrationStatus.PENDING.value
-    ).all()
-    approved = 0
-    for reg_request in pending:
-        try:
-            user = await User.objects.create(
-                username=reg_request.username,
-                email=reg_request.email,
-                first_name=reg_request.first_name,
-                last_name=reg_request.last_name,
-                hashed_password=reg_request.hashed_password,
-                role=role.value,
-                is_active=True,
-                registration_ip=reg_request.ip_address
-            )
-
-            await reg_request.update(
-                status=RegistrationStatus.APPROVED.value,
-                reviewed_by=current_admin,
-                reviewed_at=utc_now()
-            )
-        except:
-            pass
-        
-        approved += 1
+    result = await approve_pending(role.value, current_admin.id)
+    approved = result["approved"]
     await log_audit(
         "registration_approve_all",
         user_id=current_admin.id,
         username=current_admin.username,
         resource_type="registration",
-        details={"approved": approved, "role": role.value},
+        details={"approved": approved, "skipped": len(result["skipped"]), "role": role.value},
+        request=request,
+    )
+    return {
+        "message": f"Approved {approved} registration requests",
+        "approved": approved,
+        "skipped": result["skipped"],
+    }
+
+
+@router.post(
+    "/registration-requests/approve-all/runs",
+    response_model=ApprovalRunResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def start_registration_approval_run(
+    request: Request,
+    role: UserRole = UserRole.STUDENT,
+    current_admin: User = Depends(get_current_admin)
+):
+    run = await start_approval_run(role.value, current_admin.id)
+    await log_audit(
+        "registration_approve_all_started",
+        user_id=current_admin.id,
+        username=current_admin.username,
+        resource_type="registration",
+        resource_id=str(run.id),
+        details={"total": run.total, "role": role.value},
         request=request,
     )
-    return {"message": f"Approved {approved} registration requests", "approved": approved}
+    return run
+
+
+@router.get("/registration-requests/approve-all/runs/{run_id}", response_model=ApprovalRunResponse)
+async def get_registration_approval_run(
+    run_id: int,
+    current_admin: User = Depends(get_current_admin)
+):
+    run = await RegistrationApprovalRun.objects.get_or_none(id=run_id)
+    if not run:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Approval run not found"
+        )
+    return run
 
 
 @router.delete("/registration-requests/{request_id}")
@@ -422,6 +455,10 @@ async def review_registration_request(
         return {"message": "Registration request rejected"}
 
 
+class _UserRow(Record):
+    __slots__ = tuple(UserResponse.model_fields)
+
+
 @router.get("/users")
 async def get_all_users(
     page: int = 1,
@@ -432,67 +469,41 @@ async def get_all_users(
     status_filter: str = None,
     current_admin: User = Depends(get_current_admin)
 ):
-    query = User.objects
+    table = User.ormar_config.table
+    query = sqlalchemy.select(*_UserRow.columns(table))
     
     if search and search_field:
         search_term = search.lower()
-        if search_field == "username":
-            query = query.filter(username__icontains=search_term)
-        elif search_field == "email":
-            query = query.filter(email__icontains=search_term)
-        elif search_field == "first_name":
-            query = query.filter(first_name__icontains=search_term)
-        elif search_field == "last_name":
-            query = query.filter(last_name__icontains=search_term)
-        elif search_field == "all":
-            all_users = await User.objects.order_by("-created_at").all()
-            filtered = [
-                u for u in all_users
-                if search_term in (u.username or "").lower()
-                or search_term in (u.email or "").lower()
-                or search_term in (u.first_name or "").lower()
-                or search_term in (u.last_name or "").lower()
-            ]
-            if role_filter and role_filter in [r.value for r in UserRole]:
-                filtered = [u for u in filtered if u.role == role_filter]
-            if status_filter == "active":
-                filtered = [u for u in filtered if u.is_active]
-            elif status_filter == "inactive":
-                filtered = [u for u in filtered if not u.is_active]
-            
-            total = len(filtered)
-            start = (page - 1) * per_page
-            end = start + per_page
-            users = filtered[start:end]
-            
-            return {
-                "users": users,
-                "total": total,
-                "page": page,
-                "per_page": per_page,
-                "total_pages": (total + per_page - 1) // per_page
-            }
+        searchable = {
+            "username": [table.c.username],
+            "email": [table.c.email],
+            "first_name": [table.c.first_name],
+            "last_name": [table.c.last_name],
+            "all": [table.c.username, table.c.email, table.c.first_name, table.c.last_name],
+        }.get(search_field)
+        if searchable:
+            query = query.where(sqlalchemy.or_(*(icontains(column, search_term) for column in searchable)))
     
     if role_filter and role_filter in [r.value for r in UserRole]:
-        query = query.filter(role=role_filter)
+        query = query.where(table.c.role == role_filter)
     
     if status_filter == "active":
-        query = query.filter(is_active=True)
+        query = query.where(table.c.is_active == True)
     elif status_filter == "inactive":
-        query = query.filter(is_active=False)
+        query = query.where(table.c.is_active == False)
     
-    total = await query.count()
-    
-    offset = (page - 1) * per_page
-    users = await query.order_by("-created_at").offset(offset).limit(per_page).all()
+    total = await count_rows(query)
+    users = await fetch_records(
+        _UserRow, paginate(query.order_by(table.c.created_at.desc()), page, per_page)
+    )
     
-    return {
-        "users": users,
+    return trusted_json({
+        "users": [user.as_dict() for user in users],
         "total": total,
         "page": page,
         "per_page": per_page,
         "total_pages": (total + per_page - 1) // per_page
-    }
+    })
 
 
 @router.get("/users/{user_id}", response_model=UserResponse)
@@ -544,6 +555,8 @@ async def update_user_details(
 
     if update_fields:
         await user.update(**update_fields)
+        if update_fields.keys() & {"username", "first_name", "last_name"}:
+            await bump_versions(BLOG_KEY)
         user = await User.objects.get_or_none(id=user_id)
         await log_audit(
             "user_updated",
@@ -575,7 +588,7 @@ async def get_user_groups(
     result = []
     for membership in memberships:
         group = membership.group
-        member_count = await GroupMember.objects.filter(group=group).count()
+        member_count = group.member_count
         teacher_full_name = (
             f"{group.teacher.first_name} {group.teacher.last_name}".strip()
             if (group.teacher.first_name or group.teacher.last_name)
@@ -611,6 +624,7 @@ async def change_user_role(
         )
     
     await user.update(role=new_role.value)
+    await bump_versions(user_key(user.id))
 
     await log_audit(
         "user_role_changed",
@@ -682,15 +696,22 @@ async def delete_user(
     
     deleted_username = user.username
 
-    attempts_as_student = await QuizAttempt.objects.filter(student=user).all()
+    attempts_as_student = await QuizAttempt.objects.select_related("quiz").filter(student=user).all()
+    affected_quiz_ids = {attempt.quiz.id for attempt in attempts_as_student}
     for attempt in attempts_as_student:
         await AntiCheatingEvent.objects.filter(attempt=attempt).delete()
         await Answer.objects.filter(attempt=attempt).delete()
         await attempt.delete()
+    member_group_ids = [
+        membership.group.id
+        for membership in await GroupMember.objects.filter(user=user).all()
+    ]
     await GroupMember.objects.filter(user=user).delete()
+    await recount_members(member_group_ids)
 
     quizzes_as_teacher = await Quiz.objects.filter(teacher=user).all()
     for quiz in quizzes_as_teacher:
+        affected_quiz_ids.add(quiz.id)
         attempts = await QuizAttempt.objects.filter(quiz=quiz).all()
         for attempt in attempts:
             await AntiCheatingEvent.objects.filter(attempt=attempt).delete()
@@ -705,6 +726,7 @@ async def delete_user(
     for group in groups_as_teacher:
         group_quizzes = await Quiz.objects.filter(group=group).all()
         for quiz in group_quizzes:
+            affected_quiz_ids.add(quiz.id)
             attempts = await QuizAttempt.objects.filter(quiz=quiz).all()
             for attempt in attempts:
                 await AntiCheatingEvent.objects.filter(attempt=attempt).delete()
@@ -716,6 +738,8 @@ async def delete_user(
             await quiz.delete()
         await GroupMember.objects.filter(group=group).delete()
         await group.delete()
+    await invalidate_quiz_stats(affected_quiz_ids)
+    await bump_versions(*(quiz_key(quiz_id) for quiz_id in affected_quiz_ids))
 
     for req in await RegistrationRequest.objects.filter(reviewed_by=user).all():
         await req.update(reviewed_by=None)
@@ -724,10 +748,12 @@ async def delete_user(
     for code in await RegistrationCode.objects.filter(used_by=user).all():
         await code.update(used_by=None)
 
-    await BlogPost.objects.filter(author=user).delete()
+    if await BlogPost.objects.filter(author=user).delete():
+        await bump_versions(BLOG_KEY)
     await ContactMessage.objects.filter(user_id=user.id).update(user_id=None)
 
     await user.delete()
+    blob_collector.wake()
 
     await log_audit(
         "user_deleted",
@@ -751,17 +777,12 @@ async def delete_user_avatar(
     user = await User.objects.get_or_none(id=user_id)
     if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
-    old_url = getattr(user, "avatar_url", None)
-    await user.update(avatar_url=None)
+    old_urls = (user.avatar_url, user.avatar_thumb_url)
+    await user.update(_columns=["avatar_url", "avatar_thumb_url"], avatar_url=None, avatar_thumb_url=None)
     await user.load_all()
-    if old_url and old_url.startswith("/uploads/avatars/"):
-        old_name = old_url.split("/")[-1]
-        old_path = UPLOADS_AVATARS_DIR / old_name
-        if old_path.exists():
-            try:
-                os.remove(old_path)
-            except OSError:
-                pass
+    for old_url in old_urls:
+        await remove_upload(old_url, UPLOADS_AVATARS_DIR)
+    blob_collector.wake()
     await log_audit(
         "avatar_deleted_by_admin",
         user_id=current_admin.id,
@@ -1,7 +1,8 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Request
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response
+from typing import List, Optional
 import random
 import unicodedata
+import sqlalchemy
 from schemas import (
     StartQuizAttempt, SubmitAnswer, CompleteQuizAttempt, GradeAnswerRequest,
     QuizAttemptResponse, QuizResultResponse,
@@ -10,17 +11,24 @@ from schemas import (
 )
 from app.database.models.quiz import Quiz, Question, Option
 from app.database.models.group import GroupMember
-from app.database.models.attempt import QuizAttempt, Answer, AntiCheatingEvent
+from app.database.models.attempt import QuizAttempt, Answer, AntiCheatingEvent, AttemptStatus
 from app.database.models.user import User
 from app.utils.auth import get_current_student, get_current_user, get_current_teacher
 from app.utils.audit import log_audit
-from app.database.database import utc_now
+from app.utils.attempts import insert_answer_once, add_attempt_score, finalize_attempts
+from app.utils.quiz_stats import percentage, record_regrade
+from app.utils.attempt_timer import attempt_deadline, question_deadline, is_past
+from app.database.database import database, utc_now
+from app.utils.http_cache import versioned, bump_versions, attempt_key, quiz_key, path_int
+from app.utils.serialization import trusted_json
+from app.utils.question_payload import fetch_quiz_questions
+from app.utils.rows import fetch_tuples
+from app.utils.packed_ids import pack_ids, unpack_ids
 from datetime import datetime
 import json
 
 router = APIRouter(prefix="/attempts", tags=["Quiz Attempts"])
 
-
 def normalize_text_answer(text: str) -> str:
     if not text:
         return ""
@@ -34,6 +42,10 @@ def compare_text_answers(user_answer: str, correct_answer: str) -> bool:
     return normalize_text_answer(user_answer) == normalize_text_answer(correct_answer)
 
 
+def _questions_order(packed: Optional[bytes]) -> Optional[List[int]]:
+    return None if packed is None else unpack_ids(packed)
+
+
 @router.post("/start", response_model=QuizAttemptResponse)
 async def start_quiz_attempt(
     data: StartQuizAttempt,
@@ -83,17 +95,11 @@ async def start_quiz_attempt(
         pass
     
     if existing_attempt:
-        questions_order = None
-        if existing_attempt.questions_order:
-            try:
-                questions_order = json.loads(existing_attempt.questions_order)
-            except:
-                pass
         return {
             **existing_attempt.dict(),
             "quiz_id": quiz.id,
             "student_id": current_user.id,
-            "questions_order": questions_order
+            "questions_order": _questions_order(existing_attempt.questions_order)
         }
     
     questions = await Question.objects.filter(quiz=quiz).all()
@@ -101,7 +107,6 @@ async def start_quiz_attempt(
     
     question_ids = [q.id for q in questions]
     random.shuffle(question_ids)
-    questions_order_json = json.dumps(question_ids)
     
     attempt = await QuizAttempt.objects.create(
         quiz=quiz,
@@ -111,7 +116,7 @@ async def start_quiz_attempt(
         started_at=utc_now(),
         is_completed=False,
         status="opened",
-        questions_order=questions_order_json
+        questions_order=pack_ids(question_ids)
     )
     await log_audit(
         "attempt_started",
@@ -143,11 +148,15 @@ async def submit_answer(
             detail="Question not found"
         )
     
-    attempt = await QuizAttempt.objects.filter(
-        quiz=question.quiz,
-        student=current_user,
-        is_completed=False
-    ).first()
+    attempt = None
+    try:
+        attempt = await QuizAttempt.objects.filter(
+            quiz=question.quiz,
+            student=current_user,
+            is_completed=False
+        ).first()
+    except:
+        pass
     
     if not attempt:
         raise HTTPException(
@@ -155,24 +164,19 @@ async def submit_answer(
             detail="No active quiz attempt found"
         )
     
-    existing_answer = None
-    try:
-        existing_answer = await Answer.objects.filter(
-            attempt=attempt,
-            question=question
-        ).first()
-    except:
-        pass
-    
-    if existing_answer:
+    now = utc_now()
+    if (
+        is_past(attempt_deadline(attempt, question.quiz), now)
+        or is_past(question_deadline(attempt, question.quiz, question.id), now)
+    ):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Question already answered"
+            detail="Time limit exceeded"
         )
     
     is_correct = False
     points_earned = 0.0
-    selected_options_json = "[]"
+    selected_options = b""
     text_answer = None
     
     input_type = question.input_type or "select"
@@ -211,29 +215,30 @@ async def submit_answer(
         
         is_correct = correct_ids == selected_ids
         points_earned = question.points if is_correct else 0.0
-        selected_options_json = json.dumps(data.selected_options)
+        selected_options = pack_ids(data.selected_options)
     
-    now = utc_now()
-    previous_answers = await Answer.objects.filter(attempt=attempt).order_by("-answered_at").all()
-    if previous_answers:
-        last_answer_time = previous_answers[0].answered_at
-        time_spent = int((now - last_answer_time).total_seconds())
-    else:
-        time_spent = int((now - attempt.started_at).total_seconds())
+    time_spent = int((now - (attempt.last_answered_at or attempt.started_at)).total_seconds())
     
-    answer = await Answer.objects.create(
-        attempt=attempt,
-        question=question,
-        selected_options=selected_options_json,
-        text_answer=text_answer,
-        is_correct=is_correct,
-        points_earned=points_earned,
-        time_spent=time_spent,
-        answered_at=now
-    )
-    
-    await attempt.load()
-    await attempt.update(score=attempt.score + points_earned, status="in_progress")
+    async with database.transaction():
+        answer_id = await insert_answer_once(
+            attempt.id,
+            question.id,
+            selected_options=selected_options,
+            text_answer=text_answer,
+            is_correct=is_correct,
+            points_earned=points_earned,
+            manually_graded=False,
+            time_spent=time_spent,
+            answered_at=now
+        )
+        if answer_id is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Question already answered"
+            )
+        await add_attempt_score(
+            attempt.id, points_earned, status="in_progress", last_answered_at=now
+        )
     
     return {
         "message": "Answer submitted",
@@ -265,6 +270,12 @@ async def submit_answers_batch(
             detail="Attempt already completed"
         )
     
+    if is_past(attempt_deadline(attempt, attempt.quiz), utc_now()):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Time limit exceeded"
+        )
+    
     questions = await Question.objects.filter(quiz=attempt.quiz).all()
     question_map = {q.id: q for q in questions}
     
@@ -276,12 +287,24 @@ async def submit_answers_batch(
     total_points_earned = 0.0
     now = utc_now()
     
-    if existing_answers:
-        last_answer = sorted(existing_answers, key=lambda x: x.answered_at)[-1]
-        base_time = last_answer.answered_at
-    else:
-        base_time = attempt.started_at
+    base_time = attempt.last_answered_at or attempt.started_at
     
+    questions_table = Question.ormar_config.table
+    options_table = Option.ormar_config.table
+    option_rows = await fetch_tuples(
+        sqlalchemy.select(options_table.c.question, options_table.c.id, options_table.c.is_correct)
+        .select_from(options_table.join(questions_table, options_table.c.question == questions_table.c.id))
+        .where(questions_table.c.quiz == attempt.quiz.id)
+    )
+    option_ids_of = {}
+    correct_ids_of = {}
+    for question_id, option_id, option_is_correct in option_rows:
+        option_ids_of.setdefault(question_id, set()).add(option_id)
+        if option_is_correct:
+            correct_ids_of.setdefault(question_id, set()).add(option_id)
+    
+    # grade the whole batch first, so the transaction below only writes
+    graded = []
     for answer_data in data.answers:
         question_id = answer_data.question_id
         
@@ -296,7 +319,7 @@ async def submit_answers_batch(
         
         is_correct = False
         points_earned = 0.0
-        selected_options_json = "[]"
+        selected_options = b""
         text_answer = None
         
         input_type = question.input_type or "select"
@@ -318,58 +341,58 @@ async def submit_answers_batch(
             else:
                 points_earned = question.points if is_correct else 0.0
         else:
-            all_question_options = await Option.objects.filter(question=question).all()
-            all_option_ids = set(opt.id for opt in all_question_options)
             selected_ids = set(answer_data.selected_options)
             
-            if not selected_ids.issubset(all_option_ids):
+            if not selected_ids.issubset(option_ids_of.get(question_id, set())):
                 skipped_count += 1
                 continue
             
-            correct_options = await Option.objects.filter(
-                question=question,
-                is_correct=True
-            ).all()
-            correct_ids = set(opt.id for opt in correct_options)
-            
-            is_correct = correct_ids == selected_ids
+            is_correct = correct_ids_of.get(question_id, set()) == selected_ids
             points_earned = question.points if is_correct else 0.0
-            selected_options_json = json.dumps(answer_data.selected_options)
+            selected_options = pack_ids(answer_data.selected_options)
         
         if getattr(answer_data, "time_spent", None) is not None and answer_data.time_spent >= 0:
             time_spent = answer_data.time_spent
         else:
             time_spent = int((now - base_time).total_seconds())
         
-        await Answer.objects.create(
-            attempt=attempt,
-            question=question,
-            selected_options=selected_options_json,
+        answered_question_ids.add(question_id)
+        base_time = now
+        graded.append(dict(
+            question_id=question_id,
+            selected_options=selected_options,
             text_answer=text_answer,
             is_correct=is_correct,
             points_earned=points_earned,
+            manually_graded=False,
             time_spent=time_spent,
             answered_at=now
-        )
-        
-        total_points_earned += points_earned
-        submitted_count += 1
-        answered_question_ids.add(question_id)
-        base_time = now
+        ))
     
-    new_score = attempt.score + total_points_earned
-    await attempt.update(score=new_score, status="in_progress")
+    last_answered_at = attempt.last_answered_at or attempt.started_at
+    async with database.transaction():
+        for answer in graded:
+            answer_id = await insert_answer_once(attempt.id, **answer)
+            if answer_id is None:
+                skipped_count += 1
+                continue
+            
+            total_points_earned += answer["points_earned"]
+            submitted_count += 1
+            last_answered_at = now
+        
+        new_score = await add_attempt_score(
+            attempt.id, total_points_earned, status="in_progress", last_answered_at=last_answered_at
+        )
     
+    completed = []
     if data.complete:
-        time_spent = int((utc_now() - attempt.started_at).total_seconds())
-        has_text_questions = any((q.input_type or "select") == "text" for q in questions)
-        await attempt.update(
-            completed_at=utc_now(),
-            time_spent=time_spent,
-            is_completed=True,
-            status="completed",
-            needs_manual_grading=has_text_questions
+        completed = await finalize_attempts(
+            QuizAttempt.ormar_config.table.c.id == attempt.id,
+            utc_now(),
+            status=AttemptStatus.COMPLETED.value,
         )
+    if completed:
         await log_audit(
             "attempt_completed",
             user_id=current_user.id,
@@ -420,17 +443,16 @@ async def complete_quiz_attempt(
             detail="Attempt already completed"
         )
     
-    time_spent = int((utc_now() - attempt.started_at).total_seconds())
-    questions = await Question.objects.filter(quiz=attempt.quiz).all()
-    has_text_questions = any((q.input_type or "select") == "text" for q in questions)
-    
-    await attempt.update(
-        completed_at=utc_now(),
-        time_spent=time_spent,
-        is_completed=True,
-        status="completed",
-        needs_manual_grading=has_text_questions
+    completed = await finalize_attempts(
+        QuizAttempt.ormar_config.table.c.id == attempt.id,
+        utc_now(),
+        status=AttemptStatus.COMPLETED.value,
     )
+    if not completed:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Attempt already completed"
+        )
     await log_audit(
         "attempt_completed",
         user_id=current_user.id,
@@ -470,19 +492,33 @@ async def get_my_attempts(
         data = attempt.dict()
         data["quiz_id"] = attempt.quiz.id
         data["student_id"] = current_user.id
-        if data.get("questions_order"):
-            try:
-                data["questions_order"] = json.loads(data["questions_order"])
-            except (json.JSONDecodeError, TypeError):
-                data["questions_order"] = None
+        data["questions_order"] = _questions_order(attempt.questions_order)
         result.append(data)
     return result
 
 
+async def _result_version_keys(request: Request, current_user: User) -> Optional[List[str]]:
+    # only completed attempts are cacheable; answers of open ones keep changing
+    attempt_id = path_int(request, "attempt_id")
+    if attempt_id is None:
+        return None
+    attempts = QuizAttempt.ormar_config.table
+    quiz_id = await database.fetch_val(
+        sqlalchemy.select(attempts.c.quiz)
+        .where(attempts.c.id == attempt_id)
+        .where(attempts.c.is_completed.is_(True))
+    )
+    if quiz_id is None:
+        return None
+    return [attempt_key(attempt_id), quiz_key(quiz_id)]
+
+
 @router.get("/results/{attempt_id}", response_model=QuizResultResponse)
 async def get_attempt_results(
     attempt_id: int,
-    current_user: User = Depends(get_current_user)
+    response: Response,
+    current_user: User = Depends(get_current_user),
+    _: None = Depends(versioned(_result_version_keys)),
 ):
     attempt = await QuizAttempt.objects.select_related(["quiz", "student"]).get_or_none(id=attempt_id)
     
@@ -501,58 +537,74 @@ async def get_attempt_results(
             detail="Access denied"
         )
     
-    answers = await Answer.objects.select_related("question").filter(attempt=attempt).all()
+    question_rows, options_of = await fetch_quiz_questions(attempt.quiz.id)
+    question_of = {row[0]: row for row in question_rows}
+    answers = Answer.ormar_config.table
+    answer_rows = await database.fetch_all(
+        sqlalchemy.select(
+            answers.c.question,
+            answers.c.selected_options,
+            answers.c.text_answer,
+            answers.c.is_correct,
+            answers.c.points_earned,
+        )
+        .where(answers.c.attempt == attempt.id)
+        .order_by(answers.c.id)
+    )
     answer_details = []
-    for answer in answers:
-        question = answer.question
-        options = await Option.objects.filter(question=question).all()
-        selected_ids = json.loads(answer.selected_options)
+    for answer in answer_rows:
+        question = question_of.get(answer[0])
+        if question is None:
+            continue
+        options = options_of.get(question[0], [])
+        selected_ids = unpack_ids(answer[1])
         
-        options_map = {opt.id: opt.text for opt in options}
+        options_map = {opt[1]: opt[2] for opt in options}
         selected_texts = [options_map.get(oid, str(oid)) for oid in selected_ids]
-        correct_option_texts = [opt.text for opt in options if opt.is_correct]
+        correct_options = [opt for opt in options if opt[3]]
         
-        input_type = question.input_type or "select"
+        input_type = question[1] or "select"
         
         answer_details.append({
-            "question_id": question.id,
-            "question_text": question.text,
-            "question_image_url": getattr(question, "image_url", None),
+            "question_id": question[0],
+            "question_text": question[2],
+            "question_image_url": question[6],
+            "question_image_display_url": question[7],
             "input_type": input_type,
             "selected_options": selected_ids,
             "selected_texts": selected_texts,
-            "text_answer": answer.text_answer,
-            "correct_options": [opt.id for opt in options if opt.is_correct],
-            "correct_option_texts": correct_option_texts,
-            "correct_text_answer": question.correct_text_answer if input_type in ("text", "number") else None,
-            "is_correct": answer.is_correct,
-            "points_earned": answer.points_earned,
-            "max_points": question.points
+            "text_answer": answer[2],
+            "correct_options": [opt[1] for opt in correct_options],
+            "correct_option_texts": [opt[2] for opt in correct_options],
+            "correct_text_answer": question[5] if input_type in ("text", "number") else None,
+            "is_correct": answer[3],
+            "points_earned": answer[4],
+            "max_points": question[4]
         })
     
     percentage = (attempt.score / attempt.max_score * 100) if attempt.max_score > 0 else 0
     
-    questions_order = None
-    if attempt.questions_order:
-        try:
-            questions_order = json.loads(attempt.questions_order)
-        except (json.JSONDecodeError, TypeError):
-            questions_order = None
-    
-    attempt_data = attempt.dict()
-    attempt_data["quiz_id"] = attempt.quiz.id
-    attempt_data["student_id"] = attempt.student.id
-    attempt_data["questions_order"] = questions_order
-    attempt_data["needs_manual_grading"] = getattr(attempt, "needs_manual_grading", False)
-    
-    return {
-        "attempt": attempt_data,
+    return trusted_json({
+        "attempt": {
+            "id": attempt.id,
+            "quiz_id": attempt.quiz.id,
+            "student_id": attempt.student.id,
+            "score": attempt.score,
+            "max_score": attempt.max_score,
+            "started_at": attempt.started_at,
+            "completed_at": attempt.completed_at,
+            "time_spent": attempt.time_spent,
+            "is_completed": attempt.is_completed,
+            "status": attempt.status or "opened",
+            "questions_order": _questions_order(attempt.questions_order),
+            "needs_manual_grading": bool(attempt.needs_manual_grading),
+        },
         "answers": answer_details,
         "percentage": percentage,
-        "allow_show_answers": attempt.quiz.allow_show_answers if hasattr(attempt.quiz, 'allow_show_answers') else True,
-        "show_results": attempt.quiz.show_results if hasattr(attempt.quiz, 'show_results') else True,
-        "allow_math": getattr(attempt.quiz, "allow_math", False),
-    }
+        "allow_show_answers": attempt.quiz.allow_show_answers if attempt.quiz.allow_show_answers is not None else True,
+        "show_results": attempt.quiz.show_results if attempt.quiz.show_results is not None else True,
+        "allow_math": bool(attempt.quiz.allow_math),
+    }, response)
 
 
 @router.patch("/{attempt_id}/answers/{answer_id}")
@@ -581,15 +633,25 @@ async def grade_text_answer(
         )
 
     points_earned = answer.question.points if data.is_correct else 0.0
-    await answer.update(
-        is_correct=data.is_correct,
-        points_earned=points_earned,
-        manually_graded=True,
-    )
+    points_delta = points_earned - (answer.points_earned or 0.0)
+    correct_delta = int(bool(data.is_correct)) - int(bool(answer.is_correct))
+    async with database.transaction():
+        await answer.update(
+            is_correct=data.is_correct,
+            points_earned=points_earned,
+            manually_graded=True,
+        )
+        new_score = await add_attempt_score(attempt.id, points_delta)
+        if attempt.is_completed:
+            await record_regrade(
+                attempt.quiz.id,
+                answer.question.id,
+                percentage(new_score - points_delta, attempt.max_score),
+                percentage(new_score, attempt.max_score),
+                correct_delta,
+            )
 
     all_answers = await Answer.objects.filter(attempt=attempt).all()
-    new_score = sum(a.points_earned for a in all_answers)
-    await attempt.update(score=new_score)
 
     text_questions = await Question.objects.filter(
         quiz=attempt.quiz, input_type="text"
@@ -598,7 +660,8 @@ async def grade_text_answer(
     text_answers = [a for a in all_answers if a.question.id in text_q_ids]
     all_text_graded = all(getattr(a, "manually_graded", False) for a in text_answers)
     if all_text_graded:
-        await attempt.update(needs_manual_grading=False)
+        await attempt.update(_columns=["needs_manual_grading"], needs_manual_grading=False)
+    await bump_versions(attempt_key(attempt.id))
 
     return {
         "is_correct": data.is_correct,
@@ -627,27 +690,40 @@ async def get_quiz_results(
             detail="Access denied"
         )
     
-    attempts = await QuizAttempt.objects.select_related("student").filter(
-        quiz=quiz,
-        is_completed=True
-    ).order_by("-score").all()
+    attempts = QuizAttempt.ormar_config.table
+    users = User.ormar_config.table
+    rows = await fetch_tuples(
+        sqlalchemy.select(
+            attempts.c.id,
+            attempts.c.student,
+            users.c.first_name,
+            users.c.last_name,
+            attempts.c.score,
+            attempts.c.max_score,
+            attempts.c.time_spent,
+            attempts.c.completed_at,
+            attempts.c.needs_manual_grading,
+        )
+        .select_from(attempts.join(users, attempts.c.student == users.c.id))
+        .where(attempts.c.quiz == quiz.id, attempts.c.is_completed == True)
+        .order_by(attempts.c.score.desc())
+    )
     
     results = []
-    for attempt in attempts:
-        percentage = (attempt.score / attempt.max_score * 100) if attempt.max_score > 0 else 0
+    for attempt_id, student_id, first_name, last_name, score, max_score, time_spent, completed_at, needs_grading in rows:
         results.append({
-            "attempt_id": attempt.id,
-            "student_id": attempt.student.id,
-            "student_name": f"{attempt.student.first_name} {attempt.student.last_name}",
-            "score": attempt.score,
-            "max_score": attempt.max_score,
-            "percentage": percentage,
-            "time_spent": attempt.time_spent,
-            "completed_at": attempt.completed_at,
-            "needs_manual_grading": getattr(attempt, "needs_manual_grading", False),
+            "attempt_id": attempt_id,
+            "student_id": student_id,
+            "student_name": f"{first_name} {last_name}",
+            "score": score,
+            "max_score": max_score,
+            "percentage": (score / max_score * 100) if max_score > 0 else 0,
+            "time_spent": time_spent,
+            "completed_at": completed_at,
+            "needs_manual_grading": bool(needs_grading),
         })
     
-    return results
+    return trusted_json(results)
 
 
 @router.get("/current")
@@ -671,19 +747,12 @@ async def get_current_attempt(
     answered_questions = await Answer.objects.filter(attempt=attempt).all()
     answered_ids = [ans.question.id for ans in answered_questions]
     
-    questions_order = None
-    if attempt.questions_order:
-        try:
-            questions_order = json.loads(attempt.questions_order)
-        except:
-            pass
-    
     return {
         "has_attempt": True,
         "attempt_id": attempt.id,
         "started_at": attempt.started_at,
         "answered_questions": answered_ids,
-        "questions_order": questions_order
+        "questions_order": _questions_order(attempt.questions_order)
     }
 
 
@@ -1,6 +1,4 @@
-import os
-import uuid
-from pathlib import Path
+from typing import List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, status, Request, UploadFile, File
 from schemas import (
@@ -16,12 +14,15 @@ from app.utils.auth import (
 )
 from app.utils.rate_limiter import check_login_rate_limit, check_registration_rate_limit
 from app.utils.audit import log_audit
+from app.utils.http_cache import versioned, bump_versions, BLOG_KEY, SETTINGS_KEY
+from app.utils.uploads import UPLOADS_DIR, save_image_upload, remove_upload, upload_url, blob_collector
+from app.utils.images import make_derivative, AVATAR_SIZE
 from config import settings
 
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
-UPLOADS_AVATARS_DIR = Path(__file__).resolve().parent.parent.parent.parent / "static" / "uploads" / "avatars"
+UPLOADS_AVATARS_DIR = UPLOADS_DIR / "avatars"
 
 
 async def _get_setting(key: str, default: str) -> bool:
@@ -61,8 +62,20 @@ async def _get_json_setting(key: str, default=None):
     return default
 
 
+async def _settings_version_keys(request: Request, current_user: Optional[User]) -> List[str]:
+    return [SETTINGS_KEY]
+
+
 @router.get("/registration-settings")
-async def get_registration_settings():
+async def get_registration_settings(
+    _: None = Depends(
+        versioned(
+            _settings_version_keys,
+            cache_control="public, max-age=60",
+            user_dependency=None,
+        )
+    ),
+):
     auto_enabled = await is_auto_registration_enabled()
     reg_enabled = await is_registration_enabled()
     maintenance = await is_maintenance_mode()
@@ -264,6 +277,9 @@ async def update_me(
             )
 
     await current_user.update(**update_data)
+    if "first_name" in update_data or "last_name" in update_data:
+        # blog posts show their author's name
+        await bump_versions(BLOG_KEY)
     await current_user.load_all()
     return current_user
 
@@ -274,38 +290,18 @@ async def upload_avatar(
     file: UploadFile = File(...),
     current_user: User = Depends(get_current_user)
 ):
-    content_type = file.content_type or ""
-    if content_type not in settings.allowed_image_types:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Allowed types: {', '.join(settings.allowed_image_types)}"
-        )
-    contents = await file.read()
-    if len(contents) > settings.max_image_size:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Image must be under {settings.max_image_size} bytes"
-        )
-    ext = {"image/jpeg": ".jpg", "image/png": ".png", "image/gif": ".gif", "image/webp": ".webp"}.get(
-        content_type, ".jpg"
+    path = await save_image_upload(file)
+    thumb_name = await make_derivative(path, AVATAR_SIZE)
+    url_path = upload_url(path)
+    thumb_url = upload_url(path.with_name(thumb_name)) if thumb_name else None
+    old_urls = (current_user.avatar_url, current_user.avatar_thumb_url)
+    await current_user.update(
+        _columns=["avatar_url", "avatar_thumb_url"], avatar_url=url_path, avatar_thumb_url=thumb_url
     )
-    filename = f"{current_user.id}_{uuid.uuid4().hex[:12]}{ext}"
-    UPLOADS_AVATARS_DIR.mkdir(parents=True, exist_ok=True)
-    filepath = UPLOADS_AVATARS_DIR / filename
-    with open(filepath, "wb") as f:
-        f.write(contents)
-    url_path = f"/uploads/avatars/{filename}"
-    old_url = getattr(current_user, "avatar_url", None)
-    await current_user.update(avatar_url=url_path)
     await current_user.load_all()
-    if old_url and old_url.startswith("/uploads/avatars/"):
-        old_name = old_url.split("/")[-1]
-        old_path = UPLOADS_AVATARS_DIR / old_name
-        if old_path.exists():
-            try:
-                os.remove(old_path)
-            except OSError:
-                pass
+    for old_url in old_urls:
+        await remove_upload(old_url, UPLOADS_AVATARS_DIR)
+    blob_collector.wake()
     await log_audit(
         "avatar_uploaded",
         user_id=current_user.id,
@@ -321,17 +317,12 @@ async def delete_avatar(
     request: Request,
     current_user: User = Depends(get_current_user)
 ):
-    old_url = getattr(current_user, "avatar_url", None)
-    await current_user.update(avatar_url=None)
+    old_urls = (current_user.avatar_url, current_user.avatar_thumb_url)
+    await current_user.update(_columns=["avatar_url", "avatar_thumb_url"], avatar_url=None, avatar_thumb_url=None)
     await current_user.load_all()
-    if old_url and old_url.startswith("/uploads/avatars/"):
-        old_name = old_url.split("/")[-1]
-        old_path = UPLOADS_AVATARS_DIR / old_name
-        if old_path.exists():
-            try:
-                os.remove(old_path)
-            except OSError:
-                pass
+    for old_url in old_urls:
+        await remove_upload(old_url, UPLOADS_AVATARS_DIR)
+    blob_collector.wake()
     await log_audit(
         "avatar_deleted",
         user_id=current_user.id,
@@ -7,6 +7,7 @@ from app.database.models.user import User
 from app.utils.auth import get_current_admin, get_current_user_optional
 from app.utils.audit import log_audit
 from app.database.database import utc_now
+from app.utils.http_cache import versioned, bump_versions, BLOG_KEY
 
 
 router = APIRouter(prefix="/blog", tags=["Blog"])
@@ -33,12 +34,24 @@ def format_blog_post(post: BlogPost, author: User = None) -> dict:
     }
 
 
+async def _blog_version_keys(request: Request, current_user: Optional[User]) -> List[str]:
+    return [BLOG_KEY]
+
+
+blog_cache = versioned(
+    _blog_version_keys,
+    cache_control="private, max-age=60",
+    user_dependency=get_current_user_optional,
+)
+
+
 @router.get("/posts", response_model=List[BlogPostResponse])
 async def get_blog_posts(
     page: int = 1,
     per_page: int = 10,
     include_unpublished: bool = False,
-    current_user: Optional[User] = Depends(get_current_user_optional)
+    current_user: Optional[User] = Depends(get_current_user_optional),
+    _: None = Depends(blog_cache),
 ):
     query = BlogPost.objects.select_related("author")
     
@@ -55,7 +68,8 @@ async def get_blog_posts(
 @router.get("/posts/{post_id}", response_model=BlogPostResponse)
 async def get_blog_post(
     post_id: int,
-    current_user: Optional[User] = Depends(get_current_user_optional)
+    current_user: Optional[User] = Depends(get_current_user_optional),
+    _: None = Depends(blog_cache),
 ):
     post = await BlogPost.objects.select_related("author").get_or_none(id=post_id)
     
@@ -87,6 +101,7 @@ async def create_blog_post(
         author=current_admin,
         is_published=data.is_published
     )
+    await bump_versions(BLOG_KEY)
     await log_audit(
         "blog_post_created",
         user_id=current_admin.id,
@@ -125,6 +140,7 @@ async def update_blog_post(
     if update_fields:
         update_fields["updated_at"] = utc_now()
         await post.update(**update_fields)
+        await bump_versions(BLOG_KEY)
         post = await BlogPost.objects.select_related("author").get_or_none(id=post_id)
         await log_audit(
             "blog_post_updated",
@@ -155,6 +171,7 @@ async def delete_blog_post(
     
     title = post.title
     await post.delete()
+    await bump_versions(BLOG_KEY)
     await log_audit(
         "blog_post_deleted",
         user_id=current_admin.id,
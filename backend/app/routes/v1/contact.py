@@ -1,10 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Request
 from typing import List, Optional
+import sqlalchemy
 from schemas import ContactMessageCreate, ContactMessageResponse
 from app.database.models.contact_message import ContactMessage
 from app.database.models.user import User
 from app.utils.auth import get_current_user_optional, get_current_admin
 from app.utils.audit import log_audit
+from app.utils.rows import Record, fetch_records, paginate
+from app.utils.serialization import trusted_json
 
 router = APIRouter(prefix="/contact", tags=["Contact"])
 
@@ -62,6 +65,10 @@ async def send_contact_message(
     return message
 
 
+class _MessageRow(Record):
+    __slots__ = tuple(ContactMessageResponse.model_fields)
+
+
 @router.get("/messages", response_model=List[ContactMessageResponse])
 async def get_contact_messages(
     page: int = 1,
@@ -69,16 +76,17 @@ async def get_contact_messages(
     is_read: Optional[bool] = None,
     current_admin: User = Depends(get_current_admin)
 ):
-    query = ContactMessage.objects
+    table = ContactMessage.ormar_config.table
+    query = sqlalchemy.select(*_MessageRow.columns(table))
     
     if is_read is not None:
-        query = query.filter(is_read=is_read)
+        query = query.where(table.c.is_read == is_read)
     
-    total = await query.count()
-    offset = (page - 1) * per_page
-    messages = await query.order_by("-created_at").offset(offset).limit(per_page).all()
+    messages = await fetch_records(
+        _MessageRow, paginate(query.order_by(table.c.created_at.desc()), page, per_page)
+    )
     
-    return messages
+    return trusted_json([message.as_dict() for message in messages])
 
 
 @router.get("/messages/count")
@@ -1,20 +1,54 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Request
-from typing import List
-import random
-import string
-from schemas import GroupCreate, GroupUpdate, GroupResponse, JoinGroupRequest
+from fastapi import APIRouter, Depends, HTTPException, status, Request, UploadFile, File
+from typing import List, Dict
+import sqlalchemy
+from schemas import (
+    GroupCreate, GroupUpdate, GroupResponse, JoinGroupRequest, BulkEnrollRequest, BulkEnrollResponse
+)
 from app.database.models.group import Group, GroupMember
 from app.database.models.user import User
 from app.database.models.quiz import Quiz, Question, Option
 from app.database.models.attempt import QuizAttempt, Answer
 from app.utils.auth import get_current_teacher, get_current_user, get_current_student
 from app.utils.audit import log_audit
+from app.utils.quiz_stats import invalidate_quiz_stats
+from app.utils.gradebook import build_gradebook
+from app.utils.http_cache import json_response_with_etag, bump_versions, quiz_key, user_key
+from app.database.database import database, dialect_insert, utc_now
+from app.utils.counters import add_member_count
+from app.utils.group_codes import claim_group_code
+from app.utils.roster import RosterEntry, roster_from_lists, parse_roster_csv, enroll_roster, MAX_CSV_BYTES
+from app.utils.uploads import blob_collector
+from config import settings
 
 router = APIRouter(prefix="/groups", tags=["Groups"])
 
 
-def generate_group_code() -> str:
-    return ''.join(random.choices(string.digits, k=6))
+async def count_incomplete_assignments(student_id: int, group_ids: List[int]) -> Dict[int, int]:
+    """Open quizzes per group that the student has not completed yet."""
+    if not group_ids:
+        return {}
+    quizzes = Quiz.ormar_config.table
+    attempts = QuizAttempt.ormar_config.table
+    completed = (
+        sqlalchemy.select(attempts.c.id)
+        .where(attempts.c.quiz == quizzes.c.id)
+        .where(attempts.c.student == student_id)
+        .where(attempts.c.is_completed.is_(True))
+    )
+    rows = await database.fetch_all(
+        sqlalchemy.select(quizzes.c.group, sqlalchemy.func.count())
+        .where(quizzes.c.group.in_(group_ids))
+        .where(quizzes.c.is_active.is_(True))
+        .where(quizzes.c.is_expired.is_(False))
+        .where(sqlalchemy.or_(
+            quizzes.c.manual_close.is_(True),
+            quizzes.c.available_until.is_(None),
+            quizzes.c.available_until >= utc_now(),
+        ))
+        .where(~completed.exists())
+        .group_by(quizzes.c.group)
+    )
+    return {row[0]: row[1] for row in rows}
 
 
 @router.post("", response_model=GroupResponse)
@@ -23,17 +57,15 @@ async def create_group(
     request: Request,
     current_user: User = Depends(get_current_teacher)
 ):
-    code = generate_group_code()
-    while await Group.objects.filter(code=code).exists():
-        code = generate_group_code()
-    
-    group = await Group.objects.create(
-        name=data.name,
-        subject=data.subject,
-        code=code,
-        color=data.color or "#6366f1",
-        teacher=current_user
-    )
+    async with database.transaction():
+        code = await claim_group_code()
+        group = await Group.objects.create(
+            name=data.name,
+            subject=data.subject,
+            code=code,
+            color=data.color or "#6366f1",
+            teacher=current_user
+        )
     await log_audit(
         "group_created",
         user_id=current_user.id,
@@ -55,15 +87,12 @@ async def create_group(
 
 @router.get("", response_model=List[GroupResponse])
 async def get_my_groups(current_user: User = Depends(get_current_user)):
-    from datetime import datetime
-    now = datetime.utcnow()
-    
     if current_user.role in ("teacher", "admin", "developer"):
         groups = await Group.objects.select_related("teacher").filter(teacher=current_user).all()
         
         result = []
         for group in groups:
-            member_count = await GroupMember.objects.filter(group=group).count()
+            member_count = group.member_count
             teacher_full_name = f"{group.teacher.first_name} {group.teacher.last_name}".strip() if group.teacher.first_name or group.teacher.last_name else group.teacher.username
             result.append({
                 **group.dict(),
@@ -77,23 +106,15 @@ async def get_my_groups(current_user: User = Depends(get_current_user)):
         memberships = await GroupMember.objects.select_related("group__teacher").filter(
             user=current_user
         ).all()
+        group_ids = [membership.group.id for membership in memberships]
+        incomplete_counts = await count_incomplete_assignments(current_user.id, group_ids)
         
         result = []
         for membership in memberships:
             group = membership.group
-            member_count = await GroupMember.objects.filter(group=group).count()
+            member_count = group.member_count
             teacher_full_name = f"{group.teacher.first_name} {group.teacher.last_name}".strip() if group.teacher.first_name or group.teacher.last_name else group.teacher.username
-            
-            quizzes = await Quiz.objects.filter(group=group, is_active=True).all()
-            incomplete_count = 0
-            for quiz in quizzes:
-                if not quiz.manual_close and quiz.available_until and quiz.available_until < now:
-                    continue
-                completed_attempt = await QuizAttempt.objects.filter(
-                    quiz=quiz, student=current_user, is_completed=True
-                ).exists()
-                if not completed_attempt:
-                    incomplete_count += 1
+            incomplete_count = incomplete_counts.get(group.id, 0)
             
             result.append({
                 **group.dict(),
@@ -110,9 +131,6 @@ async def get_group(
     group_id: int,
     current_user: User = Depends(get_current_user)
 ):
-    from datetime import datetime
-    now = datetime.utcnow()
-    
     group = await Group.objects.select_related("teacher").get_or_none(id=group_id)
     
     if not group:
@@ -132,20 +150,13 @@ async def get_group(
             detail="Access denied"
         )
     
-    member_count = await GroupMember.objects.filter(group=group).count()
+    member_count = group.member_count
     teacher_full_name = f"{group.teacher.first_name} {group.teacher.last_name}".strip() if group.teacher.first_name or group.teacher.last_name else group.teacher.username
     
     incomplete_count = 0
     if current_user.role == "student":
-        quizzes = await Quiz.objects.filter(group=group, is_active=True).all()
-        for quiz in quizzes:
-            if not quiz.manual_close and quiz.available_until and quiz.available_until < now:
-                continue
-            completed_attempt = await QuizAttempt.objects.filter(
-                quiz=quiz, student=current_user, is_completed=True
-            ).exists()
-            if not completed_attempt:
-                incomplete_count += 1
+        incomplete_counts = await count_incomplete_assignments(current_user.id, [group.id])
+        incomplete_count = incomplete_counts.get(group.id, 0)
     
     return {
         **group.dict(),
@@ -179,7 +190,7 @@ async def update_group(
     
     update_data = data.dict(exclude_unset=True)
     if update_data:
-        await group.update(**update_data)
+        await group.update(_columns=list(update_data), **update_data)
         await log_audit(
             "group_updated",
             user_id=current_user.id,
@@ -190,12 +201,10 @@ async def update_group(
             request=request,
         )
     
-    member_count = await GroupMember.objects.filter(group=group).count()
-    
     return {
         **group.dict(),
         "teacher_id": group.teacher.id,
-        "member_count": member_count
+        "member_count": group.member_count
     }
 
 
@@ -231,8 +240,11 @@ async def delete_group(
             await Option.objects.filter(question=question).delete()
         await Question.objects.filter(quiz=quiz).delete()
     await Quiz.objects.filter(group=group).delete()
+    await invalidate_quiz_stats([quiz.id for quiz in quizzes])
+    await bump_versions(*(quiz_key(quiz.id) for quiz in quizzes))
     await GroupMember.objects.filter(group=group).delete()
     await group.delete()
+    blob_collector.wake()
 
     await log_audit(
         "group_deleted",
@@ -261,20 +273,22 @@ async def join_group(
             detail="Group with this code not found"
         )
     
-    existing_member = await GroupMember.objects.filter(
-        group=group, user=current_user
-    ).exists()
-    
-    if existing_member:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="You are already a member of this group"
+    members = GroupMember.ormar_config.table
+    async with database.transaction():
+        # a repeated join (double click, retry) conflicts on (group, user)
+        # and inserts nothing
+        joined = await database.fetch_val(
+            dialect_insert(members)
+            .values(group=group.id, user=current_user.id, joined_at=utc_now())
+            .on_conflict_do_nothing(index_elements=[members.c.group, members.c.user])
+            .returning(members.c.id)
         )
-    
-    await GroupMember.objects.create(
-        group=group,
-        user=current_user
-    )
+        if joined is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="You are already a member of this group"
+            )
+        await add_member_count(group.id, 1)
     await log_audit(
         "group_joined",
         user_id=current_user.id,
@@ -284,7 +298,7 @@ async def join_group(
         details={"group_name": group.name},
         request=request,
     )
-    member_count = await GroupMember.objects.filter(group=group).count()
+    member_count = group.member_count + 1
     teacher_full_name = f"{group.teacher.first_name} {group.teacher.last_name}".strip() if group.teacher.first_name or group.teacher.last_name else group.teacher.username
     
     return {
@@ -331,6 +345,107 @@ async def get_group_members(
     ]
 
 
+async def _enroll(
+    group_id: int,
+    entries: List[RosterEntry],
+    source: str,
+    request: Request,
+    current_user: User,
+) -> dict:
+    group = await Group.objects.get_or_none(id=group_id)
+
+    if not group:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Group not found"
+        )
+
+    if group.teacher.id != current_user.id and current_user.role not in ("admin", "developer"):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only group owner can enroll members"
+        )
+
+    if len(entries) > settings.max_roster_size:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Roster is limited to {settings.max_roster_size} rows"
+        )
+
+    result = await enroll_roster(group.id, entries)
+    # enrolled students see the group's quizzes
+    await bump_versions(*(user_key(user_id) for user_id in result.pop("enrolled_user_ids")))
+    await log_audit(
+        "members_enrolled",
+        user_id=current_user.id,
+        username=current_user.username,
+        resource_type="group",
+        resource_id=str(group_id),
+        details={
+            "group_name": group.name,
+            "source": source,
+            "rows": len(entries),
+            "enrolled": result["enrolled"],
+            "already_member": result["already_member"],
+            "skipped": result["skipped"],
+        },
+        request=request,
+    )
+    return result
+
+
+@router.post("/{group_id}/members/bulk", response_model=BulkEnrollResponse)
+async def enroll_members(
+    group_id: int,
+    data: BulkEnrollRequest,
+    request: Request,
+    current_user: User = Depends(get_current_teacher)
+):
+    entries = roster_from_lists(data.user_ids, data.usernames, data.emails)
+    return await _enroll(group_id, entries, "list", request, current_user)
+
+
+@router.post("/{group_id}/members/bulk/csv", response_model=BulkEnrollResponse)
+async def enroll_members_csv(
+    group_id: int,
+    request: Request,
+    file: UploadFile = File(...),
+    current_user: User = Depends(get_current_teacher)
+):
+    data = await file.read(MAX_CSV_BYTES + 1)
+    if len(data) > MAX_CSV_BYTES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"CSV must be under {MAX_CSV_BYTES} bytes"
+        )
+    entries = parse_roster_csv(data)
+    return await _enroll(group_id, entries, "csv", request, current_user)
+
+
+@router.get("/{group_id}/gradebook")
+async def get_group_gradebook(
+    group_id: int,
+    request: Request,
+    current_user: User = Depends(get_current_teacher)
+):
+    group = await Group.objects.get_or_none(id=group_id)
+    
+    if not group:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Group not found"
+        )
+    
+    if group.teacher.id != current_user.id and current_user.role not in ("admin", "developer"):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only group owner can view the gradebook"
+        )
+    
+    gradebook = await build_gradebook(group.id)
+    return json_response_with_etag(request, gradebook)
+
+
 @router.delete("/{group_id}/members/{user_id}")
 async def remove_member(
     group_id: int,
@@ -363,7 +478,11 @@ async def remove_member(
         )
     
     removed_username = member.user.username
-    await member.delete()
+    async with database.transaction():
+        if await member.delete():
+            await add_member_count(group.id, -1)
+    # the student loses access to the group's quizzes
+    await bump_versions(user_key(user_id))
 
     await log_audit(
         "member_removed",
@@ -402,7 +521,10 @@ async def leave_group(
             detail="You are not a member of this group"
         )
     
-    await member.delete()
+    async with database.transaction():
+        if await member.delete():
+            await add_member_count(group.id, -1)
+    await bump_versions(user_key(current_user.id))
     await log_audit(
         "group_left",
         user_id=current_user.id,
@@ -1,15 +1,13 @@
-from pathlib import Path
-import uuid
-import os
-
-from fastapi import APIRouter, Depends, HTTPException, status, Request, UploadFile, File
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response, UploadFile, File
+from fastapi.responses import StreamingResponse
+from typing import List, Optional
 from schemas import (
     QuizCreate, QuizUpdate, QuizResponse,
     QuestionCreate, QuestionUpdate, QuestionResponse, QuestionsBatchCreate,
     StartQuizAttempt, SubmitAnswer, CompleteQuizAttempt,
     QuizAttemptResponse, QuizResultResponse,
     AntiCheatingLogResponse, AntiCheatingEventResponse, IdenticalAnswersGroup,
+    QuizStatisticsResponse, ItemAnalysisResponse, ReissueQuizRequest, CloneQuizRequest,
 )
 from app.database.models.quiz import Quiz, Question, Option
 from app.database.models.group import Group, GroupMember
@@ -17,16 +15,31 @@ from app.database.models.attempt import QuizAttempt, Answer, AntiCheatingEvent
 from app.database.models.user import User
 from app.utils.auth import get_current_teacher, get_current_user, get_current_student
 from app.utils.audit import log_audit
-from app.database.database import to_naive_utc
-from config import settings
+from app.utils.quiz_closer import quiz_closer, is_quiz_expired, close_quizzes, sync_quiz_expiry
+from app.utils.quiz_stats import get_quiz_stats, invalidate_quiz_stats
+from app.utils.item_analysis import quiz_item_analysis
+from app.utils.export import quiz_result_rows, EXPORT_WRITERS, EXPORT_MEDIA_TYPES
+from app.utils.counters import add_question_count, recount_questions
+from app.utils.attempts import remove_attempts
+from app.utils.quiz_clone import clone_quiz
+from app.utils.http_cache import (
+    versioned, bump_versions, quiz_key, attempt_key, path_int, current_version,
+)
+from app.utils.serialization import json_bytes_response, trusted_json
+from app.utils.question_payload import get_question_payload, fetch_quiz_questions
+from app.utils.rows import Record, fetch_records, fetch_tuples
+from app.utils.packed_ids import unpack_ids
+from app.utils.uploads import UPLOADS_DIR, save_image_upload, remove_upload, upload_url, blob_collector
+from app.utils.images import make_derivative, QUESTION_IMAGE_SIZE
+from app.database.database import database, to_naive_utc
 from datetime import datetime
-import json
+import sqlalchemy
 
 
 router = APIRouter(prefix="/quizzes", tags=["Quizzes"])
 
 
-UPLOADS_QUESTIONS_DIR = Path(__file__).resolve().parent.parent.parent.parent / "static" / "uploads" / "questions"
+UPLOADS_QUESTIONS_DIR = UPLOADS_DIR / "questions"
 
 
 @router.post("", response_model=QuizResponse)
@@ -48,6 +61,8 @@ async def create_quiz(
             detail="You can only create quizzes in your own groups"
         )
     
+    now = datetime.utcnow()
+    available_until = to_naive_utc(data.available_until) if not data.manual_close else None
     quiz = await Quiz.objects.create(
         title=data.title,
         description=data.description,
@@ -57,8 +72,9 @@ async def create_quiz(
         time_limit=data.time_limit if data.timer_mode == "quiz_total" else None,
         question_time_limit=data.question_time_limit if data.timer_mode == "per_question" else None,
         has_quiz_time_limit=data.timer_mode == "quiz_total",
-        available_until=to_naive_utc(data.available_until) if not data.manual_close else None,
+        available_until=available_until,
         manual_close=data.manual_close,
+        is_expired=bool(not data.manual_close and available_until and available_until < now),
         allow_show_answers=data.allow_show_answers,
         show_results=data.show_results,
         question_display_mode=data.question_display_mode,
@@ -75,8 +91,9 @@ async def create_quiz(
         details={"title": quiz.title, "group_id": group.id},
         request=request,
     )
-    now = datetime.utcnow()
-    is_expired = not quiz.manual_close and quiz.available_until and quiz.available_until < now
+    if quiz.available_until and not quiz.is_expired:
+        quiz_closer.wake()
+    is_expired = quiz.is_expired
     qd = quiz.dict()
     if qd.get("show_results") is None:
         qd["show_results"] = True
@@ -95,6 +112,11 @@ async def create_quiz(
     }
 
 
+async def _quiz_version_keys(request: Request, current_user: User) -> Optional[List[str]]:
+    quiz_id = path_int(request, "quiz_id")
+    return [quiz_key(quiz_id)] if quiz_id is not None else None
+
+
 @router.get("", response_model=List[QuizResponse])
 async def get_quizzes(
     group_id: int = None,
@@ -126,8 +148,8 @@ async def get_quizzes(
     
     result = []
     for quiz in quizzes:
-        question_count = await Question.objects.filter(quiz=quiz).count()
-        is_expired = not quiz.manual_close and quiz.available_until and quiz.available_until < now
+        question_count = quiz.question_count
+        is_expired = quiz.is_expired or is_quiz_expired(quiz, now)
         qd = quiz.dict()
         if qd.get("show_results") is None:
             qd["show_results"] = True
@@ -151,7 +173,8 @@ async def get_quizzes(
 @router.get("/{quiz_id}", response_model=QuizResponse)
 async def get_quiz(
     quiz_id: int,
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    _: None = Depends(versioned(_quiz_version_keys)),
 ):
     now = datetime.utcnow()
     quiz = await Quiz.objects.select_related(["group", "teacher"]).get_or_none(id=quiz_id)
@@ -173,8 +196,8 @@ async def get_quiz(
             detail="Access denied"
         )
     
-    question_count = await Question.objects.filter(quiz=quiz).count()
-    is_expired = not quiz.manual_close and quiz.available_until and quiz.available_until < now
+    question_count = quiz.question_count
+    is_expired = quiz.is_expired or is_quiz_expired(quiz, now)
     qd = quiz.dict()
     if qd.get("show_results") is None:
         qd["show_results"] = True
@@ -193,6 +216,94 @@ async def get_quiz(
     }
 
 
+@router.get("/{quiz_id}/statistics", response_model=QuizStatisticsResponse)
+async def get_quiz_statistics(
+    quiz_id: int,
+    current_user: User = Depends(get_current_teacher)
+):
+    quiz = await Quiz.objects.get_or_none(id=quiz_id)
+    
+    if not quiz:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Quiz not found"
+        )
+    
+    if quiz.teacher.id != current_user.id and current_user.role not in ("admin", "developer"):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied"
+        )
+    
+    return await get_quiz_stats(quiz.id)
+
+
+@router.get("/{quiz_id}/item-analysis", response_model=ItemAnalysisResponse)
+async def get_quiz_item_analysis(
+    quiz_id: int,
+    current_user: User = Depends(get_current_teacher)
+):
+    quiz = await Quiz.objects.get_or_none(id=quiz_id)
+    
+    if not quiz:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Quiz not found"
+        )
+    
+    if quiz.teacher.id != current_user.id and current_user.role not in ("admin", "developer"):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied"
+        )
+    
+    return await quiz_item_analysis(quiz.id)
+
+
+@router.get("/{quiz_id}/results/export")
+async def export_quiz_results(
+    quiz_id: int,
+    request: Request,
+    format: str = "csv",
+    current_user: User = Depends(get_current_teacher)
+):
+    if format not in EXPORT_WRITERS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Unsupported export format"
+        )
+    
+    quiz = await Quiz.objects.get_or_none(id=quiz_id)
+    
+    if not quiz:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Quiz not found"
+        )
+    
+    if quiz.teacher.id != current_user.id and current_user.role not in ("admin", "developer"):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied"
+        )
+    
+    await log_audit(
+        "quiz_results_exported",
+        user_id=current_user.id,
+        username=current_user.username,
+        resource_type="quiz",
+        resource_id=str(quiz_id),
+        details={"format": format},
+        request=request,
+    )
+    
+    return StreamingResponse(
+        EXPORT_WRITERS[format](quiz_result_rows(quiz.id)),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="quiz-{quiz.id}-results.{format}"'},
+    )
+
+
 def _answer_signature(answers_by_question: dict) -> tuple:
     out = []
     for qid in sorted(answers_by_question.keys()):
@@ -259,11 +370,7 @@ async def get_quiz_anti_cheating_log(
             qid = ans.question.id
             inp = ans.question.input_type or "select"
             if inp == "select":
-                try:
-                    ids = json.loads(ans.selected_options or "[]")
-                    by_q[qid] = sorted(ids)
-                except Exception:
-                    by_q[qid] = []
+                by_q[qid] = sorted(unpack_ids(ans.selected_options))
             else:
                 by_q[qid] = (ans.text_answer or "").strip().lower() or "_"
         sig = _answer_signature(by_q)
@@ -317,7 +424,11 @@ async def update_quiz(
         if "available_until" in update_data:
             update_data["available_until"] = to_naive_utc(update_data["available_until"])
         
-        await quiz.update(**update_data)
+        await quiz.update(_columns=list(update_data), **update_data)
+        if "available_until" in update_data or "manual_close" in update_data:
+            await sync_quiz_expiry(quiz, now)
+            quiz_closer.wake()
+        await bump_versions(quiz_key(quiz_id))
         await log_audit(
             "quiz_updated",
             user_id=current_user.id,
@@ -328,8 +439,8 @@ async def update_quiz(
             request=request,
         )
     
-    question_count = await Question.objects.filter(quiz=quiz).count()
-    is_expired = not quiz.manual_close and quiz.available_until and quiz.available_until < now
+    question_count = quiz.question_count
+    is_expired = quiz.is_expired or is_quiz_expired(quiz, now)
     qd = quiz.dict()
     if qd.get("show_results") is None:
         qd["show_results"] = True
@@ -388,6 +499,9 @@ async def delete_quiz(
         await question.delete()
     
     await quiz.delete()
+    await invalidate_quiz_stats([quiz_id])
+    await bump_versions(quiz_key(quiz_id))
+    blob_collector.wake()
 
     await log_audit(
         "quiz_deleted",
@@ -402,6 +516,21 @@ async def delete_quiz(
     return {"message": "Quiz deleted successfully"}
 
 
+def _validate_new_options(data) -> None:
+    if data.input_type != "select":
+        return
+    if not data.options:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="At least one option is required for select type"
+        )
+    if sum(1 for o in data.options if o.is_correct) < 1:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="At least one correct answer must be selected"
+        )
+
+
 @router.post("/{quiz_id}/questions", response_model=QuestionResponse)
 async def create_question(
     quiz_id: int,
@@ -423,37 +552,30 @@ async def create_question(
             detail="Access denied"
         )
     
-    question = await Question.objects.create(
-        quiz=quiz,
-        question_type="single_choice",
-        input_type=data.input_type,
-        text=data.text,
-        order=data.order,
-        points=data.points,
-        correct_text_answer=data.correct_text_answer if data.input_type in ("text", "number") else None
-    )
-    
-    options = []
-    if data.input_type == "select":
-        if not data.options:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="At least one option is required for select type"
-            )
-        correct_count_opts = sum(1 for o in data.options if o.is_correct)
-        if correct_count_opts < 1:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="At least one correct answer must be selected"
-            )
-        for opt_data in data.options:
-            option = await Option.objects.create(
-                question=question,
-                text=opt_data.text,
-                is_correct=opt_data.is_correct,
-                order=opt_data.order
-            )
-            options.append(option)
+    _validate_new_options(data)
+    async with database.transaction():
+        question = await Question.objects.create(
+            quiz=quiz,
+            question_type="single_choice",
+            input_type=data.input_type,
+            text=data.text,
+            order=data.order,
+            points=data.points,
+            correct_text_answer=data.correct_text_answer if data.input_type in ("text", "number") else None
+        )
+        await add_question_count(quiz.id, 1)
+        
+        options = []
+        if data.input_type == "select":
+            for opt_data in data.options:
+                option = await Option.objects.create(
+                    question=question,
+                    text=opt_data.text,
+                    is_correct=opt_data.is_correct,
+                    order=opt_data.order
+                )
+                options.append(option)
+    await bump_versions(quiz_key(quiz.id))
 
     await log_audit(
         "question_created",
@@ -497,49 +619,45 @@ async def create_questions_batch(
             detail="Access denied"
         )
     
+    for q_data in data.questions:
+        _validate_new_options(q_data)
+    
     created_questions = []
     
-    for q_data in data.questions:
-        question = await Question.objects.create(
-            quiz=quiz,
-            question_type="single_choice",
-            input_type=q_data.input_type,
-            text=q_data.text,
-            order=q_data.order,
-            points=q_data.points,
-            correct_text_answer=q_data.correct_text_answer if q_data.input_type in ("text", "number") else None
-        )
-        
-        options = []
-        if q_data.input_type == "select":
-            if not q_data.options:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="At least one option is required for select type"
-                )
-            if sum(1 for o in q_data.options if o.is_correct) < 1:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="At least one correct answer must be selected"
-                )
-            for opt_data in q_data.options:
-                option = await Option.objects.create(
-                    question=question,
-                    text=opt_data.text,
-                    is_correct=opt_data.is_correct,
-                    order=opt_data.order
-                )
-                options.append(option)
-        
-        correct_count = sum(1 for o in options if o.is_correct)
-        is_multiple_choice = correct_count > 1
-        
-        created_questions.append({
-            **question.dict(),
-            "quiz_id": quiz.id,
-            "options": [opt.dict() for opt in options],
-            "is_multiple_choice": is_multiple_choice
-        })
+    async with database.transaction():
+        for q_data in data.questions:
+            question = await Question.objects.create(
+                quiz=quiz,
+                question_type="single_choice",
+                input_type=q_data.input_type,
+                text=q_data.text,
+                order=q_data.order,
+                points=q_data.points,
+                correct_text_answer=q_data.correct_text_answer if q_data.input_type in ("text", "number") else None
+            )
+            
+            options = []
+            if q_data.input_type == "select":
+                for opt_data in q_data.options:
+                    option = await Option.objects.create(
+                        question=question,
+                        text=opt_data.text,
+                        is_correct=opt_data.is_correct,
+                        order=opt_data.order
+                    )
+                    options.append(option)
+            
+            correct_count = sum(1 for o in options if o.is_correct)
+            is_multiple_choice = correct_count > 1
+            
+            created_questions.append({
+                **question.dict(),
+                "quiz_id": quiz.id,
+                "options": [opt.dict() for opt in options],
+                "is_multiple_choice": is_multiple_choice
+            })
+        await add_question_count(quiz.id, len(data.questions))
+    await bump_versions(quiz_key(quiz.id))
     
     await log_audit(
         "questions_batch_created",
@@ -557,8 +675,13 @@ async def create_questions_batch(
 @router.get("/{quiz_id}/questions", response_model=List[QuestionResponse])
 async def get_questions(
     quiz_id: int,
-    current_user: User = Depends(get_current_user)
+    request: Request,
+    response: Response,
+    attempt_id: Optional[int] = None,
+    current_user: User = Depends(get_current_user),
+    _: None = Depends(versioned(_quiz_version_keys)),
 ):
+    """Questions of a quiz; with attempt_id, in that attempt's shuffled order."""
     quiz = await Quiz.objects.select_related("group").get_or_none(id=quiz_id)
     
     if not quiz:
@@ -578,33 +701,22 @@ async def get_questions(
             detail="Access denied"
         )
     
-    questions = await Question.objects.filter(quiz=quiz).order_by("order").all()
-    
-    result = []
-    for question in questions:
-        options = await Option.objects.filter(question=question).order_by("order").all()
-        correct_count = sum(1 for o in options if o.is_correct)
-        is_multiple_choice = correct_count > 1
-        
-        options_data = []
-        for opt in options:
-            opt_dict = opt.dict()
-            if current_user.role == "student":
-                opt_dict["is_correct"] = False
-            options_data.append(opt_dict)
-        
-        q_dict = question.dict()
-        if current_user.role == "student":
-            q_dict["correct_text_answer"] = None
-        
-        result.append({
-            **q_dict,
-            "quiz_id": quiz.id,
-            "options": options_data,
-            "is_multiple_choice": is_multiple_choice
-        })
+    order = None
+    if attempt_id is not None:
+        attempt = await QuizAttempt.objects.get_or_none(
+            id=attempt_id, quiz=quiz.id, student=current_user.id
+        )
+        if not attempt:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Attempt not found"
+            )
+        if attempt.questions_order is not None:
+            order = unpack_ids(attempt.questions_order)
     
-    return result
+    version = await current_version(request, quiz_key(quiz.id))
+    payload = await get_question_payload(quiz.id, version, current_user.role == "student")
+    return json_bytes_response(payload.body(order), response)
 
 
 @router.patch("/{quiz_id}/questions/{question_id}")
@@ -673,6 +785,7 @@ async def update_question(
             details={"quiz_id": quiz_id},
             request=request,
         )
+    await bump_versions(quiz_key(quiz_id))
     
     return {"message": "Question updated successfully"}
 
@@ -694,35 +807,18 @@ async def upload_question_image(
     if not question:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Question not found")
 
-    content_type = file.content_type or ""
-    if content_type not in settings.allowed_image_types:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Allowed types: {', '.join(settings.allowed_image_types)}"
-        )
-    contents = await file.read()
-    if len(contents) > settings.max_image_size:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Image must be under {settings.max_image_size} bytes"
-        )
-    ext = {"image/jpeg": ".jpg", "image/png": ".png", "image/gif": ".gif", "image/webp": ".webp"}.get(content_type, ".jpg")
-    filename = f"{question_id}_{uuid.uuid4().hex[:12]}{ext}"
-    UPLOADS_QUESTIONS_DIR.mkdir(parents=True, exist_ok=True)
-    filepath = UPLOADS_QUESTIONS_DIR / filename
-    with open(filepath, "wb") as f:
-        f.write(contents)
-    url_path = f"/uploads/questions/{filename}"
-    old_url = question.image_url
-    await question.update(image_url=url_path)
-    if old_url and old_url.startswith("/uploads/questions/"):
-        old_name = old_url.split("/")[-1]
-        old_path = UPLOADS_QUESTIONS_DIR / old_name
-        if old_path.exists():
-            try:
-                os.remove(old_path)
-            except OSError:
-                pass
+    path = await save_image_upload(file)
+    display_name = await make_derivative(path, QUESTION_IMAGE_SIZE)
+    url_path = upload_url(path)
+    display_url = upload_url(path.with_name(display_name)) if display_name else None
+    old_urls = (question.image_url, question.image_display_url)
+    await question.update(
+        _columns=["image_url", "image_display_url"], image_url=url_path, image_display_url=display_url
+    )
+    await bump_versions(quiz_key(quiz_id))
+    for old_url in old_urls:
+        await remove_upload(old_url, UPLOADS_QUESTIONS_DIR)
+    blob_collector.wake()
     await log_audit(
         "question_image_uploaded",
         user_id=current_user.id,
@@ -732,7 +828,7 @@ async def upload_question_image(
         details={"quiz_id": quiz_id},
         request=request,
     )
-    return {"image_url": url_path}
+    return {"image_url": url_path, "image_display_url": display_url}
 
 
 @router.delete("/{quiz_id}/questions/{question_id}/image")
@@ -750,16 +846,12 @@ async def delete_question_image(
     question = await Question.objects.get_or_none(id=question_id, quiz=quiz)
     if not question:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Question not found")
-    old_url = question.image_url
-    await question.update(image_url=None)
-    if old_url and old_url.startswith("/uploads/questions/"):
-        old_name = old_url.split("/")[-1]
-        old_path = UPLOADS_QUESTIONS_DIR / old_name
-        if old_path.exists():
-            try:
-                os.remove(old_path)
-            except OSError:
-                pass
+    old_urls = (question.image_url, question.image_display_url)
+    await question.update(_columns=["image_url", "image_display_url"], image_url=None, image_display_url=None)
+    await bump_versions(quiz_key(quiz_id))
+    for old_url in old_urls:
+        await remove_upload(old_url, UPLOADS_QUESTIONS_DIR)
+    blob_collector.wake()
     await log_audit(
         "question_image_deleted",
         user_id=current_user.id,
@@ -800,18 +892,16 @@ async def delete_question(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Question not found"
         )
-    old_image_url = question.image_url
+    old_image_urls = (question.image_url, question.image_display_url)
     await Answer.objects.filter(question=question).delete()
     await Option.objects.filter(question=question).delete()
-    await question.delete()
-    if old_image_url and old_image_url.startswith("/uploads/questions/"):
-        old_name = old_image_url.split("/")[-1]
-        old_path = UPLOADS_QUESTIONS_DIR / old_name
-        if old_path.exists():
-            try:
-                os.remove(old_path)
-            except OSError:
-                pass
+    if await question.delete():
+        await add_question_count(quiz.id, -1)
+    await invalidate_quiz_stats([quiz_id])
+    await bump_versions(quiz_key(quiz_id))
+    for old_image_url in old_image_urls:
+        await remove_upload(old_image_url, UPLOADS_QUESTIONS_DIR)
+    blob_collector.wake()
 
     await log_audit(
         "question_deleted",
@@ -853,6 +943,10 @@ async def delete_all_questions(
         await Answer.objects.filter(question=question).delete()
         await Option.objects.filter(question=question).delete()
         await question.delete()
+    await recount_questions([quiz_id])
+    await invalidate_quiz_stats([quiz_id])
+    await bump_versions(quiz_key(quiz_id))
+    blob_collector.wake()
     
     await log_audit(
         "all_questions_deleted",
@@ -867,6 +961,10 @@ async def delete_all_questions(
     return {"message": f"Deleted {deleted_count} questions", "deleted_count": deleted_count}
 
 
+class _StatusAttempt(Record):
+    __slots__ = ("id", "student", "score", "max_score", "is_completed", "needs_manual_grading")
+
+
 @router.get("/{quiz_id}/student-statuses")
 async def get_student_statuses(
     quiz_id: int,
@@ -887,26 +985,50 @@ async def get_student_statuses(
         )
     
     now = datetime.utcnow()
-    is_expired = not quiz.manual_close and quiz.available_until and quiz.available_until < now
-    
-    members = await GroupMember.objects.select_related("user").filter(group=quiz.group).all()
-    questions = await Question.objects.filter(quiz=quiz).all()
-    total_questions = len(questions)
+    is_expired = quiz.is_expired or is_quiz_expired(quiz, now)
+    
+    members = GroupMember.ormar_config.table
+    users = User.ormar_config.table
+    attempts = QuizAttempt.ormar_config.table
+    answers = Answer.ormar_config.table
+    students = await fetch_tuples(
+        sqlalchemy.select(users.c.id, users.c.first_name, users.c.last_name, users.c.username)
+        .select_from(members.join(users, members.c.user == users.c.id))
+        .where(members.c.group == quiz.group.id)
+        .order_by(members.c.id)
+    )
+    attempt_of = {}
+    for attempt in await fetch_records(
+        _StatusAttempt,
+        sqlalchemy.select(*_StatusAttempt.columns(attempts))
+        .where(attempts.c.quiz == quiz.id)
+        .order_by(attempts.c.id),
+    ):
+        attempt_of.setdefault(attempt.student, attempt)
+    answer_totals = {
+        row[0]: (row[1], row[2])
+        for row in await fetch_tuples(
+            sqlalchemy.select(
+                answers.c.attempt,
+                sqlalchemy.func.count(),
+                sqlalchemy.func.coalesce(sqlalchemy.func.sum(answers.c.time_spent), 0),
+            )
+            .select_from(answers.join(attempts, answers.c.attempt == attempts.c.id))
+            .where(attempts.c.quiz == quiz.id)
+            .group_by(answers.c.attempt)
+        )
+    }
+    total_questions = quiz.question_count
     
     result = []
-    for member in members:
-        student = member.user
-        student_name = f"{student.first_name or ''} {student.last_name or ''}".strip() or student.username
-        attempt = None
-        try:
-            attempt = await QuizAttempt.objects.filter(quiz=quiz, student=student).first()
-        except:
-            pass
+    for student_id, first_name, last_name, username in students:
+        student_name = f"{first_name or ''} {last_name or ''}".strip() or username
+        attempt = attempt_of.get(student_id)
         
         if not attempt:
             status = "expired" if is_expired else "not_opened"
             result.append({
-                "student_id": student.id,
+                "student_id": student_id,
                 "student_name": student_name,
                 "status": status,
                 "score": None,
@@ -916,10 +1038,7 @@ async def get_student_statuses(
                 "avg_time_per_answer": None
             })
         else:
-            answers = await Answer.objects.filter(attempt=attempt).all()
-            answered_count = len(answers)
-            
-            total_time = sum(a.time_spent or 0 for a in answers)
+            answered_count, total_time = answer_totals.get(attempt.id, (0, 0))
             avg_time = total_time / answered_count if answered_count > 0 else None
             
             if attempt.is_completed:
@@ -932,7 +1051,7 @@ async def get_student_statuses(
                 status = "opened"
             
             result.append({
-                "student_id": student.id,
+                "student_id": student_id,
                 "student_name": student_name,
                 "status": status,
                 "score": attempt.score,
@@ -941,10 +1060,10 @@ async def get_student_statuses(
                 "total_questions": total_questions,
                 "avg_time_per_answer": avg_time,
                 "attempt_id": attempt.id,
-                "needs_manual_grading": getattr(attempt, "needs_manual_grading", False),
+                "needs_manual_grading": bool(attempt.needs_manual_grading),
             })
     
-    return result
+    return trusted_json(result)
 
 
 @router.get("/{quiz_id}/student-detail/{student_id}")
@@ -981,63 +1100,66 @@ async def get_student_detail(
         attempt = await QuizAttempt.objects.filter(quiz=quiz, student=student).first()
     except:
         pass
-    questions = await Question.objects.filter(quiz=quiz).order_by("order").all()
+    question_rows, options_of = await fetch_quiz_questions(quiz.id)
+    answer_of = {}
+    if attempt:
+        answers = Answer.ormar_config.table
+        answer_rows = await database.fetch_all(
+            sqlalchemy.select(
+                answers.c.question,
+                answers.c.id,
+                answers.c.selected_options,
+                answers.c.is_correct,
+                answers.c.points_earned,
+                answers.c.time_spent,
+                answers.c.text_answer,
+                answers.c.manually_graded,
+            )
+            .where(answers.c.attempt == attempt.id)
+            .order_by(answers.c.id.desc())
+        )
+        # the first answer per question wins, as with .first() before
+        answer_of = {row[0]: row for row in answer_rows}
     
     question_details = []
-    for q in questions:
-        options = await Option.objects.filter(question=q).order_by("order").all()
+    for q in question_rows:
+        input_type = q[1] or "select"
+        answer = answer_of.get(q[0])
         
-        answer = None
-        if attempt:
-            try:
-                answer = await Answer.objects.filter(attempt=attempt, question=q).first()
-            except:
-                pass
+        selected_options = unpack_ids(answer[2]) if answer else []
         
-        selected_options = []
-        if answer and answer.selected_options:
-            try:
-                selected_options = json.loads(answer.selected_options) if isinstance(answer.selected_options, str) else answer.selected_options
-            except:
-                selected_options = []
-        
-        is_correct = answer.is_correct if answer else None
-        points_earned = answer.points_earned if answer else 0
-        time_spent = answer.time_spent if answer else None
-        text_answer = answer.text_answer if answer else None
-        
-        needs_manual_grading = (q.input_type or "select") == "text" and answer is not None and not getattr(answer, "manually_graded", False)
+        manually_graded = bool(answer[7]) if answer else False
         question_details.append({
-            "question_id": q.id,
-            "question_text": q.text,
-            "input_type": q.input_type or "select",
-            "points": q.points,
-            "correct_text_answer": q.correct_text_answer,
+            "question_id": q[0],
+            "question_text": q[2],
+            "input_type": input_type,
+            "points": q[4],
+            "correct_text_answer": q[5],
             "options": [
                 {
-                    "id": o.id,
-                    "text": o.text,
-                    "is_correct": o.is_correct,
-                    "was_selected": o.id in selected_options
+                    "id": o[1],
+                    "text": o[2],
+                    "is_correct": bool(o[3]),
+                    "was_selected": o[1] in selected_options
                 }
-                for o in options
+                for o in options_of.get(q[0], [])
             ],
             "answered": answer is not None,
-            "is_correct": is_correct,
-            "points_earned": points_earned,
-            "time_spent": time_spent,
-            "text_answer": text_answer,
+            "is_correct": answer[3] if answer else None,
+            "points_earned": answer[4] if answer else 0,
+            "time_spent": answer[5] if answer else None,
+            "text_answer": answer[6] if answer else None,
             "selected_option_ids": selected_options,
-            "answer_id": answer.id if answer else None,
-            "needs_manual_grading": needs_manual_grading,
-            "manually_graded": getattr(answer, "manually_graded", False) if answer else False,
+            "answer_id": answer[1] if answer else None,
+            "needs_manual_grading": input_type == "text" and answer is not None and not manually_graded,
+            "manually_graded": manually_graded,
         })
     
     total_time = sum(q["time_spent"] or 0 for q in question_details if q["answered"])
     answered_count = sum(1 for q in question_details if q["answered"])
     correct_count = sum(1 for q in question_details if q["is_correct"])
     
-    return {
+    return trusted_json({
         "student_id": student_id,
         "student_name": student_name,
         "attempt_id": attempt.id if attempt else None,
@@ -1045,26 +1167,96 @@ async def get_student_detail(
         "completed_at": attempt.completed_at.isoformat() if attempt and attempt.completed_at else None,
         "is_completed": attempt.is_completed if attempt else False,
         "score": attempt.score if attempt else 0,
-        "max_score": attempt.max_score if attempt else sum(q.points for q in questions),
+        "max_score": attempt.max_score if attempt else sum(q[4] for q in question_rows),
         "total_time": total_time,
         "answered_count": answered_count,
         "correct_count": correct_count,
-        "total_questions": len(questions),
+        "total_questions": len(question_rows),
         "questions": question_details,
         "needs_manual_grading": getattr(attempt, "needs_manual_grading", False) if attempt else False,
         "allow_math": getattr(quiz, "allow_math", False),
+    })
+
+
+@router.post("/{quiz_id}/clone", response_model=QuizResponse)
+async def clone_quiz_to_group(
+    quiz_id: int,
+    data: CloneQuizRequest,
+    request: Request,
+    current_user: User = Depends(get_current_teacher)
+):
+    quiz = await Quiz.objects.get_or_none(id=quiz_id)
+    
+    if not quiz:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Quiz not found"
+        )
+    
+    if quiz.teacher.id != current_user.id and current_user.role not in ("admin", "developer"):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied"
+        )
+    
+    group = await Group.objects.get_or_none(id=data.group_id)
+    if not group:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Group not found"
+        )
+    
+    if group.teacher.id != current_user.id and current_user.role not in ("admin", "developer"):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You can only create quizzes in your own groups"
+        )
+    
+    new_quiz_id = await clone_quiz(
+        quiz_id,
+        group.id,
+        current_user.id,
+        title=data.title,
+        available_until=data.available_until,
+        manual_close=data.manual_close,
+    )
+    clone = await Quiz.objects.get(id=new_quiz_id)
+    await log_audit(
+        "quiz_cloned",
+        user_id=current_user.id,
+        username=current_user.username,
+        resource_type="quiz",
+        resource_id=str(new_quiz_id),
+        details={"source_quiz_id": quiz_id, "group_id": group.id, "questions": clone.question_count},
+        request=request,
+    )
+    if clone.available_until and not clone.is_expired:
+        quiz_closer.wake()
+    qd = clone.dict()
+    if qd.get("show_results") is None:
+        qd["show_results"] = True
+    if qd.get("question_display_mode") is None:
+        qd["question_display_mode"] = "all_on_page"
+    if qd.get("anti_cheating_mode") is None:
+        qd["anti_cheating_mode"] = False
+    if qd.get("allow_math") is None:
+        qd["allow_math"] = False
+    return {
+        **qd,
+        "group_id": group.id,
+        "teacher_id": current_user.id,
+        "question_count": clone.question_count,
+        "is_expired": clone.is_expired
     }
 
 
 @router.post("/{quiz_id}/reissue")
 async def reissue_quiz(
     quiz_id: int,
-    data: dict,
+    data: ReissueQuizRequest,
     request: Request,
     current_user: User = Depends(get_current_teacher)
 ):
-    from schemas import ReissueQuizRequest
-    
     quiz = await Quiz.objects.get_or_none(id=quiz_id)
     
     if not quiz:
@@ -1079,21 +1271,23 @@ async def reissue_quiz(
             detail="Access denied"
         )
     
-    student_ids = data.get("student_ids", [])
-    new_available_until = data.get("new_available_until")
+    student_ids = data.student_ids
+    new_available_until = data.new_available_until
     
-    if new_available_until:
-        new_available_until = datetime.fromisoformat(new_available_until.replace("Z", "+00:00")).replace(tzinfo=None)
-    
-    for student_id in student_ids:
-        attempts = await QuizAttempt.objects.filter(quiz=quiz, student=student_id).all()
-        for attempt in attempts:
-            await AntiCheatingEvent.objects.filter(attempt=attempt).delete()
-            await Answer.objects.filter(attempt=attempt).delete()
-            await attempt.delete()
+    removed = await remove_attempts(
+        quiz_id, student_ids, archive=data.archive, archived_by=current_user.id
+    )
+    await invalidate_quiz_stats([quiz_id])
     
     if new_available_until:
-        await quiz.update(available_until=new_available_until, manual_close=False)
+        await quiz.update(
+            _columns=["available_until", "manual_close"],
+            available_until=new_available_until,
+            manual_close=False,
+        )
+        await sync_quiz_expiry(quiz, datetime.utcnow())
+        quiz_closer.wake()
+    await bump_versions(quiz_key(quiz_id), *(attempt_key(attempt_id) for attempt_id in removed))
     
     await log_audit(
         "quiz_reissued",
@@ -1101,7 +1295,12 @@ async def reissue_quiz(
         username=current_user.username,
         resource_type="quiz",
         resource_id=str(quiz_id),
-        details={"student_ids": student_ids, "new_available_until": str(new_available_until)},
+        details={
+            "student_ids": student_ids,
+            "new_available_until": str(new_available_until),
+            "attempts_removed": len(removed),
+            "archived": data.archive,
+        },
         request=request,
     )
     
@@ -1129,7 +1328,8 @@ async def close_quiz_early(
         )
     
     now = datetime.utcnow()
-    await quiz.update(available_until=now, manual_close=False)
+    await quiz.update(_columns=["available_until", "manual_close"], available_until=now, manual_close=False)
+    await close_quizzes([quiz.id], now)
     
     await log_audit(
         "quiz_closed_early",
@@ -0,0 +1,195 @@
+import heapq
+from datetime import datetime, timedelta
+from typing import Optional, Dict, List, Tuple
+
+import sqlalchemy
+
+from app.database.database import database, utc_now
+from app.database.models.attempt import QuizAttempt, AttemptStatus
+from app.database.models.quiz import Quiz, TimerMode
+from app.utils.attempts import finalize_attempts
+from app.utils.audit import log_audit
+from app.utils.jobs import PeriodicJob
+from app.utils.packed_ids import count_ids, index_of
+from config import settings
+
+
+TIMED_MODES = (TimerMode.QUIZ_TOTAL.value, TimerMode.PER_QUESTION.value)
+
+
+def compute_deadline(
+    started_at: datetime,
+    timer_mode: Optional[str],
+    time_limit: Optional[int],
+    question_time_limit: Optional[int],
+    questions_order: Optional[bytes],
+) -> Optional[datetime]:
+    """Moment an attempt runs out of time, or None for untimed quizzes.
+
+    For per-question timers the whole attempt is bounded by one limit per question.
+    """
+    if started_at is None:
+        return None
+    if timer_mode == TimerMode.QUIZ_TOTAL.value and time_limit:
+        return started_at + timedelta(seconds=time_limit)
+    if timer_mode == TimerMode.PER_QUESTION.value and question_time_limit:
+        count = max(count_ids(questions_order), 1)
+        return started_at + timedelta(seconds=question_time_limit * count)
+    return None
+
+
+def attempt_deadline(attempt: QuizAttempt, quiz: Quiz) -> Optional[datetime]:
+    return compute_deadline(
+        attempt.started_at,
+        quiz.timer_mode,
+        quiz.time_limit,
+        quiz.question_time_limit,
+        attempt.questions_order,
+    )
+
+
+def question_deadline(attempt: QuizAttempt, quiz: Quiz, question_id: int) -> Optional[datetime]:
+    """Latest moment an answer to question_id can be given under a per-question timer.
+
+    Questions are shown in questions_order and each gets at most
+    question_time_limit seconds, so the question at position p must be
+    answered before started_at + (p + 1) * limit.
+    """
+    if quiz.timer_mode != TimerMode.PER_QUESTION.value or not quiz.question_time_limit:
+        return None
+    position = index_of(attempt.questions_order, question_id)
+    if position is None:
+        return None
+    return attempt.started_at + timedelta(seconds=quiz.question_time_limit * (position + 1))
+
+
+def is_past(deadline: Optional[datetime], now: datetime) -> bool:
+    return deadline is not None and now > deadline + timedelta(seconds=settings.timer_grace_seconds)
+
+
+class AttemptTimer(PeriodicJob):
+    """Expires timed attempts once their deadline (plus grace) has passed.
+
+    The leader keeps a min-heap of (deadline, attempt_id). New attempts are
+    picked up by polling past the highest attempt id seen, and the heap is
+    rebuilt from the database whenever leadership is (re)acquired.
+    """
+
+    name = "attempt_timer"
+    resync_seconds = 300.0
+
+    def __init__(self):
+        super().__init__()
+        self.interval = settings.timer_poll_seconds
+        self._heap: List[Tuple[datetime, int]] = []
+        self._deadlines: Dict[int, datetime] = {}
+        self._last_seen_id = 0
+        self._synced_at: Optional[datetime] = None
+
+    def _schedule(self, attempt_id: int, deadline: datetime) -> None:
+        self._deadlines[attempt_id] = deadline
+        heapq.heappush(self._heap, (deadline, attempt_id))
+
+    def _select_open(self):
+        attempts = QuizAttempt.ormar_config.table
+        quizzes = Quiz.ormar_config.table
+        return (
+            sqlalchemy.select(
+                attempts.c.id,
+                attempts.c.started_at,
+                attempts.c.questions_order,
+                quizzes.c.timer_mode,
+                quizzes.c.time_limit,
+                quizzes.c.question_time_limit,
+            )
+            .select_from(attempts.join(quizzes, attempts.c.quiz == quizzes.c.id))
+            .where(attempts.c.is_completed.is_(False))
+            .where(quizzes.c.timer_mode.in_(TIMED_MODES))
+        )
+
+    @staticmethod
+    def _row_deadline(row) -> Optional[datetime]:
+        deadline = compute_deadline(
+            row["started_at"],
+            row["timer_mode"],
+            row["time_limit"],
+            row["question_time_limit"],
+            row["questions_order"],
+        )
+        if deadline is None:
+            return None
+        return deadline + timedelta(seconds=settings.timer_grace_seconds)
+
+    async def on_acquire(self) -> None:
+        self._heap.clear()
+        self._deadlines.clear()
+        self._last_seen_id = 0
+        self._synced_at = None
+
+    async def on_release(self) -> None:
+        await self.on_acquire()
+
+    async def _load_new_attempts(self) -> None:
+        attempts = QuizAttempt.ormar_config.table
+        rows = await database.fetch_all(
+            self._select_open()
+            .where(attempts.c.id > self._last_seen_id)
+            .order_by(attempts.c.id)
+        )
+        for row in rows:
+            self._last_seen_id = max(self._last_seen_id, row["id"])
+            deadline = self._row_deadline(row)
+            if deadline is not None and self._deadlines.get(row["id"]) != deadline:
+                self._schedule(row["id"], deadline)
+
+    async def _expire_due(self, now: datetime) -> None:
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            deadline, attempt_id = heapq.heappop(self._heap)
+            if self._deadlines.get(attempt_id) != deadline:
+                continue
+            del self._deadlines[attempt_id]
+            due.append(attempt_id)
+        if not due:
+            return
+
+        # quiz limits may have changed since the attempt was scheduled
+        attempts = QuizAttempt.ormar_config.table
+        rows = await database.fetch_all(self._select_open().where(attempts.c.id.in_(due)))
+        expired = []
+        for row in rows:
+            deadline = self._row_deadline(row)
+            if deadline is None:
+                continue
+            if deadline > now:
+                self._schedule(row["id"], deadline)
+            else:
+                expired.append(row["id"])
+        if not expired:
+            return
+
+        expired = await finalize_attempts(
+            attempts.c.id.in_(expired), now, status=AttemptStatus.EXPIRED.value
+        )
+        if expired:
+            await log_audit(
+                "attempts_expired",
+                resource_type="attempt",
+                details={"attempt_ids": expired, "reason": "time_limit"},
+            )
+
+    async def run_once(self) -> Optional[float]:
+        now = utc_now()
+        if self._synced_at is None or (now - self._synced_at).total_seconds() > self.resync_seconds:
+            # rescan from the start to catch attempts whose quiz became timed later
+            self._last_seen_id = 0
+            self._synced_at = now
+        await self._load_new_attempts()
+        now = utc_now()
+        await self._expire_due(now)
+        if not self._heap:
+            return None
+        return (self._heap[0][0] - utc_now()).total_seconds()
+
+
+attempt_timer = AttemptTimer()
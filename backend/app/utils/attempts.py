@@ -0,0 +1,155 @@
+from datetime import datetime
+from typing import Optional, Any, List, Iterable
+
+import sqlalchemy
+
+from app.database.database import database, dialect_insert, utc_now
+from app.database.models.attempt import (
+    QuizAttempt, Answer, AntiCheatingEvent, AttemptStatus,
+    ArchivedAttempt, ArchivedAnswer, ArchivedAntiCheatingEvent,
+)
+from app.database.models.quiz import Question
+from app.utils.quiz_stats import record_completed_attempts
+
+
+async def insert_answer_once(attempt_id: int, question_id: int, **values: Any) -> Optional[int]:
+    """Insert an answer unless one already exists for (attempt, question).
+
+    Returns the new answer id, or None when the question was already answered.
+    """
+    table = Answer.ormar_config.table
+    query = (
+        dialect_insert(table)
+        .values(attempt=attempt_id, question=question_id, **values)
+        .on_conflict_do_nothing(index_elements=[table.c.attempt, table.c.question])
+        .returning(table.c.id)
+    )
+    return await database.fetch_val(query)
+
+
+async def add_attempt_score(attempt_id: int, points: float, **values: Any) -> Optional[float]:
+    """Atomically add points to an attempt's score and return the new score."""
+    table = QuizAttempt.ormar_config.table
+    query = (
+        table.update()
+        .where(table.c.id == attempt_id)
+        .values(score=table.c.score + points, **values)
+        .returning(table.c.score)
+    )
+    return await database.fetch_val(query)
+
+
+def seconds_between(start, end):
+    """SQL expression for whole seconds between two datetime expressions."""
+    if isinstance(end, datetime):
+        end = sqlalchemy.literal(end, sqlalchemy.DateTime())
+    if database.url.dialect == "postgresql":
+        diff = sqlalchemy.func.extract("epoch", end - start)
+    else:
+        diff = (sqlalchemy.func.julianday(end) - sqlalchemy.func.julianday(start)) * 86400
+    return sqlalchemy.cast(diff, sqlalchemy.Integer)
+
+
+async def finalize_attempts(
+    condition,
+    ended_at,
+    status: str = AttemptStatus.EXPIRED.value,
+) -> List[int]:
+    """Complete every open attempt matching condition in one UPDATE.
+
+    ended_at is a datetime or a SQL expression correlated with the attempts
+    table. time_spent and needs_manual_grading are computed in SQL, so the
+    cost does not depend on how many attempts are closed. The attempts are
+    folded into the quiz statistics. Returns the finalized ids.
+    """
+    attempts = QuizAttempt.ormar_config.table
+    questions = Question.ormar_config.table
+    has_text_questions = (
+        sqlalchemy.exists()
+        .where(questions.c.quiz == attempts.c.quiz)
+        .where(questions.c.input_type == "text")
+    )
+    query = (
+        attempts.update()
+        .where(attempts.c.is_completed.is_(False))
+        .where(condition)
+        .values(
+            completed_at=ended_at,
+            time_spent=seconds_between(attempts.c.started_at, ended_at),
+            is_completed=True,
+            status=status,
+            needs_manual_grading=has_text_questions,
+        )
+        .returning(attempts.c.id)
+    )
+    async with database.transaction():
+        rows = await database.fetch_all(query)
+        attempt_ids = [row[0] for row in rows]
+        await record_completed_attempts(attempt_ids)
+    return attempt_ids
+
+
+async def _archive_attempts(condition, archived_by: Optional[int]) -> None:
+    attempts = QuizAttempt.ormar_config.table
+    archived = ArchivedAttempt.ormar_config.table
+    copied = [column.name for column in attempts.c if column.name != "id"]
+    rows = await database.fetch_all(
+        archived.insert()
+        .from_select(
+            ["attempt_id", *copied, "archived_at", "archived_by"],
+            sqlalchemy.select(
+                attempts.c.id,
+                *(attempts.c[name] for name in copied),
+                sqlalchemy.literal(utc_now(), sqlalchemy.DateTime()),
+                sqlalchemy.literal(archived_by, sqlalchemy.Integer()),
+            ).where(condition),
+        )
+        .returning(archived.c.id)
+    )
+    if not rows:
+        return
+    # the rows just written, one per attempt, link the children to the copies
+    fresh = archived.c.id.in_([row[0] for row in rows])
+    for source, target in (
+        (Answer.ormar_config.table, ArchivedAnswer.ormar_config.table),
+        (AntiCheatingEvent.ormar_config.table, ArchivedAntiCheatingEvent.ormar_config.table),
+    ):
+        columns = [column.name for column in source.c if column.name not in ("id", "attempt")]
+        await database.execute(
+            target.insert().from_select(
+                ["attempt", *columns],
+                sqlalchemy.select(archived.c.id, *(source.c[name] for name in columns))
+                .select_from(source.join(archived, archived.c.attempt_id == source.c.attempt))
+                .where(fresh),
+            )
+        )
+
+
+async def remove_attempts(
+    quiz_id: int,
+    student_ids: Iterable[int],
+    archive: bool = False,
+    archived_by: Optional[int] = None,
+) -> List[int]:
+    """Delete the students' attempts at a quiz, with their answers and events.
+
+    Three set-based DELETEs keyed by the matching attempts, in one
+    transaction, so the statement count does not grow with the cohort.
+    With archive, the rows are first copied into the *_archive tables by
+    INSERT ... SELECT. Returns the removed attempt ids.
+    """
+    attempts = QuizAttempt.ormar_config.table
+    condition = sqlalchemy.and_(
+        attempts.c.quiz == quiz_id,
+        attempts.c.student.in_(sorted(set(student_ids))),
+    )
+    selected = sqlalchemy.select(attempts.c.id).where(condition)
+    async with database.transaction():
+        if archive:
+            await _archive_attempts(condition, archived_by)
+        for table in (AntiCheatingEvent.ormar_config.table, Answer.ormar_config.table):
+            await database.execute(table.delete().where(table.c.attempt.in_(selected)))
+        rows = await database.fetch_all(
+            attempts.delete().where(condition).returning(attempts.c.id)
+        )
+    return [row[0] for row in rows]
@@ -0,0 +1,93 @@
+import logging
+from typing import Optional, List, Iterable
+
+import sqlalchemy
+
+from app.database.database import database
+from app.database.models.group import Group, GroupMember
+from app.database.models.quiz import Quiz, Question
+from app.utils.audit import log_audit
+from app.utils.jobs import PeriodicJob
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+
+async def add_member_count(group_id: int, delta: int) -> None:
+    groups = Group.ormar_config.table
+    await database.execute(
+        groups.update()
+        .where(groups.c.id == group_id)
+        .values(member_count=groups.c.member_count + delta)
+    )
+
+
+async def add_question_count(quiz_id: int, delta: int) -> None:
+    quizzes = Quiz.ormar_config.table
+    await database.execute(
+        quizzes.update()
+        .where(quizzes.c.id == quiz_id)
+        .values(question_count=quizzes.c.question_count + delta)
+    )
+
+
+async def _recount(table, column, child_table, child_fk, ids: Optional[Iterable[int]]) -> List[int]:
+    actual = (
+        sqlalchemy.select(sqlalchemy.func.count())
+        .select_from(child_table)
+        .where(child_fk == table.c.id)
+        .scalar_subquery()
+    )
+    query = (
+        table.update()
+        .where(column.is_distinct_from(actual))
+        .values({column.name: actual})
+        .returning(table.c.id)
+    )
+    if ids is not None:
+        ids = list(ids)
+        if not ids:
+            return []
+        query = query.where(table.c.id.in_(ids))
+    rows = await database.fetch_all(query)
+    return [row[0] for row in rows]
+
+
+async def recount_members(group_ids: Optional[Iterable[int]] = None) -> List[int]:
+    """Set member_count from the members table; returns the groups that drifted."""
+    groups = Group.ormar_config.table
+    members = GroupMember.ormar_config.table
+    return await _recount(groups, groups.c.member_count, members, members.c.group, group_ids)
+
+
+async def recount_questions(quiz_ids: Optional[Iterable[int]] = None) -> List[int]:
+    """Set question_count from the questions table; returns the quizzes that drifted."""
+    quizzes = Quiz.ormar_config.table
+    questions = Question.ormar_config.table
+    return await _recount(quizzes, quizzes.c.question_count, questions, questions.c.quiz, quiz_ids)
+
+
+class CounterReconciler(PeriodicJob):
+    """Repairs member_count/question_count drift left by failed or manual writes."""
+
+    name = "counter_reconciler"
+
+    def __init__(self):
+        super().__init__()
+        self.interval = settings.counter_reconcile_interval
+
+    async def run_once(self) -> Optional[float]:
+        group_ids = await recount_members()
+        quiz_ids = await recount_questions()
+        if group_ids or quiz_ids:
+            logger.warning(
+                "Repaired counters for %d groups and %d quizzes", len(group_ids), len(quiz_ids)
+            )
+            await log_audit(
+                "counters_reconciled",
+                details={"group_ids": group_ids, "quiz_ids": quiz_ids},
+            )
+        return None
+
+
+counter_reconciler = CounterReconciler()
@@ -0,0 +1,216 @@
+import csv
+import io
+import re
+import zipfile
+from typing import AsyncIterator, List, Any
+from xml.sax.saxutils import escape
+
+import sqlalchemy
+
+from app.database.database import database
+from app.database.models.attempt import QuizAttempt, Answer
+from app.database.models.quiz import Question
+from app.database.models.user import User
+
+
+# rows are flushed to the client in batches of this size
+EXPORT_BATCH_ROWS = 200
+
+EXPORT_MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+_XML_ILLEGAL = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+
+async def quiz_result_rows(quiz_id: int) -> AsyncIterator[List[Any]]:
+    """Header plus one row per completed attempt, read through a server-side cursor.
+
+    Answers are joined in and the result is ordered by attempt, so each
+    attempt's answers arrive together and only one attempt is held at a time.
+    """
+    questions = await Question.objects.filter(quiz=quiz_id).order_by(["order", "id"]).all()
+    column = {q.id: i for i, q in enumerate(questions)}
+    yield [
+        "Student", "Username", "Score", "Max score", "Percentage",
+        "Time spent (s)", "Completed at",
+    ] + [f"Q{i + 1}" for i in range(len(questions))]
+
+    attempts = QuizAttempt.ormar_config.table
+    users = User.ormar_config.table
+    answers = Answer.ormar_config.table
+    query = (
+        sqlalchemy.select(
+            attempts.c.id,
+            users.c.first_name,
+            users.c.last_name,
+            users.c.username,
+            attempts.c.score,
+            attempts.c.max_score,
+            attempts.c.time_spent,
+            attempts.c.completed_at,
+            answers.c.question,
+            answers.c.points_earned,
+        )
+        .select_from(
+            attempts.join(users, attempts.c.student == users.c.id)
+            .outerjoin(answers, answers.c.attempt == attempts.c.id)
+        )
+        .where(attempts.c.quiz == quiz_id)
+        .where(attempts.c.is_completed.is_(True))
+        .order_by(attempts.c.id)
+    )
+
+    current_id = None
+    row: List[Any] = []
+    async for record in database.iterate(query):
+        if record[0] != current_id:
+            if current_id is not None:
+                yield row
+            current_id = record[0]
+            score, max_score = record[4] or 0.0, record[5] or 0.0
+            name = f"{record[1] or ''} {record[2] or ''}".strip()
+            row = [
+                name,
+                record[3],
+                score,
+                max_score,
+                round(score / max_score * 100, 2) if max_score > 0 else 0,
+                record[6],
+                record[7].isoformat(sep=" ", timespec="seconds") if record[7] else None,
+            ] + [None] * len(questions)
+        if record[8] in column:
+            row[7 + column[record[8]]] = record[9]
+    if current_id is not None:
+        yield row
+
+
+def _csv_safe(value: Any) -> Any:
+    # keep spreadsheet apps from evaluating user-supplied text as a formula
+    if isinstance(value, str) and value.startswith(_FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+async def csv_stream(rows: AsyncIterator[List[Any]]) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    buffer.write("\ufeff")  # lets Excel detect UTF-8
+    pending = 0
+    async for row in rows:
+        writer.writerow([_csv_safe(v) for v in row])
+        pending += 1
+        if pending >= EXPORT_BATCH_ROWS:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    if buffer.getvalue():
+        yield buffer.getvalue().encode("utf-8")
+
+
+class _ChunkSink:
+    """Write-only file object that hands written bytes back on drain()."""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+_XLSX_STATIC = {
+    "[Content_Types].xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '</Types>'
+    ),
+    "_rels/.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+        'Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    ),
+    "xl/workbook.xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="Results" sheetId="1" r:id="rId1"/></sheets>'
+        '</workbook>'
+    ),
+    "xl/_rels/workbook.xml.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+        'Target="worksheets/sheet1.xml"/>'
+        '</Relationships>'
+    ),
+}
+
+
+def _xlsx_cell(value: Any) -> str:
+    if value is None:
+        return "<c/>"
+    if isinstance(value, bool):
+        return f'<c t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, (int, float)):
+        return f"<c><v>{value}</v></c>"
+    text = escape(_XML_ILLEGAL.sub("", str(value)))
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+async def xlsx_stream(rows: AsyncIterator[List[Any]]) -> AsyncIterator[bytes]:
+    """Minimal single-sheet workbook written as a streamed zip.
+
+    Cells are inline strings, so no shared-string table has to be kept in
+    memory; zipfile uses data descriptors on a non-seekable sink.
+    """
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, content in _XLSX_STATIC.items():
+            archive.writestr(name, content)
+        yield sink.drain()
+
+        with archive.open("xl/worksheets/sheet1.xml", "w", force_zip64=True) as sheet:
+            sheet.write(
+                b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+                b"<sheetData>"
+            )
+            pending = 0
+            async for row in rows:
+                sheet.write(("<row>" + "".join(_xlsx_cell(v) for v in row) + "</row>").encode("utf-8"))
+                pending += 1
+                if pending >= EXPORT_BATCH_ROWS:
+                    chunk = sink.drain()
+                    if chunk:
+                        yield chunk
+                    pending = 0
+            sheet.write(b"</sheetData></worksheet>")
+    yield sink.drain()
+
+
+EXPORT_WRITERS = {
+    "csv": csv_stream,
+    "xlsx": xlsx_stream,
+}
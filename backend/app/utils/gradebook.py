@@ -0,0 +1,89 @@
+from typing import List, Optional
+
+import sqlalchemy
+
+from app.database.database import database
+from app.database.models.attempt import QuizAttempt
+from app.database.models.group import GroupMember
+from app.database.models.quiz import Quiz
+from app.database.models.user import User
+
+
+def _display_name(first_name: Optional[str], last_name: Optional[str], username: str) -> str:
+    name = f"{first_name or ''} {last_name or ''}".strip()
+    return name or username
+
+
+async def build_gradebook(group_id: int) -> dict:
+    """Members x quizzes matrix of best completed scores, in columnar form.
+
+    scores[i][j] and percentages[i][j] belong to student_ids[i] and
+    quiz_ids[j], and both come from the same attempt: the completed one
+    with the highest score, the higher percentage breaking ties. They are
+    null when the student has no completed attempt.
+    """
+    members = GroupMember.ormar_config.table
+    users = User.ormar_config.table
+    quizzes = Quiz.ormar_config.table
+    attempts = QuizAttempt.ormar_config.table
+
+    student_rows = await database.fetch_all(
+        sqlalchemy.select(users.c.id, users.c.first_name, users.c.last_name, users.c.username)
+        .select_from(members.join(users, members.c.user == users.c.id))
+        .where(members.c.group == group_id)
+        .order_by(users.c.last_name, users.c.first_name, users.c.username)
+    )
+    quiz_rows = await database.fetch_all(
+        sqlalchemy.select(quizzes.c.id, quizzes.c.title)
+        .where(quizzes.c.group == group_id)
+        .order_by(quizzes.c.created_at, quizzes.c.id)
+    )
+
+    percentage = sqlalchemy.case(
+        (attempts.c.max_score > 0, attempts.c.score * 100.0 / attempts.c.max_score),
+        else_=0.0,
+    )
+    ranked = (
+        sqlalchemy.select(
+            attempts.c.student,
+            attempts.c.quiz,
+            attempts.c.score,
+            percentage.label("percentage"),
+            sqlalchemy.func.row_number().over(
+                partition_by=(attempts.c.student, attempts.c.quiz),
+                order_by=(attempts.c.score.desc(), percentage.desc(), attempts.c.id.desc()),
+            ).label("rank"),
+        )
+        .select_from(attempts.join(quizzes, attempts.c.quiz == quizzes.c.id))
+        .where(quizzes.c.group == group_id)
+        .where(attempts.c.is_completed.is_(True))
+        .subquery()
+    )
+    cells = await database.fetch_all(
+        sqlalchemy.select(ranked.c.student, ranked.c.quiz, ranked.c.score, ranked.c.percentage)
+        .where(ranked.c.rank == 1)
+    )
+
+    student_ids = [row[0] for row in student_rows]
+    quiz_ids = [row[0] for row in quiz_rows]
+    row_of = {student_id: i for i, student_id in enumerate(student_ids)}
+    col_of = {quiz_id: j for j, quiz_id in enumerate(quiz_ids)}
+    scores: List[List[Optional[float]]] = [[None] * len(quiz_ids) for _ in student_ids]
+    percentages: List[List[Optional[float]]] = [[None] * len(quiz_ids) for _ in student_ids]
+    for cell in cells:
+        i, j = row_of.get(cell[0]), col_of.get(cell[1])
+        if i is None or j is None:
+            # attempts of students who have since left the group
+            continue
+        scores[i][j] = cell[2]
+        percentages[i][j] = round(cell[3], 2) if cell[3] is not None else None
+
+    return {
+        "group_id": group_id,
+        "student_ids": student_ids,
+        "student_names": [_display_name(r[1], r[2], r[3]) for r in student_rows],
+        "quiz_ids": quiz_ids,
+        "quiz_titles": [row[1] for row in quiz_rows],
+        "scores": scores,
+        "percentages": percentages,
+    }
@@ -0,0 +1,77 @@
+import random
+from typing import Optional
+
+import sqlalchemy
+from fastapi import HTTPException, status
+
+from app.database.database import database, dialect_insert
+from app.database.models.group import Group, GroupCode
+from app.utils.rows import chunked
+from config import settings
+
+CODE_DIGITS = 6
+CODE_SPACE = 10 ** CODE_DIGITS
+
+
+async def _claim() -> Optional[str]:
+    codes = GroupCode.ormar_config.table
+    # SKIP LOCKED lets concurrent claims each take a different head row
+    # instead of queueing on the same one; SQLite serialises writers anyway
+    head = (
+        sqlalchemy.select(codes.c.position)
+        .order_by(codes.c.position)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+    return await database.fetch_val(
+        codes.delete().where(codes.c.position == head).returning(codes.c.code)
+    )
+
+
+async def refill_group_codes(size: int) -> int:
+    """Append up to size unused codes, in random order, to the pool.
+
+    Codes held by a group or already pooled are left out, so codes of
+    deleted groups come back only once the pool runs dry. Returns how many
+    were added.
+    """
+    codes = GroupCode.ormar_config.table
+    groups = Group.ormar_config.table
+    rows = await database.fetch_all(
+        sqlalchemy.union_all(
+            sqlalchemy.select(groups.c.code),
+            sqlalchemy.select(codes.c.code),
+        )
+    )
+    used = {row[0] for row in rows}
+    # at most len(used) of the drawn numbers are taken, so at least size
+    # are free whenever that many exist
+    drawn = random.SystemRandom().sample(range(CODE_SPACE), min(CODE_SPACE, size + len(used)))
+    free = [code for code in (f"{n:0{CODE_DIGITS}d}" for n in drawn) if code not in used][:size]
+    start = (await database.fetch_val(sqlalchemy.select(sqlalchemy.func.max(codes.c.position)))) or 0
+    rows = [{"position": start + i, "code": code} for i, code in enumerate(free, start=1)]
+    for chunk in chunked(rows):
+        # a concurrent refill may have taken the same positions or codes
+        await database.execute(dialect_insert(codes).values(chunk).on_conflict_do_nothing())
+    return len(rows)
+
+
+async def claim_group_code() -> str:
+    """Take an unused join code from the pool.
+
+    A claim is one DELETE ... RETURNING of the pool's head row, so it costs
+    the same however many groups exist and two claims never get the same
+    code. Call it in the transaction that creates the group, so a failed
+    create returns the code to the pool.
+    """
+    code = await _claim()
+    if code is None:
+        await refill_group_codes(settings.group_code_refill_size)
+        code = await _claim()
+    if code is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="No group codes left"
+        )
+    return code
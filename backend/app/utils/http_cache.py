@@ -0,0 +1,155 @@
+import hashlib
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+
+import sqlalchemy
+
+from fastapi import Depends, HTTPException, Request, Response, status
+
+from app.database.database import database, dialect_insert
+from app.database.models.resource_version import ResourceVersion
+from app.database.models.user import User
+from app.utils.auth import get_current_user
+from app.utils.serialization import dumps
+
+
+def make_etag(data: bytes) -> str:
+    return '"' + hashlib.sha256(data).hexdigest()[:32] + '"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    candidates = [tag.strip() for tag in header.split(",")]
+    # weak comparison, as If-None-Match requires
+    return etag in candidates or f"W/{etag}" in candidates
+
+
+def json_response_with_etag(
+    request: Request,
+    payload: Any,
+    cache_control: Optional[str] = "private, no-cache",
+) -> Response:
+    """Serialize payload once, tag it with a content ETag and honour If-None-Match."""
+    body = dumps(payload)
+    etag = make_etag(body)
+    headers = {"ETag": etag}
+    if cache_control:
+        headers["Cache-Control"] = cache_control
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+async def get_versions(keys: Iterable[str]) -> Dict[str, int]:
+    keys = list(keys)
+    table = ResourceVersion.ormar_config.table
+    rows = await database.fetch_all(
+        sqlalchemy.select(table.c.key, table.c.version).where(table.c.key.in_(keys))
+    )
+    found = {row[0]: row[1] for row in rows}
+    return {key: found.get(key, 0) for key in keys}
+
+
+async def bump_versions(*keys: str) -> None:
+    """Invalidate cached representations of the given resources.
+
+    Call after the change is written, so a client revalidating in between
+    can only be sent the old data under the old tag.
+    """
+    keys = sorted(set(keys))
+    if not keys:
+        return
+    table = ResourceVersion.ormar_config.table
+    query = dialect_insert(table).values([{"key": key, "version": 1} for key in keys])
+    query = query.on_conflict_do_update(
+        index_elements=[table.c.key],
+        set_={"version": table.c.version + 1},
+    )
+    await database.execute(query)
+
+
+async def current_version(request: Request, key: str) -> int:
+    """Version of key as read by versioned() for this request, or fetched now."""
+    versions = getattr(request.state, "resource_versions", None) or {}
+    if key in versions:
+        return versions[key]
+    return (await get_versions([key]))[key]
+
+
+def path_int(request: Request, name: str) -> Optional[int]:
+    """Integer path parameter, read before FastAPI has validated it."""
+    try:
+        return int(request.path_params[name])
+    except (KeyError, ValueError):
+        return None
+
+
+BLOG_KEY = "blog"
+SETTINGS_KEY = "settings"
+
+
+def quiz_key(quiz_id: int) -> str:
+    return f"quiz:{quiz_id}"
+
+
+def attempt_key(attempt_id: int) -> str:
+    return f"attempt:{attempt_id}"
+
+
+def user_key(user_id: int) -> str:
+    return f"user:{user_id}"
+
+
+KeysFunc = Callable[[Request, Optional[User]], Awaitable[Optional[List[str]]]]
+
+
+def versioned(
+    keys: KeysFunc,
+    cache_control: str = "private, no-cache",
+    user_dependency: Optional[Callable] = get_current_user,
+):
+    """Dependency that revalidates a GET against resource version counters.
+
+    keys returns the version keys the response is built from, or None when
+    the response must not be cached. The ETag covers those versions, the
+    URL and the caller, so a matching If-None-Match is answered with 304
+    before the endpoint body runs. For authenticated routes the caller's own
+    key is included too; bump it when their access or role changes.
+    Pass the endpoint's own user dependency so the user is loaded once.
+    """
+
+    async def _no_user() -> None:
+        return None
+
+    async def dependency(
+        request: Request,
+        response: Response,
+        current_user: Optional[User] = Depends(user_dependency or _no_user),
+    ) -> None:
+        resource_keys = await keys(request, current_user)
+        if resource_keys is None:
+            return
+        if current_user is not None:
+            resource_keys = [*resource_keys, user_key(current_user.id)]
+        versions = await get_versions(resource_keys)
+        request.state.resource_versions = versions
+        tag = "|".join(
+            [
+                request.url.path,
+                request.url.query,
+                str(current_user.id) if current_user is not None else "",
+                *(f"{key}={versions[key]}" for key in resource_keys),
+            ]
+        )
+        etag = make_etag(tag.encode("utf-8"))
+        headers = {"ETag": etag, "Cache-Control": cache_control}
+        if current_user is not None:
+            headers["Vary"] = "Authorization"
+        if etag_matches(request, etag):
+            raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        response.headers.update(headers)
+
+    return dependency
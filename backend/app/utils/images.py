@@ -0,0 +1,120 @@
+import asyncio
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Optional
+
+from app.utils.uploads import FILE_MODE
+from config import settings
+
+
+# longest side of the derivative clients display, per upload directory
+AVATAR_SIZE = 256
+QUESTION_IMAGE_SIZE = 1280
+
+DERIVATIVE_FORMATS = {
+    "webp": ("WEBP", ".webp", {"quality": 80, "method": 4}),
+    "jpeg": ("JPEG", ".jpg", {"quality": 82, "optimize": True, "progressive": True}),
+}
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def derivative_name(path: Path, max_side: int) -> str:
+    ext = DERIVATIVE_FORMATS[settings.image_derivative_format][1]
+    return f"{path.stem}.{max_side}{ext}"
+
+
+def _render(src: str, name: str, max_side: int, fmt: str, max_pixels: int) -> Optional[str]:
+    """Write a metadata-free copy of src no larger than max_side as name.
+
+    Runs in a worker process. Animated and unreadable images get no
+    derivative, and clients keep using the original.
+    """
+    from PIL import Image, ImageOps
+
+    pil_format, _, options = DERIVATIVE_FORMATS[fmt]
+    src_path = Path(src)
+    try:
+        with Image.open(src_path) as image:
+            if getattr(image, "is_animated", False):
+                return None
+            if image.width * image.height > max_pixels:
+                return None
+            image = ImageOps.exif_transpose(image)
+            image.thumbnail((max_side, max_side), Image.Resampling.LANCZOS)
+            has_alpha = image.mode in ("RGBA", "LA") or "transparency" in image.info
+            if pil_format == "JPEG" or not has_alpha:
+                if has_alpha:
+                    background = Image.new("RGB", image.size, (255, 255, 255))
+                    background.paste(image, mask=image.convert("RGBA").getchannel("A"))
+                    image = background
+                else:
+                    image = image.convert("RGB")
+            else:
+                image = image.convert("RGBA")
+
+            fd, tmp_name = tempfile.mkstemp(dir=src_path.parent, prefix=".derivative-")
+            try:
+                with os.fdopen(fd, "wb") as out:
+                    # no exif/icc/xmp arguments: the copy carries no metadata
+                    image.save(out, pil_format, **options)
+                os.chmod(tmp_name, FILE_MODE)
+                os.replace(tmp_name, src_path.parent / name)
+            except BaseException:
+                try:
+                    os.unlink(tmp_name)
+                except OSError:
+                    pass
+                raise
+            return name
+    except (OSError, ValueError, Image.DecompressionBombError):
+        return None
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        # spawn, not fork: the app process holds threads and open sockets
+        _pool = ProcessPoolExecutor(
+            max_workers=settings.image_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _pool
+
+
+def shutdown_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+async def make_derivative(path: Path, max_side: int) -> Optional[str]:
+    """Render the display copy of an uploaded image in the worker pool.
+
+    Returns the derivative's file name, stored next to the original, or
+    None if the image is kept as is. Originals are content-addressed, so
+    a derivative that already exists is reused.
+    """
+    name = derivative_name(path, max_side)
+    if (path.parent / name).exists():
+        return name
+    loop = asyncio.get_running_loop()
+    try:
+        return await loop.run_in_executor(
+            _get_pool(),
+            _render,
+            str(path),
+            name,
+            max_side,
+            settings.image_derivative_format,
+            settings.max_image_pixels,
+        )
+    except BrokenProcessPool:
+        # a worker died (e.g. killed for memory); start a fresh pool next time
+        shutdown_pool()
+        return None
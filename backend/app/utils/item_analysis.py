@@ -0,0 +1,231 @@
+from typing import Optional, List, Dict, Sequence
+
+import numpy as np
+import sqlalchemy
+from starlette.concurrency import run_in_threadpool
+
+from app.database.database import database
+from app.database.models.attempt import QuizAttempt, Answer
+from app.database.models.quiz import Question, Option
+from app.utils.packed_ids import ID_SIZE
+
+
+# share of students at each end of the total-score ranking used for
+# upper/lower group distractor analysis (Kelley's 27%)
+GROUP_FRACTION = 0.27
+
+
+def item_matrix(
+    attempt_idx: np.ndarray,
+    question_idx: np.ndarray,
+    values: np.ndarray,
+    n_attempts: int,
+    n_questions: int,
+) -> np.ndarray:
+    """Dense attempts x questions matrix; unanswered questions score 0."""
+    matrix = np.zeros((n_attempts, n_questions), dtype=np.float64)
+    matrix[attempt_idx, question_idx] = values
+    return matrix
+
+
+def _nan_to_none(values: np.ndarray) -> List[Optional[float]]:
+    return [None if np.isnan(v) else float(v) for v in values]
+
+
+def analyze_items(scores: np.ndarray) -> dict:
+    """Classical test theory statistics for an attempts x questions score matrix.
+
+    scores holds the fraction of each question's points earned (0..1).
+    Discrimination is the point-biserial correlation between an item and
+    the rest score (total without that item), so an item is not correlated
+    with itself.
+    """
+    n_attempts, n_questions = scores.shape
+    if n_attempts == 0 or n_questions == 0:
+        return {
+            "difficulty": np.full(n_questions, np.nan),
+            "discrimination": np.full(n_questions, np.nan),
+            "cronbach_alpha": None,
+        }
+
+    difficulty = scores.mean(axis=0)
+
+    total = scores.sum(axis=1)
+    rest = total[:, None] - scores
+    item_dev = scores - difficulty
+    rest_dev = rest - rest.mean(axis=0)
+    covariance = (item_dev * rest_dev).sum(axis=0)
+    spread = np.sqrt((item_dev ** 2).sum(axis=0) * (rest_dev ** 2).sum(axis=0))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        discrimination = np.where(spread > 0, covariance / spread, np.nan)
+
+    alpha = None
+    total_var = total.var(ddof=1) if n_attempts > 1 else 0.0
+    if n_questions > 1 and total_var > 0:
+        item_var = scores.var(axis=0, ddof=1).sum()
+        alpha = float(n_questions / (n_questions - 1) * (1 - item_var / total_var))
+
+    return {
+        "difficulty": difficulty,
+        "discrimination": discrimination,
+        "cronbach_alpha": alpha,
+    }
+
+
+def score_groups(total: np.ndarray, fraction: float = GROUP_FRACTION):
+    """Boolean masks of the upper and lower scoring groups."""
+    n = len(total)
+    size = max(int(round(n * fraction)), 1) if n else 0
+    order = np.argsort(total, kind="stable")
+    upper = np.zeros(n, dtype=bool)
+    lower = np.zeros(n, dtype=bool)
+    upper[order[n - size:]] = True
+    lower[order[:size]] = True
+    return upper, lower
+
+
+def option_frequencies(
+    selection_attempts: np.ndarray,
+    selection_options: np.ndarray,
+    n_options: int,
+    upper: np.ndarray,
+    lower: np.ndarray,
+) -> Dict[str, np.ndarray]:
+    """How often each option was chosen, overall and within the score groups."""
+    return {
+        "count": np.bincount(selection_options, minlength=n_options),
+        "upper": np.bincount(
+            selection_options, weights=upper[selection_attempts], minlength=n_options
+        ),
+        "lower": np.bincount(
+            selection_options, weights=lower[selection_attempts], minlength=n_options
+        ),
+    }
+
+
+def _lookup(sorted_ids: np.ndarray, values: np.ndarray):
+    """Positions of values in sorted_ids, plus a mask of the values found."""
+    idx = np.searchsorted(sorted_ids, values)
+    idx = np.minimum(idx, max(len(sorted_ids) - 1, 0))
+    found = sorted_ids[idx] == values if len(sorted_ids) else np.zeros(len(values), dtype=bool)
+    return idx, found
+
+
+def _parse_selections(answer_rows: Sequence):
+    """Decode the selected_options column of all rows at once.
+
+    Returns (row indices, number of options per row, flat option ids).
+    """
+    indices = [i for i, row in enumerate(answer_rows) if row[3]]
+    blobs = [answer_rows[i][3] for i in indices]
+    # packed int32 lists concatenate into one array that numpy reads in place
+    lengths = np.fromiter((len(blob) for blob in blobs), dtype=np.int64, count=len(blobs)) // ID_SIZE
+    values = np.frombuffer(b"".join(blobs), dtype="<i4").astype(np.int64)
+    return np.array(indices, dtype=np.int64), lengths, values
+
+
+def _build_report(
+    answer_rows: Sequence,
+    question_rows: Sequence,
+    option_rows: Sequence,
+) -> dict:
+    question_ids = np.array(sorted(row[0] for row in question_rows), dtype=np.int64)
+    points_by_id = {row[0]: row[1] or 0.0 for row in question_rows}
+    points = np.array([points_by_id[q] for q in question_ids.tolist()], dtype=np.float64)
+
+    # rows come from attempts LEFT JOIN answers, so question is None for
+    # attempts without answers; those still count as all-zero rows
+    n = len(answer_rows)
+    attempt_col = np.fromiter((row[0] for row in answer_rows), dtype=np.int64, count=n)
+    question_col = np.fromiter(
+        (-1 if row[1] is None else row[1] for row in answer_rows), dtype=np.int64, count=n
+    )
+    earned_col = np.fromiter((row[2] or 0.0 for row in answer_rows), dtype=np.float64, count=n)
+
+    attempt_ids, attempt_idx = np.unique(attempt_col, return_inverse=True)
+    question_idx, answered = _lookup(question_ids, question_col)
+    question_points = points[question_idx] if len(points) else np.zeros(n)
+    fraction = np.divide(
+        earned_col, question_points, out=np.zeros(n), where=answered & (question_points > 0)
+    )
+    scores = item_matrix(
+        attempt_idx[answered],
+        question_idx[answered],
+        np.clip(fraction[answered], 0.0, 1.0),
+        len(attempt_ids),
+        len(question_ids),
+    )
+    stats = analyze_items(scores)
+
+    option_rows = sorted(option_rows, key=lambda row: row[0])
+    option_ids = np.array([row[0] for row in option_rows], dtype=np.int64)
+
+    rows_with_options, lengths, selected_ids = _parse_selections(answer_rows)
+    selection_attempts = np.repeat(attempt_idx[rows_with_options], lengths)
+    selection_options, chosen = _lookup(option_ids, selected_ids)
+
+    upper, lower = score_groups(scores.sum(axis=1))
+    freq = option_frequencies(
+        selection_attempts[chosen],
+        selection_options[chosen],
+        len(option_ids),
+        upper,
+        lower,
+    )
+    n_attempts = len(attempt_ids)
+    upper_size = max(int(upper.sum()), 1)
+    lower_size = max(int(lower.sum()), 1)
+
+    options_by_question: Dict[int, List[dict]] = {}
+    for j, row in enumerate(option_rows):
+        options_by_question.setdefault(row[1], []).append({
+            "option_id": row[0],
+            "is_correct": bool(row[2]),
+            "count": int(freq["count"][j]),
+            "proportion": float(freq["count"][j] / n_attempts) if n_attempts else None,
+            "upper_proportion": float(freq["upper"][j] / upper_size) if n_attempts else None,
+            "lower_proportion": float(freq["lower"][j] / lower_size) if n_attempts else None,
+        })
+
+    difficulty = _nan_to_none(stats["difficulty"])
+    discrimination = _nan_to_none(stats["discrimination"])
+    return {
+        "attempt_count": n_attempts,
+        "question_count": len(question_ids),
+        "cronbach_alpha": stats["cronbach_alpha"],
+        "questions": [
+            {
+                "question_id": question_id,
+                "difficulty": difficulty[j],
+                "discrimination": discrimination[j],
+                "options": options_by_question.get(question_id, []),
+            }
+            for j, question_id in enumerate(question_ids.tolist())
+        ],
+    }
+
+
+async def quiz_item_analysis(quiz_id: int) -> dict:
+    """Item analysis over the completed attempts of a quiz."""
+    answers = Answer.ormar_config.table
+    attempts = QuizAttempt.ormar_config.table
+    questions = Question.ormar_config.table
+    options = Option.ormar_config.table
+
+    answer_rows = await database.fetch_all(
+        sqlalchemy.select(
+            attempts.c.id, answers.c.question, answers.c.points_earned, answers.c.selected_options
+        )
+        .select_from(attempts.outerjoin(answers, answers.c.attempt == attempts.c.id))
+        .where(attempts.c.quiz == quiz_id)
+        .where(attempts.c.is_completed.is_(True))
+    )
+    question_rows = await database.fetch_all(
+        sqlalchemy.select(questions.c.id, questions.c.points).where(questions.c.quiz == quiz_id)
+    )
+    option_rows = await database.fetch_all(
+        sqlalchemy.select(options.c.id, options.c.question, options.c.is_correct)
+        .select_from(options.join(questions, options.c.question == questions.c.id))
+        .where(questions.c.quiz == quiz_id)
+    )
+    return await run_in_threadpool(_build_report, answer_rows, question_rows, option_rows)
@@ -0,0 +1,131 @@
+import abc
+import asyncio
+import logging
+import os
+import socket
+import uuid
+from datetime import timedelta
+from typing import Optional
+
+import sqlalchemy
+
+from app.database.database import database, dialect_insert, utc_now
+from app.database.models.job_lease import JobLease
+
+logger = logging.getLogger(__name__)
+
+OWNER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+async def try_acquire_lease(name: str, owner: str, seconds: float) -> bool:
+    """Claim or renew the named lease. Only one owner holds it until it expires."""
+    table = JobLease.ormar_config.table
+    now = utc_now()
+    expires_at = now + timedelta(seconds=seconds)
+    async with database.transaction():
+        claimed = await database.fetch_val(
+            dialect_insert(table)
+            .values(name=name, owner=owner, expires_at=expires_at)
+            .on_conflict_do_nothing(index_elements=[table.c.name])
+            .returning(table.c.name)
+        )
+        if claimed is None:
+            claimed = await database.fetch_val(
+                table.update()
+                .where(table.c.name == name)
+                .where(sqlalchemy.or_(table.c.owner == owner, table.c.expires_at < now))
+                .values(owner=owner, expires_at=expires_at)
+                .returning(table.c.name)
+            )
+    return claimed is not None
+
+
+async def release_lease(name: str, owner: str) -> None:
+    table = JobLease.ormar_config.table
+    await database.execute(
+        table.update()
+        .where(table.c.name == name)
+        .where(table.c.owner == owner)
+        .values(expires_at=utc_now())
+    )
+
+
+class PeriodicJob(abc.ABC):
+    """Background loop that runs on exactly one worker per deployment.
+
+    Every tick the job claims (or renews) a database lease named after it; only
+    the lease holder calls run_once(). run_once() may return a shorter delay
+    until the next tick, e.g. when the job knows its next deadline, and wake()
+    makes the local loop tick right away.
+    """
+
+    name: str = "job"
+    interval: float = 60.0
+    lease_seconds: Optional[float] = None
+
+    def __init__(self):
+        self.is_leader = False
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup = asyncio.Event()
+
+    async def on_acquire(self) -> None:
+        pass
+
+    async def on_release(self) -> None:
+        pass
+
+    @abc.abstractmethod
+    async def run_once(self) -> Optional[float]:
+        ...
+
+    def wake(self) -> None:
+        self._wakeup.set()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop(), name=self.name)
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        if self.is_leader:
+            self.is_leader = False
+            try:
+                await release_lease(self.name, OWNER_ID)
+            except Exception:
+                logger.exception("Failed to release lease %s", self.name)
+
+    async def _tick(self) -> float:
+        lease_seconds = self.lease_seconds or self.interval * 3
+        leader = await try_acquire_lease(self.name, OWNER_ID, lease_seconds)
+        if leader and not self.is_leader:
+            self.is_leader = True
+            await self.on_acquire()
+        elif not leader and self.is_leader:
+            self.is_leader = False
+            await self.on_release()
+        if not leader:
+            return self.interval
+        delay = await self.run_once()
+        return self.interval if delay is None else min(self.interval, delay)
+
+    async def _loop(self) -> None:
+        while True:
+            delay = self.interval
+            try:
+                delay = await self._tick()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Background job %s failed", self.name)
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=max(delay, 0.05))
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
@@ -0,0 +1,46 @@
+import sys
+from array import array
+from typing import Iterable, List, Optional
+
+
+# Answer.selected_options and QuizAttempt.questions_order hold lists of
+# row ids as little-endian int32, 4 bytes per id, on every database.
+ID_SIZE = 4
+
+_SWAP = sys.byteorder != "little"
+
+assert array("i").itemsize == ID_SIZE
+
+
+def pack_ids(ids: Iterable[int]) -> bytes:
+    packed = array("i", ids)
+    if _SWAP:
+        packed.byteswap()
+    return packed.tobytes()
+
+
+def unpack_ids(data: Optional[bytes]) -> List[int]:
+    if not data:
+        return []
+    packed = array("i")
+    packed.frombytes(data)
+    if _SWAP:
+        packed.byteswap()
+    return packed.tolist()
+
+
+def count_ids(data: Optional[bytes]) -> int:
+    """Number of ids in a packed list, without decoding it."""
+    return len(data) // ID_SIZE if data else 0
+
+
+def index_of(data: Optional[bytes], value: int) -> Optional[int]:
+    """Position of value in a packed list, or None."""
+    if not data:
+        return None
+    needle = pack_ids([value])
+    start = data.find(needle)
+    # a match must start on an id boundary, not straddle two ids
+    while start != -1 and start % ID_SIZE:
+        start = data.find(needle, start + 1)
+    return None if start == -1 else start // ID_SIZE
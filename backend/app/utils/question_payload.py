@@ -0,0 +1,149 @@
+import asyncio
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import sqlalchemy
+
+from app.database.database import database
+from app.database.models.quiz import Question, Option
+from app.utils.serialization import dumps
+from config import settings
+
+
+class QuestionPayload:
+    """Serialized question list of one quiz version.
+
+    Each question is kept as its own JSON fragment, so an attempt's
+    questions_order is applied by joining fragments, not by re-serializing.
+    """
+
+    __slots__ = ("fragments", "index")
+
+    def __init__(self, question_ids: List[int], fragments: List[bytes]):
+        self.fragments = fragments
+        self.index = {question_id: i for i, question_id in enumerate(question_ids)}
+
+    def body(self, order: Optional[Sequence[int]] = None) -> bytes:
+        if order is None:
+            parts = self.fragments
+        else:
+            # questions deleted since the attempt started are skipped
+            parts = [self.fragments[self.index[qid]] for qid in order if qid in self.index]
+        return b"[" + b",".join(parts) + b"]"
+
+
+_payloads: "OrderedDict[Tuple[int, int, bool], QuestionPayload]" = OrderedDict()
+_building: Dict[Tuple[int, int, bool], asyncio.Future] = {}
+
+
+async def fetch_quiz_questions(quiz_id: int) -> Tuple[List, Dict[int, List]]:
+    """Question rows of a quiz in display order, and option rows per question id.
+
+    Question rows are (id, input_type, text, order, points,
+    correct_text_answer, image_url, image_display_url); option rows are (question, id, text,
+    is_correct, order), sorted by order.
+    """
+    questions = Question.ormar_config.table
+    options = Option.ormar_config.table
+    question_rows = await database.fetch_all(
+        sqlalchemy.select(
+            questions.c.id,
+            questions.c.input_type,
+            questions.c.text,
+            questions.c.order,
+            questions.c.points,
+            questions.c.correct_text_answer,
+            questions.c.image_url,
+            questions.c.image_display_url,
+        )
+        .where(questions.c.quiz == quiz_id)
+        .order_by(questions.c.order, questions.c.id)
+    )
+    option_rows = await database.fetch_all(
+        sqlalchemy.select(
+            options.c.question, options.c.id, options.c.text, options.c.is_correct, options.c.order
+        )
+        .select_from(options.join(questions, options.c.question == questions.c.id))
+        .where(questions.c.quiz == quiz_id)
+        .order_by(options.c.question, options.c.order, options.c.id)
+    )
+    options_of: Dict[int, List] = {}
+    for row in option_rows:
+        options_of.setdefault(row[0], []).append(row)
+    return question_rows, options_of
+
+
+async def _build(quiz_id: int, for_student: bool) -> QuestionPayload:
+    question_rows, options_of = await fetch_quiz_questions(quiz_id)
+
+    question_ids = []
+    fragments = []
+    for row in question_rows:
+        question_options = options_of.get(row[0], [])
+        correct_count = sum(1 for opt in question_options if opt[3])
+        payload = {
+            "id": row[0],
+            "quiz_id": quiz_id,
+            "input_type": row[1] or "select",
+            "text": row[2],
+            "order": row[3],
+            "points": row[4],
+            "correct_text_answer": None if for_student else row[5],
+            "image_url": row[6],
+            "image_display_url": row[7],
+            "options": [
+                {
+                    "id": opt[1],
+                    "text": opt[2],
+                    "is_correct": False if for_student else bool(opt[3]),
+                    "order": opt[4],
+                }
+                for opt in question_options
+            ],
+            "is_multiple_choice": correct_count > 1,
+        }
+        question_ids.append(row[0])
+        fragments.append(dumps(payload))
+    return QuestionPayload(question_ids, fragments)
+
+
+async def get_question_payload(quiz_id: int, version: int, for_student: bool) -> QuestionPayload:
+    """Question list of a quiz at the given version, built once per worker.
+
+    version is the quiz's resource version, so edits never serve a stale
+    entry. Concurrent callers for a payload that is still being built wait
+    for that build instead of starting their own.
+    """
+    key = (quiz_id, version, for_student)
+    payload = _payloads.get(key)
+    if payload is not None:
+        _payloads.move_to_end(key)
+        return payload
+    pending = _building.get(key)
+    if pending is not None:
+        try:
+            return await asyncio.shield(pending)
+        except asyncio.CancelledError:
+            if not pending.cancelled():
+                raise
+            # the request that was building went away; build here instead
+
+    future = asyncio.get_running_loop().create_future()
+    _building[key] = future
+    try:
+        payload = await _build(quiz_id, for_student)
+    except asyncio.CancelledError:
+        future.cancel()
+        raise
+    except Exception as exc:
+        future.set_exception(exc)
+        # retrieved here so a build nobody else waited on does not log a warning
+        future.exception()
+        raise
+    finally:
+        _building.pop(key, None)
+    future.set_result(payload)
+    _payloads[key] = payload
+    while len(_payloads) > settings.question_payload_cache_size:
+        _payloads.popitem(last=False)
+    return payload
@@ -0,0 +1,110 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import sqlalchemy
+
+from app.database.database import database, utc_now
+from app.database.models.quiz import Quiz, Question, Option
+
+
+def _copied_columns(
+    table: sqlalchemy.Table, overrides: Dict[str, Any]
+) -> Tuple[List[str], List[Any]]:
+    """Insert column names and the matching select list for copying table rows.
+
+    Every column but the id is copied as is, except those in overrides,
+    which are set to the given value or SQL expression.
+    """
+    names = [column.name for column in table.c if column.name != "id"]
+    values = []
+    for name in names:
+        value = overrides.get(name, table.c[name])
+        if not isinstance(value, sqlalchemy.ColumnElement):
+            value = sqlalchemy.literal(value, table.c[name].type)
+        values.append(value)
+    return names, values
+
+
+def _ranked_questions(quiz_id: int) -> sqlalchemy.Subquery:
+    questions = Question.ormar_config.table
+    return (
+        sqlalchemy.select(
+            questions.c.id,
+            sqlalchemy.func.row_number().over(order_by=questions.c.id).label("rank"),
+        )
+        .where(questions.c.quiz == quiz_id)
+        .subquery()
+    )
+
+
+async def clone_quiz(
+    quiz_id: int,
+    group_id: int,
+    teacher_id: int,
+    title: Optional[str],
+    available_until: Optional[datetime],
+    manual_close: bool,
+) -> int:
+    """Copy a quiz with its questions and options; returns the new quiz id.
+
+    Three INSERT ... SELECT statements in one transaction, however many
+    questions the quiz has. Question images are shared by URL, not copied.
+    Attempts, statistics and the schedule are not carried over.
+    """
+    quizzes = Quiz.ormar_config.table
+    questions = Question.ormar_config.table
+    options = Option.ormar_config.table
+    now = utc_now()
+    if manual_close:
+        available_until = None
+    stamps = {"created_at": now, "updated_at": now}
+
+    async with database.transaction():
+        names, values = _copied_columns(quizzes, {
+            **stamps,
+            "group": group_id,
+            "teacher": teacher_id,
+            "title": title if title is not None else quizzes.c.title,
+            "available_until": available_until,
+            "manual_close": manual_close,
+            "is_expired": bool(available_until and available_until < now),
+            "is_active": True,
+            "question_count": (
+                sqlalchemy.select(sqlalchemy.func.count())
+                .where(questions.c.quiz == quiz_id)
+                .scalar_subquery()
+            ),
+        })
+        new_quiz_id = await database.fetch_val(
+            quizzes.insert()
+            .from_select(names, sqlalchemy.select(*values).where(quizzes.c.id == quiz_id))
+            .returning(quizzes.c.id)
+        )
+
+        names, values = _copied_columns(questions, {**stamps, "quiz": new_quiz_id})
+        await database.execute(
+            questions.insert().from_select(
+                names,
+                sqlalchemy.select(*values)
+                .where(questions.c.quiz == quiz_id)
+                .order_by(questions.c.id),
+            )
+        )
+
+        # the copies were inserted in source id order, so they take ids in
+        # the same order: the n-th question of the copy is the n-th source
+        source, copy = _ranked_questions(quiz_id), _ranked_questions(new_quiz_id)
+        names, values = _copied_columns(options, {**stamps, "question": copy.c.id})
+        await database.execute(
+            options.insert().from_select(
+                names,
+                sqlalchemy.select(*values)
+                .select_from(
+                    options
+                    .join(source, source.c.id == options.c.question)
+                    .join(copy, copy.c.rank == source.c.rank)
+                )
+                .order_by(options.c.id),
+            )
+        )
+    return new_quiz_id
@@ -0,0 +1,110 @@
+from datetime import datetime
+from typing import Optional, List
+
+import sqlalchemy
+
+from app.database.database import database, utc_now
+from app.database.models.attempt import QuizAttempt, AttemptStatus
+from app.database.models.quiz import Quiz
+from app.utils.attempts import finalize_attempts
+from app.utils.audit import log_audit
+from app.utils.http_cache import bump_versions, quiz_key
+from app.utils.jobs import PeriodicJob
+from config import settings
+
+
+def is_quiz_expired(quiz: Quiz, now: datetime) -> bool:
+    return bool(not quiz.manual_close and quiz.available_until and quiz.available_until < now)
+
+
+async def close_quizzes(quiz_ids: List[int], now: datetime) -> List[int]:
+    """Finalize open attempts of the given quizzes and mark them expired.
+
+    Attempts are completed as of the quiz's available_until, or as of now when
+    the deadline was moved before the attempt started. Returns the ids of the
+    finalized attempts.
+    """
+    if not quiz_ids:
+        return []
+    attempts = QuizAttempt.ormar_config.table
+    quizzes = Quiz.ormar_config.table
+    deadline = (
+        sqlalchemy.select(quizzes.c.available_until)
+        .where(quizzes.c.id == attempts.c.quiz)
+        .scalar_subquery()
+    )
+    closed_at = sqlalchemy.case(
+        (deadline >= attempts.c.started_at, deadline),
+        else_=sqlalchemy.literal(now, sqlalchemy.DateTime()),
+    )
+    async with database.transaction():
+        attempt_ids = await finalize_attempts(
+            attempts.c.quiz.in_(quiz_ids), closed_at, status=AttemptStatus.EXPIRED.value
+        )
+        await database.execute(
+            quizzes.update().where(quizzes.c.id.in_(quiz_ids)).values(is_expired=True)
+        )
+    await bump_versions(*(quiz_key(quiz_id) for quiz_id in quiz_ids))
+    return attempt_ids
+
+
+async def sync_quiz_expiry(quiz: Quiz, now: datetime) -> None:
+    """Bring quiz.is_expired in line with available_until after an edit."""
+    expired = is_quiz_expired(quiz, now)
+    if expired and not quiz.is_expired:
+        await close_quizzes([quiz.id], now)
+    elif not expired and quiz.is_expired:
+        await quiz.update(_columns=["is_expired"], is_expired=False)
+    quiz.is_expired = expired
+
+
+def _open_quizzes():
+    quizzes = Quiz.ormar_config.table
+    return (
+        quizzes.c.is_expired.is_(False),
+        quizzes.c.manual_close.isnot(True),
+        quizzes.c.available_until.isnot(None),
+    )
+
+
+class QuizCloser(PeriodicJob):
+    """Closes quizzes whose available_until has passed.
+
+    Wakes up at the next known available_until, and at least every
+    quiz_closer_interval seconds to see quizzes edited on other workers.
+    """
+
+    name = "quiz_closer"
+
+    def __init__(self):
+        super().__init__()
+        self.interval = settings.quiz_closer_interval
+
+    async def run_once(self) -> Optional[float]:
+        quizzes = Quiz.ormar_config.table
+        now = utc_now()
+        rows = await database.fetch_all(
+            sqlalchemy.select(quizzes.c.id)
+            .where(*_open_quizzes())
+            .where(quizzes.c.available_until <= now)
+        )
+        quiz_ids = [row[0] for row in rows]
+        if quiz_ids:
+            attempt_ids = await close_quizzes(quiz_ids, now)
+            await log_audit(
+                "quizzes_closed",
+                resource_type="quiz",
+                details={"quiz_ids": quiz_ids, "finalized_attempts": len(attempt_ids)},
+            )
+
+        next_due = await database.fetch_val(
+            sqlalchemy.select(sqlalchemy.func.min(quizzes.c.available_until))
+            .where(*_open_quizzes())
+            .where(quizzes.c.available_until > now)
+        )
+        if next_due is None:
+            return None
+        return (next_due - utc_now()).total_seconds()
+
+
+quiz_closer = QuizCloser()
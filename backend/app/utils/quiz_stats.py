@@ -0,0 +1,267 @@
+import math
+from typing import Optional, List, Dict, Iterable
+
+import sqlalchemy
+
+from app.database.database import database, dialect_insert, utc_now
+from app.database.models.attempt import QuizAttempt, Answer
+from app.database.models.quiz_stats import QuizStats, QuizScoreBucket, QuestionStats
+
+
+HISTOGRAM_BINS = 10
+
+
+def percentage(score: Optional[float], max_score: Optional[float]) -> float:
+    return (score or 0.0) / max_score * 100 if max_score else 0.0
+
+
+def _bucket(pct: float) -> int:
+    # one bucket per whole percent, so the median is exact to one percentage point
+    return min(max(int(pct), 0), 100)
+
+
+async def _add_buckets(quiz_id: int, deltas: Dict[int, int]) -> None:
+    table = QuizScoreBucket.ormar_config.table
+    for bucket, delta in deltas.items():
+        if not delta:
+            continue
+        query = dialect_insert(table).values(quiz_id=quiz_id, bucket=bucket, count=delta)
+        query = query.on_conflict_do_update(
+            index_elements=[table.c.quiz_id, table.c.bucket],
+            set_={"count": table.c.count + query.excluded.count},
+        )
+        await database.execute(query)
+
+
+async def _add_question_counts(condition) -> None:
+    """Add answered/correct counts of the answers of attempts matching condition."""
+    answers = Answer.ormar_config.table
+    attempts = QuizAttempt.ormar_config.table
+    table = QuestionStats.ormar_config.table
+    correct = sqlalchemy.func.sum(sqlalchemy.case((answers.c.is_correct.is_(True), 1), else_=0))
+    rows = await database.fetch_all(
+        sqlalchemy.select(
+            attempts.c.quiz, answers.c.question, sqlalchemy.func.count(), correct
+        )
+        .select_from(answers.join(attempts, answers.c.attempt == attempts.c.id))
+        .where(condition)
+        .group_by(attempts.c.quiz, answers.c.question)
+    )
+    for row in rows:
+        query = dialect_insert(table).values(
+            quiz_id=row[0],
+            question_id=row[1],
+            answered_count=row[2],
+            correct_count=row[3] or 0,
+        )
+        query = query.on_conflict_do_update(
+            index_elements=[table.c.quiz_id, table.c.question_id],
+            set_={
+                "answered_count": table.c.answered_count + query.excluded.answered_count,
+                "correct_count": table.c.correct_count + query.excluded.correct_count,
+            },
+        )
+        await database.execute(query)
+
+
+async def record_completed_attempts(attempt_ids: Iterable[int]) -> None:
+    """Fold freshly completed attempts into the materialized stats.
+
+    Quizzes whose stats have not been built yet are skipped; they are built
+    from scratch the first time they are read.
+    """
+    attempt_ids = list(attempt_ids)
+    if not attempt_ids:
+        return
+    attempts = QuizAttempt.ormar_config.table
+    stats = QuizStats.ormar_config.table
+    rows = await database.fetch_all(
+        sqlalchemy.select(
+            attempts.c.quiz, attempts.c.score, attempts.c.max_score, attempts.c.time_spent
+        )
+        .where(attempts.c.id.in_(attempt_ids))
+        .where(attempts.c.is_completed.is_(True))
+    )
+    by_quiz: Dict[int, list] = {}
+    for row in rows:
+        by_quiz.setdefault(row[0], []).append(row)
+
+    async with database.transaction():
+        materialized = []
+        for quiz_id, quiz_rows in by_quiz.items():
+            pcts = [percentage(r[1], r[2]) for r in quiz_rows]
+            times = [r[3] for r in quiz_rows if r[3] is not None]
+            updated = await database.fetch_val(
+                stats.update()
+                .where(stats.c.quiz_id == quiz_id)
+                .values(
+                    attempt_count=stats.c.attempt_count + len(pcts),
+                    percentage_sum=stats.c.percentage_sum + sum(pcts),
+                    percentage_sq_sum=stats.c.percentage_sq_sum + sum(p * p for p in pcts),
+                    time_spent_sum=stats.c.time_spent_sum + sum(times),
+                    time_spent_count=stats.c.time_spent_count + len(times),
+                    updated_at=utc_now(),
+                )
+                .returning(stats.c.quiz_id)
+            )
+            if updated is None:
+                continue
+            materialized.append(quiz_id)
+            deltas: Dict[int, int] = {}
+            for pct in pcts:
+                deltas[_bucket(pct)] = deltas.get(_bucket(pct), 0) + 1
+            await _add_buckets(quiz_id, deltas)
+        if materialized:
+            await _add_question_counts(
+                sqlalchemy.and_(
+                    attempts.c.id.in_(attempt_ids), attempts.c.quiz.in_(materialized)
+                )
+            )
+
+
+async def record_regrade(
+    quiz_id: int,
+    question_id: int,
+    old_percentage: float,
+    new_percentage: float,
+    correct_delta: int,
+) -> None:
+    """Move one completed attempt's contribution after a manual grade."""
+    stats = QuizStats.ormar_config.table
+    questions = QuestionStats.ormar_config.table
+    async with database.transaction():
+        updated = await database.fetch_val(
+            stats.update()
+            .where(stats.c.quiz_id == quiz_id)
+            .values(
+                percentage_sum=stats.c.percentage_sum + (new_percentage - old_percentage),
+                percentage_sq_sum=stats.c.percentage_sq_sum
+                + (new_percentage ** 2 - old_percentage ** 2),
+                updated_at=utc_now(),
+            )
+            .returning(stats.c.quiz_id)
+        )
+        if updated is None:
+            return
+        old_bucket, new_bucket = _bucket(old_percentage), _bucket(new_percentage)
+        if old_bucket != new_bucket:
+            await _add_buckets(quiz_id, {old_bucket: -1, new_bucket: 1})
+        if correct_delta:
+            await database.execute(
+                questions.update()
+                .where(questions.c.quiz_id == quiz_id)
+                .where(questions.c.question_id == question_id)
+                .values(correct_count=questions.c.correct_count + correct_delta)
+            )
+
+
+async def invalidate_quiz_stats(quiz_ids: Iterable[int]) -> None:
+    """Drop materialized stats after attempts or questions are deleted."""
+    quiz_ids = list(quiz_ids)
+    if not quiz_ids:
+        return
+    async with database.transaction():
+        for model in (QuizStats, QuizScoreBucket, QuestionStats):
+            table = model.ormar_config.table
+            await database.execute(table.delete().where(table.c.quiz_id.in_(quiz_ids)))
+
+
+async def rebuild_quiz_stats(quiz_id: int) -> None:
+    """Build stats for one quiz from its completed attempts."""
+    attempts = QuizAttempt.ormar_config.table
+    stats = QuizStats.ormar_config.table
+    completed = sqlalchemy.and_(
+        attempts.c.quiz == quiz_id, attempts.c.is_completed.is_(True)
+    )
+    async with database.transaction():
+        rows = await database.fetch_all(
+            sqlalchemy.select(attempts.c.score, attempts.c.max_score, attempts.c.time_spent)
+            .where(completed)
+        )
+        pcts = [percentage(r[0], r[1]) for r in rows]
+        times = [r[2] for r in rows if r[2] is not None]
+        created = await database.fetch_val(
+            dialect_insert(stats)
+            .values(
+                quiz_id=quiz_id,
+                attempt_count=len(pcts),
+                percentage_sum=sum(pcts),
+                percentage_sq_sum=sum(p * p for p in pcts),
+                time_spent_sum=sum(times),
+                time_spent_count=len(times),
+                updated_at=utc_now(),
+            )
+            .on_conflict_do_nothing(index_elements=[stats.c.quiz_id])
+            .returning(stats.c.quiz_id)
+        )
+        if created is None:
+            # built concurrently by another request
+            return
+        deltas: Dict[int, int] = {}
+        for pct in pcts:
+            deltas[_bucket(pct)] = deltas.get(_bucket(pct), 0) + 1
+        await _add_buckets(quiz_id, deltas)
+        await _add_question_counts(completed)
+
+
+def _bucket_at(buckets: Dict[int, int], rank: int) -> int:
+    seen = 0
+    for bucket in sorted(buckets):
+        seen += max(buckets[bucket], 0)
+        if seen >= rank:
+            return bucket
+    return max(buckets, default=0)
+
+
+def _median(buckets: Dict[int, int], count: int) -> Optional[float]:
+    if not count:
+        return None
+    if count % 2:
+        return float(_bucket_at(buckets, count // 2 + 1))
+    return (_bucket_at(buckets, count // 2) + _bucket_at(buckets, count // 2 + 1)) / 2
+
+
+async def get_quiz_stats(quiz_id: int) -> dict:
+    """Statistics for a quiz, read from the materialized tables."""
+    stats = await QuizStats.objects.get_or_none(quiz_id=quiz_id)
+    if stats is None:
+        await rebuild_quiz_stats(quiz_id)
+        stats = await QuizStats.objects.get(quiz_id=quiz_id)
+
+    buckets = {
+        b.bucket: b.count for b in await QuizScoreBucket.objects.filter(quiz_id=quiz_id).all()
+    }
+    histogram = [0] * HISTOGRAM_BINS
+    for bucket, n in buckets.items():
+        histogram[min(bucket * HISTOGRAM_BINS // 100, HISTOGRAM_BINS - 1)] += max(n, 0)
+
+    count = stats.attempt_count
+    mean = std = None
+    if count:
+        mean = stats.percentage_sum / count
+        std = math.sqrt(max(stats.percentage_sq_sum / count - mean * mean, 0.0))
+
+    question_rows = await QuestionStats.objects.filter(quiz_id=quiz_id).order_by("question_id").all()
+    questions: List[dict] = [
+        {
+            "question_id": q.question_id,
+            "answered_count": q.answered_count,
+            "correct_count": q.correct_count,
+            "correct_rate": q.correct_count / q.answered_count if q.answered_count else None,
+        }
+        for q in question_rows
+    ]
+
+    return {
+        "quiz_id": quiz_id,
+        "attempt_count": count,
+        "mean_percentage": mean,
+        "median_percentage": _median(buckets, count),
+        "std_percentage": std,
+        "histogram": histogram,
+        "avg_time_spent": (
+            stats.time_spent_sum / stats.time_spent_count if stats.time_spent_count else None
+        ),
+        "questions": questions,
+        "updated_at": stats.updated_at,
+    }
@@ -0,0 +1,230 @@
+import logging
+from typing import Any, Dict, Optional
+
+import sqlalchemy
+
+from app.database.database import database, utc_now
+from app.database.models.registration_request import (
+    ApprovalRunStatus,
+    RegistrationApprovalRun,
+    RegistrationRequest,
+    RegistrationStatus,
+)
+from app.database.models.user import User
+from app.utils.audit import log_audit
+from app.utils.jobs import PeriodicJob
+from app.utils.rows import chunked, fetch_tuples
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+def _pending_range(after_id: int, until_id: Optional[int]):
+    requests = RegistrationRequest.ormar_config.table
+    conditions = [
+        requests.c.status == RegistrationStatus.PENDING.value,
+        requests.c.id > after_id,
+    ]
+    if until_id is not None:
+        conditions.append(requests.c.id <= until_id)
+    return conditions
+
+
+async def pending_bounds() -> Dict[str, int]:
+    """Number of pending requests and the highest pending id."""
+    requests = RegistrationRequest.ormar_config.table
+    row = await database.fetch_one(
+        sqlalchemy.select(sqlalchemy.func.count(), sqlalchemy.func.max(requests.c.id))
+        .where(requests.c.status == RegistrationStatus.PENDING.value)
+    )
+    return {"count": row[0], "max_id": row[1] or 0}
+
+
+async def _taken(after_id: int, until_id: int) -> Dict[int, str]:
+    """Pending requests in the id range whose username or email is taken."""
+    requests = RegistrationRequest.ormar_config.table
+    users = User.ormar_config.table
+    in_range = _pending_range(after_id, until_id)
+    # one statement, each half joining on an indexed unique column
+    query = sqlalchemy.union_all(
+        sqlalchemy.select(requests.c.id, sqlalchemy.literal("username_taken"))
+        .select_from(requests.join(users, users.c.username == requests.c.username))
+        .where(*in_range),
+        sqlalchemy.select(requests.c.id, sqlalchemy.literal("email_taken"))
+        .select_from(requests.join(users, users.c.email == requests.c.email))
+        .where(*in_range),
+    )
+    taken: Dict[int, str] = {}
+    for row in await database.fetch_all(query):
+        taken.setdefault(row[0], row[1])
+    return taken
+
+
+async def approve_pending(
+    role: str,
+    reviewer_id: Optional[int],
+    after_id: int = 0,
+    until_id: Optional[int] = None,
+    limit: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Approve pending registration requests with after_id < id <= until_id.
+
+    Requests whose username or email clashes with an existing user or an
+    older request in the same call, and requests without a password, stay
+    pending and are reported in "skipped". Users are inserted and requests
+    marked approved in one transaction. Returns the number approved, the
+    skipped requests and the last request id looked at.
+    """
+    requests = RegistrationRequest.ormar_config.table
+    users = User.ormar_config.table
+    query = (
+        sqlalchemy.select(
+            requests.c.id, requests.c.username, requests.c.email, requests.c.first_name,
+            requests.c.last_name, requests.c.hashed_password, requests.c.ip_address,
+        )
+        .where(*_pending_range(after_id, until_id))
+        .order_by(requests.c.id)
+    )
+    if limit is not None:
+        query = query.limit(limit)
+    rows = await fetch_tuples(query)
+    result: Dict[str, Any] = {"approved": 0, "skipped": [], "last_request_id": after_id}
+    if not rows:
+        return result
+    last_id = rows[-1][0]
+    result["last_request_id"] = last_id
+
+    taken = await _taken(after_id, last_id)
+    now = utc_now()
+    new_users = []
+    approved_ids = []
+    usernames = set()
+    emails = set()
+    for request_id, username, email, first_name, last_name, hashed_password, ip_address in rows:
+        reason = taken.get(request_id)
+        if reason is None:
+            if username in usernames:
+                reason = "username_taken"
+            elif email in emails:
+                reason = "email_taken"
+            elif not hashed_password:
+                reason = "no_password"
+        if reason is not None:
+            result["skipped"].append({"request_id": request_id, "username": username, "reason": reason})
+            continue
+        usernames.add(username)
+        emails.add(email)
+        approved_ids.append(request_id)
+        new_users.append({
+            "username": username,
+            "email": email,
+            "first_name": first_name,
+            "last_name": last_name,
+            "hashed_password": hashed_password,
+            "role": role,
+            "is_active": True,
+            "registration_ip": ip_address,
+            "created_at": now,
+            "updated_at": now,
+        })
+
+    if new_users:
+        async with database.transaction():
+            for chunk in chunked(new_users):
+                await database.execute(users.insert().values(chunk))
+            for chunk in chunked(approved_ids):
+                await database.execute(
+                    requests.update()
+                    .where(requests.c.id.in_(chunk))
+                    .values(
+                        status=RegistrationStatus.APPROVED.value,
+                        reviewed_by=reviewer_id,
+                        reviewed_at=now,
+                    )
+                )
+    result["approved"] = len(approved_ids)
+    return result
+
+
+async def start_approval_run(role: str, requested_by: Optional[int]) -> RegistrationApprovalRun:
+    """Queue a background approval of everything pending right now."""
+    bounds = await pending_bounds()
+    run = await RegistrationApprovalRun.objects.create(
+        role=role,
+        requested_by=requested_by,
+        total=bounds["count"],
+        until_request_id=bounds["max_id"],
+    )
+    registration_approver.wake()
+    return run
+
+
+class RegistrationApprover(PeriodicJob):
+    """Works through queued approval runs, one batch per tick.
+
+    Each batch is its own transaction and the run's counters are updated
+    after it, so progress can be polled and a run interrupted by a restart
+    resumes where it stopped.
+    """
+
+    name = "registration_approver"
+
+    def __init__(self):
+        super().__init__()
+        self.interval = settings.registration_approver_interval
+
+    async def _finish(self, run: RegistrationApprovalRun, status: str, error: Optional[str] = None) -> None:
+        await run.update(
+            _columns=["status", "error", "finished_at"],
+            status=status,
+            error=error,
+            finished_at=utc_now(),
+        )
+        await log_audit(
+            "registration_approve_all",
+            user_id=run.requested_by,
+            resource_type="registration",
+            resource_id=str(run.id),
+            details={
+                "approved": run.approved,
+                "skipped": run.skipped,
+                "role": run.role,
+                "status": status,
+            },
+        )
+
+    async def run_once(self) -> Optional[float]:
+        runs = await RegistrationApprovalRun.objects.filter(
+            status__in=[ApprovalRunStatus.QUEUED.value, ApprovalRunStatus.RUNNING.value]
+        ).order_by("id").limit(1).all()
+        if not runs:
+            return None
+        run = runs[0]
+        try:
+            batch = await approve_pending(
+                run.role,
+                run.requested_by,
+                after_id=run.last_request_id,
+                until_id=run.until_request_id,
+                limit=settings.registration_approval_batch_size,
+            )
+        except Exception as exc:
+            logger.exception("Approval run %s failed", run.id)
+            await self._finish(run, ApprovalRunStatus.FAILED.value, str(exc)[:1000])
+            return 0
+
+        looked_at = batch["approved"] + len(batch["skipped"])
+        if not looked_at:
+            await self._finish(run, ApprovalRunStatus.COMPLETED.value)
+            return 0
+        await run.update(
+            _columns=["status", "processed", "approved", "skipped", "last_request_id"],
+            status=ApprovalRunStatus.RUNNING.value,
+            processed=run.processed + looked_at,
+            approved=run.approved + batch["approved"],
+            skipped=run.skipped + len(batch["skipped"]),
+            last_request_id=batch["last_request_id"],
+        )
+        return 0
+
+
+registration_approver = RegistrationApprover()
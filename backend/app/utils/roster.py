@@ -0,0 +1,148 @@
+import csv
+import io
+from typing import Any, Dict, List, Tuple
+
+import sqlalchemy
+from fastapi import HTTPException, status
+
+from app.database.database import database, dialect_insert, utc_now
+from app.database.models.group import GroupMember
+from app.database.models.user import User, UserRole
+from app.utils.counters import add_member_count
+from app.utils.rows import chunked
+
+# (row number, column, value); column is "id", "username" or "email"
+RosterEntry = Tuple[int, str, str]
+
+COLUMNS = ("id", "username", "email")
+CSV_HEADERS = {"id": "id", "user_id": "id", "username": "username", "email": "email"}
+MAX_CSV_BYTES = 2 * 1024 * 1024
+# users.id is a 32-bit INTEGER; larger ids cannot exist and are not looked up
+MAX_USER_ID = 2 ** 31 - 1
+
+
+def _entry(row: int, column: str, value: str) -> RosterEntry:
+    value = value.strip()
+    if column == "id" and value.isascii() and value.isdigit():
+        value = value.lstrip("0") or "0"
+    return row, column, value
+
+
+def roster_from_lists(user_ids: List[int], usernames: List[str], emails: List[str]) -> List[RosterEntry]:
+    values = (
+        [("id", str(user_id)) for user_id in user_ids]
+        + [("username", username) for username in usernames]
+        + [("email", email) for email in emails]
+    )
+    return [_entry(row, column, value) for row, (column, value) in enumerate(values, start=1)]
+
+
+def parse_roster_csv(data: bytes) -> List[RosterEntry]:
+    """Roster rows from a CSV whose header has id/user_id, username or email.
+
+    Each row names its user by the first non-empty of those columns, in
+    that order; rows are numbered by their line in the file.
+    """
+    try:
+        text = data.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="CSV must be UTF-8 encoded"
+        )
+    reader = csv.reader(io.StringIO(text))
+    header = next(reader, None) or []
+    columns = sorted(
+        (
+            (index, CSV_HEADERS[name.strip().lower()])
+            for index, name in enumerate(header)
+            if name.strip().lower() in CSV_HEADERS
+        ),
+        key=lambda item: COLUMNS.index(item[1]),
+    )
+    if not columns:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="CSV header must have an id, username or email column"
+        )
+    entries = []
+    for record in reader:
+        for index, column in columns:
+            if index < len(record) and record[index].strip():
+                entries.append(_entry(reader.line_num, column, record[index]))
+                break
+    return entries
+
+
+async def _resolve(entries: List[RosterEntry]) -> Dict[Tuple[str, str], Tuple[int, str]]:
+    """(column, value) -> (user id, role) for the users the roster names."""
+    users = User.ormar_config.table
+    wanted: Dict[str, set] = {column: set() for column in COLUMNS}
+    for _, column, value in entries:
+        if column != "id":
+            wanted[column].add(value)
+        elif value.isascii() and value.isdigit() and len(value) <= len(str(MAX_USER_ID)):
+            if int(value) <= MAX_USER_ID:
+                wanted[column].add(int(value))
+    found = {}
+    for column, values in wanted.items():
+        for chunk in chunked(list(values)):
+            rows = await database.fetch_all(
+                sqlalchemy.select(users.c[column], users.c.id, users.c.role)
+                .where(users.c[column].in_(chunk))
+            )
+            for row in rows:
+                found[(column, str(row[0]))] = (row[1], row[2])
+    return found
+
+
+async def enroll_roster(group_id: int, entries: List[RosterEntry]) -> Dict[str, Any]:
+    """Add the roster's students to the group, reporting an outcome per row.
+
+    Rows resolve to "enrolled", "already_member", "duplicate" (the user
+    is named by an earlier row), "not_found" or "not_student". New
+    memberships go in with multi-row INSERT ... ON CONFLICT DO NOTHING on
+    (group, user), so a concurrent join is reported as already_member
+    rather than failing. The whole enrollment is one transaction.
+    """
+    members = GroupMember.ormar_config.table
+    results = []
+    to_enroll: Dict[int, Dict[str, Any]] = {}
+    enrolled = set()
+    async with database.transaction():
+        found = await _resolve(entries)
+        for row, column, value in entries:
+            result = {"row": row, "value": value, "status": "not_found", "user_id": None}
+            match = found.get((column, value))
+            if match is not None:
+                user_id, role = match
+                result["user_id"] = user_id
+                if role != UserRole.STUDENT.value:
+                    result["status"] = "not_student"
+                elif user_id in to_enroll:
+                    result["status"] = "duplicate"
+                else:
+                    to_enroll[user_id] = result
+            results.append(result)
+
+        now = utc_now()
+        for chunk in chunked(list(to_enroll)):
+            rows = await database.fetch_all(
+                dialect_insert(members)
+                .values([{"group": group_id, "user": user_id, "joined_at": now} for user_id in chunk])
+                .on_conflict_do_nothing(index_elements=[members.c.group, members.c.user])
+                .returning(members.c.user)
+            )
+            enrolled.update(row[0] for row in rows)
+        if enrolled:
+            await add_member_count(group_id, len(enrolled))
+
+    for user_id, result in to_enroll.items():
+        result["status"] = "enrolled" if user_id in enrolled else "already_member"
+    return {
+        "enrolled": len(enrolled),
+        "already_member": len(to_enroll) - len(enrolled),
+        "skipped": len(results) - len(to_enroll),
+        "results": results,
+        "enrolled_user_ids": sorted(enrolled),
+    }
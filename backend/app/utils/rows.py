@@ -0,0 +1,81 @@
+from typing import Any, Dict, Iterator, List, Sequence, Type, TypeVar
+
+import sqlalchemy
+
+from app.database.database import database
+
+
+R = TypeVar("R", bound="Record")
+T = TypeVar("T")
+
+# rows per multi-row INSERT / ids per IN list, well under the bound
+# parameter limits of SQLite and asyncpg
+CHUNK_SIZE = 500
+
+
+class Record:
+    """Plain result row: one slot per selected column, no model machinery.
+
+    Subclasses list the columns they read in __slots__, in select order.
+    Hydrating an ormar model validates every field and builds relation
+    proxies; list endpoints that only copy a few columns into a response
+    do not need any of that.
+    """
+
+    __slots__ = ()
+
+    def __init__(self, *values: Any):
+        for name, value in zip(self.__slots__, values):
+            setattr(self, name, value)
+
+    @classmethod
+    def columns(cls, table: sqlalchemy.Table) -> List[sqlalchemy.Column]:
+        """The record's columns of table, for a single-table select."""
+        return [table.c[name] for name in cls.__slots__]
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+
+async def fetch_tuples(query: sqlalchemy.Select) -> List[tuple]:
+    """Rows of query as plain tuples, in select order."""
+    rows = await database.fetch_all(query)
+    if not rows:
+        return []
+    # index by position: iterating a databases record yields its keys
+    positions = range(len(rows[0]))
+    return [tuple(row[i] for i in positions) for row in rows]
+
+
+async def fetch_records(record_cls: Type[R], query: sqlalchemy.Select) -> List[R]:
+    """Rows of query as record_cls instances; columns map to slots by position."""
+    return [record_cls(*values) for values in await fetch_tuples(query)]
+
+
+def paginate(query: sqlalchemy.Select, page: int, per_page: int) -> sqlalchemy.Select:
+    """OFFSET/LIMIT for the 1-based page numbers the list endpoints take."""
+    return query.offset(max(page - 1, 0) * per_page).limit(per_page)
+
+
+async def count_rows(query: sqlalchemy.Select) -> int:
+    """Total rows query would return, ignoring its ordering and paging."""
+    inner = query.order_by(None).limit(None).offset(None).subquery()
+    return await database.fetch_val(sqlalchemy.select(sqlalchemy.func.count()).select_from(inner))
+
+
+def icontains(column: sqlalchemy.Column, term: str) -> sqlalchemy.ColumnElement:
+    """Case-insensitive substring match, like ormar's __icontains filter."""
+    return column.ilike(f"%{escape_like(term)}%", escape="\\")
+
+
+def escape_like(term: str) -> str:
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def chunked(items: Sequence[T], size: int = CHUNK_SIZE) -> Iterator[Sequence[T]]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
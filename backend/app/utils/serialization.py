@@ -0,0 +1,42 @@
+from decimal import Decimal
+from typing import Any, Optional
+
+import orjson
+from fastapi import Response
+from fastapi.responses import JSONResponse, ORJSONResponse
+
+from config import settings
+
+
+DEFAULT_RESPONSE_CLASS = ORJSONResponse if settings.orjson_responses else JSONResponse
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if hasattr(obj, "model_dump"):
+        return obj.model_dump(mode="json")
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(payload: Any) -> bytes:
+    """Compact UTF-8 JSON; datetimes come out in the same ISO form pydantic uses."""
+    return orjson.dumps(payload, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+def json_bytes_response(body: bytes, response: Optional[Response] = None) -> Response:
+    """Send pre-serialized JSON, keeping headers that dependencies set on response."""
+    headers = None
+    if response is not None:
+        headers = {k: v for k, v in response.headers.items() if k != "content-length"}
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def trusted_json(payload: Any, response: Optional[Response] = None) -> Response:
+    """Serialize a payload the endpoint built field by field, skipping response_model.
+
+    FastAPI would otherwise validate the return value against the model and
+    encode it a second time. Only use it when payload already has exactly
+    the documented fields: nothing is filtered out.
+    """
+    return json_bytes_response(dumps(payload), response)
@@ -2,6 +2,7 @@ import json
 from typing import Optional, Dict, Any
 
 from app.database.models.system_setting import SystemSetting
+from app.utils.http_cache import bump_versions, SETTINGS_KEY
 
 
 _SettingsKeys = frozenset({
@@ -81,6 +82,7 @@ async def set_setting(key: str, value: str):
         await s.update(value=value)
     else:
         await SystemSetting.objects.create(key=key, value=value)
+    await bump_versions(SETTINGS_KEY)
 
 
 async def set_bool(key: str, value: bool):
@@ -0,0 +1,259 @@
+import hashlib
+import logging
+import os
+import tempfile
+from datetime import timedelta
+from pathlib import Path
+from typing import BinaryIO, List, Optional, Tuple
+
+import sqlalchemy
+from fastapi import HTTPException, UploadFile, status
+from starlette.concurrency import run_in_threadpool
+
+from app.database.database import database, dialect_insert, utc_now
+from app.database.models.blob import Blob
+from app.database.models.quiz import Question
+from app.database.models.user import User
+from app.utils.jobs import PeriodicJob
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+
+UPLOADS_DIR = Path(__file__).resolve().parent.parent.parent / "static" / "uploads"
+# content-addressed store: blobs/<2 hex>/<2 hex>/<sha256><ext>
+BLOBS_DIR = UPLOADS_DIR / "blobs"
+
+CHUNK_SIZE = 64 * 1024
+FILE_MODE = 0o644
+SNIFF_BYTES = 16
+COLLECT_BATCH_SIZE = 500
+
+IMAGE_EXTENSIONS = {
+    "image/jpeg": ".jpg",
+    "image/png": ".png",
+    "image/gif": ".gif",
+    "image/webp": ".webp",
+}
+
+
+def sniff_image_type(head: bytes) -> Optional[str]:
+    """Image type from the file's leading magic bytes, or None if unrecognised."""
+    if head.startswith(b"\xff\xd8\xff"):
+        return "image/jpeg"
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "image/png"
+    if head.startswith((b"GIF87a", b"GIF89a")):
+        return "image/gif"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    return None
+
+
+def blob_path(digest: str, extension: str) -> Path:
+    return BLOBS_DIR / digest[:2] / digest[2:4] / f"{digest}{extension}"
+
+
+def upload_url(path: Path) -> str:
+    """Public URL of a file under UPLOADS_DIR."""
+    return "/uploads/" + path.relative_to(UPLOADS_DIR).as_posix()
+
+
+def _blob_url_expr(blobs):
+    """upload_url(blob_path(...)) as an SQL expression over the blobs table."""
+    digest = blobs.c.digest
+    return (
+        sqlalchemy.literal("/uploads/blobs/")
+        + sqlalchemy.func.substr(digest, 1, 2) + "/"
+        + sqlalchemy.func.substr(digest, 3, 2) + "/"
+        + digest + blobs.c.extension
+    )
+
+
+def _receive_image(src: BinaryIO, limit: int) -> Tuple[str, str, str, int]:
+    BLOBS_DIR.mkdir(parents=True, exist_ok=True)
+    # same file system as the final name, so the rename into place is atomic
+    fd, tmp_name = tempfile.mkstemp(dir=BLOBS_DIR, prefix=".upload-")
+    try:
+        size = 0
+        head = b""
+        digest = hashlib.sha256()
+        with os.fdopen(fd, "wb") as out:
+            src.seek(0)
+            while True:
+                chunk = src.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > limit:
+                    raise HTTPException(
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        detail=f"Image must be under {limit} bytes"
+                    )
+                if len(head) < SNIFF_BYTES:
+                    head += chunk[:SNIFF_BYTES - len(head)]
+                digest.update(chunk)
+                out.write(chunk)
+            out.flush()
+            os.fsync(out.fileno())
+
+        content_type = sniff_image_type(head)
+        if content_type not in settings.allowed_image_types:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Allowed types: {', '.join(settings.allowed_image_types)}"
+            )
+        # mkstemp creates the file owner-only; uploads are public
+        os.chmod(tmp_name, FILE_MODE)
+        return tmp_name, digest.hexdigest(), IMAGE_EXTENSIONS[content_type], size
+    except BaseException:
+        _remove(Path(tmp_name))
+        raise
+
+
+def _place(tmp_name: str, path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # always replace, even if the blob exists: the content is the same and
+    # the rename is atomic, while an existing file may be about to be
+    # unlinked by collect_blobs
+    os.replace(tmp_name, path)
+
+
+async def save_image_upload(file: UploadFile) -> Path:
+    """Store an uploaded image in the blob store and return its path.
+
+    The copy runs in a worker thread in fixed-size chunks, hashing as it
+    goes; the size limit is checked as bytes arrive and the type is taken
+    from the file's magic bytes. Identical content is stored once. The
+    blob row is touched before the file is placed, so the collector leaves
+    it alone until the caller has had time to reference it.
+    """
+    tmp_name, digest, extension, size = await run_in_threadpool(
+        _receive_image, file.file, settings.max_image_size
+    )
+    try:
+        table = Blob.ormar_config.table
+        now = utc_now()
+        await database.execute(
+            dialect_insert(table)
+            .values(digest=digest, extension=extension, size=size, touched_at=now)
+            .on_conflict_do_update(index_elements=[table.c.digest], set_={"touched_at": now})
+        )
+        path = blob_path(digest, extension)
+        await run_in_threadpool(_place, tmp_name, path)
+    except BaseException:
+        await run_in_threadpool(_remove, Path(tmp_name))
+        raise
+    return path
+
+
+def _remove(path: Path) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+async def remove_upload(url: Optional[str], directory: Path) -> None:
+    """Delete the file behind an /uploads/<dir>/ URL, if it is one of ours.
+
+    Only for files stored per upload before the blob store; blobs are
+    shared and left to the collector. Call after the row that held the URL
+    has dropped it: files another question still shows are kept.
+    """
+    prefix = f"/uploads/{directory.name}/"
+    if not url or not url.startswith(prefix):
+        return
+    name = url[len(prefix):]
+    if not name or "/" in name or name.startswith("."):
+        return
+    # cloned quizzes share image URLs with the questions they were copied from
+    questions = Question.ormar_config.table
+    still_used = await database.fetch_val(
+        sqlalchemy.select(
+            sqlalchemy.exists().where(
+                sqlalchemy.or_(questions.c.image_url == url, questions.c.image_display_url == url)
+            )
+        )
+    )
+    if still_used:
+        return
+    await run_in_threadpool(_remove, directory / name)
+
+
+def _remove_blob_files(blobs: List[Tuple[str, str]]) -> None:
+    for digest, extension in blobs:
+        path = blob_path(digest, extension)
+        _remove(path)
+        # derivatives are named <digest>.<size><ext> next to the blob
+        for derivative in path.parent.glob(f"{digest}.*"):
+            _remove(derivative)
+
+
+async def collect_blobs(grace_seconds: int) -> int:
+    """Delete blobs no question image or avatar refers to; returns how many.
+
+    References are counted from Question.image_url and User.avatar_url at
+    collection time, so every write path, bulk deletes included, keeps the
+    counts right without maintaining them. Blobs touched in the last
+    grace_seconds are skipped: their upload may not be referenced yet.
+    """
+    blobs = Blob.ormar_config.table
+    questions = Question.ormar_config.table
+    users = User.ormar_config.table
+    url = _blob_url_expr(blobs)
+    unreferenced = (
+        blobs.c.touched_at < utc_now() - timedelta(seconds=grace_seconds),
+        ~sqlalchemy.exists().where(questions.c.image_url == url),
+        ~sqlalchemy.exists().where(users.c.avatar_url == url),
+    )
+    collected = 0
+    last = ""
+    while True:
+        rows = await database.fetch_all(
+            sqlalchemy.select(blobs.c.digest)
+            .where(blobs.c.digest > last)
+            .order_by(blobs.c.digest)
+            .limit(COLLECT_BATCH_SIZE)
+        )
+        if not rows:
+            break
+        last = rows[-1][0]
+        # the reference check and the delete are one statement, so a blob
+        # referenced or re-uploaded meanwhile is kept. The files go before
+        # the delete commits: a re-upload of the same content waits on the
+        # deleted row, then inserts a new one and puts the file back.
+        async with database.transaction():
+            deleted = await database.fetch_all(
+                blobs.delete()
+                .where(blobs.c.digest.in_([row[0] for row in rows]))
+                .where(*unreferenced)
+                .returning(blobs.c.digest, blobs.c.extension)
+            )
+            if deleted:
+                await run_in_threadpool(_remove_blob_files, [(row[0], row[1]) for row in deleted])
+        collected += len(deleted)
+    return collected
+
+
+class BlobCollector(PeriodicJob):
+    """Reclaims blobs left unreferenced by deleted questions, quizzes and users.
+
+    Routes that drop references wake it; the interval catches the rest.
+    """
+
+    name = "blob_collector"
+
+    def __init__(self):
+        super().__init__()
+        self.interval = settings.blob_collector_interval
+
+    async def run_once(self) -> Optional[float]:
+        collected = await collect_blobs(settings.blob_grace_seconds)
+        if collected:
+            logger.info("Collected %d unreferenced blobs", collected)
+        return None
+
+
+blob_collector = BlobCollector()
+
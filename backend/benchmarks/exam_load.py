@@ -0,0 +1,416 @@
+"""Exam load test.
+
+Seeds groups, teachers, students and quizzes, then plays an exam: every
+student logs in and sits two quizzes while each teacher polls the
+student statuses of their group's quizzes until everyone is done. The
+steps are
+
+  login      POST /auth/login (a bcrypt check per student)
+  start      POST /attempts/start
+  questions  GET  /quizzes/{id}/questions?attempt_id=...
+  answer     POST /attempts/answer, once per question of the
+             one-per-page quiz
+  complete   POST /attempts/complete
+  batch      POST /attempts/submit-batch with complete, for the
+             all-on-page quiz
+  statuses   GET  /quizzes/{id}/student-statuses, teachers polling
+
+and for each it reports requests, failures, p50/p95/p99 latency,
+throughput over the whole run and SQL statements per request. Statements
+are counted in this process, per request, at the `databases` connection
+(BEGIN/COMMIT not included).
+
+The app is driven in-process through httpx's ASGI transport by default.
+With --uvicorn it is served by uvicorn in this process on a local port,
+so requests also pay for sockets and HTTP parsing. With --url it is an
+already running server using the same DATABASE_URL; statements are not
+counted then, and the server needs RATE_LIMIT_LOGIN raised, since every
+student logs in from one address. In-process the limit is lifted here.
+
+Logins dominate at the production bcrypt cost; --bcrypt-rounds seeds
+cheaper hashes to look at the rest. SQLite takes one writer at a time,
+so expect "database is locked" failures there at high --concurrency.
+
+It creates the tables and seeds its own rows, so point DATABASE_URL at a
+scratch database; it refuses to run against one that already has users.
+Needs httpx. Run it from backend/:
+
+    DATABASE_URL=sqlite+aiosqlite:////tmp/exam_load.db python -m benchmarks.exam_load \\
+        --students 200 --questions 20 --bcrypt-rounds 4
+"""
+import argparse
+import asyncio
+import random
+import time
+from collections import Counter, defaultdict
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+import bcrypt
+import httpx
+from databases.core import Connection
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.database.database import database, metadata, utc_now
+from app.database.models.group import Group, GroupMember
+from app.database.models.quiz import Quiz, Question, Option
+from app.database.models.user import User
+from app.utils.rows import chunked
+from config import settings
+
+
+PASSWORD = "load-test-password"
+STEP_HEADER = "x-load-step"
+STEPS = ["login", "start", "questions", "answer", "complete", "batch", "statuses"]
+
+_statements: ContextVar[Optional[List[int]]] = ContextVar("statements", default=None)
+
+
+def count_statements() -> None:
+    """Count every statement sent through a databases connection."""
+    for name in ("fetch_all", "fetch_one", "fetch_val", "execute", "execute_many"):
+        original = getattr(Connection, name)
+
+        def counted(self, *args, _original=original, **kwargs):
+            counter = _statements.get()
+            if counter is not None:
+                counter[0] += 1
+            return _original(self, *args, **kwargs)
+
+        setattr(Connection, name, counted)
+
+
+def counting_app(app, counts: Dict[str, List[int]]):
+    """ASGI wrapper recording statements per request under its step header."""
+    header = STEP_HEADER.encode()
+
+    async def wrapped(scope, receive, send):
+        if scope["type"] != "http":
+            return await app(scope, receive, send)
+        step = dict(scope["headers"]).get(header)
+        counter = [0]
+        token = _statements.set(counter)
+        try:
+            await app(scope, receive, send)
+        finally:
+            _statements.reset(token)
+            if step:
+                counts[step.decode()].append(counter[0])
+
+    return wrapped
+
+
+async def seed(args) -> List[dict]:
+    """Create the exam's rows; returns one dict per group."""
+    engine = create_async_engine(settings.database_url)
+    async with engine.begin() as conn:
+        await conn.run_sync(metadata.create_all)
+    await engine.dispose()
+    if await User.objects.count():
+        raise SystemExit("DATABASE_URL already has users; use a scratch database")
+
+    now = utc_now()
+    hashed = bcrypt.hashpw(PASSWORD.encode(), bcrypt.gensalt(rounds=args.bcrypt_rounds)).decode()
+    teachers = [
+        {"id": g + 1, "username": f"teacher{g}", "role": "teacher"} for g in range(args.groups)
+    ]
+    students = [
+        {"id": args.groups + i + 1, "username": f"student{i}", "role": "student"}
+        for i in range(args.students)
+    ]
+    for chunk in chunked(teachers + students):
+        await database.execute(User.ormar_config.table.insert().values([
+            {
+                **user,
+                "email": f"{user['username']}@example.com",
+                "first_name": user["username"].title(),
+                "last_name": "Load",
+                "hashed_password": hashed,
+                "is_active": True,
+                "created_at": now,
+                "updated_at": now,
+            }
+            for user in chunk
+        ]))
+
+    questions = Question.ormar_config.table
+    options = Option.ormar_config.table
+    members = GroupMember.ormar_config.table
+    next_question = 1
+    next_option = 1
+    exam = []
+    for g, teacher in enumerate(teachers):
+        roster = students[g::args.groups]
+        group = await Group.objects.create(
+            name=f"Load {g}", code=f"{g:06d}", teacher=teacher["id"], member_count=len(roster)
+        )
+        for chunk in chunked(roster):
+            await database.execute(members.insert().values([
+                {"group": group.id, "user": student["id"], "joined_at": now} for student in chunk
+            ]))
+        quiz_ids = {}
+        for mode in ("one_per_page", "all_on_page"):
+            quiz = await Quiz.objects.create(
+                title=f"Load {g} {mode}",
+                group=group,
+                teacher=teacher["id"],
+                manual_close=True,
+                question_display_mode=mode,
+                question_count=args.questions,
+            )
+            quiz_ids[mode] = quiz.id
+            question_rows = []
+            option_rows = []
+            for q in range(args.questions):
+                question_rows.append({
+                    "id": next_question,
+                    "quiz": quiz.id,
+                    "question_type": "single_choice",
+                    "input_type": "select",
+                    "text": f"Question {q + 1}",
+                    "order": q,
+                    "points": 1.0,
+                    "created_at": now,
+                    "updated_at": now,
+                })
+                for o in range(args.options):
+                    option_rows.append({
+                        "id": next_option,
+                        "question": next_question,
+                        "text": f"Option {o + 1}",
+                        "is_correct": o == 0,
+                        "order": o,
+                        "created_at": now,
+                        "updated_at": now,
+                    })
+                    next_option += 1
+                next_question += 1
+            for chunk in chunked(question_rows):
+                await database.execute(questions.insert().values(chunk))
+            for chunk in chunked(option_rows):
+                await database.execute(options.insert().values(chunk))
+        exam.append({
+            "teacher": teacher["username"],
+            "students": [student["username"] for student in roster],
+            "paged_quiz": quiz_ids["one_per_page"],
+            "batch_quiz": quiz_ids["all_on_page"],
+        })
+    return exam
+
+
+class Recorder:
+    """Client-side latencies and failures per step."""
+
+    def __init__(self):
+        self.seconds: Dict[str, List[float]] = defaultdict(list)
+        self.failures: Counter = Counter()
+        self.first_failure: Dict[str, str] = {}
+
+    async def call(
+        self, client: httpx.AsyncClient, step: str, method: str, url: str,
+        token: Optional[str] = None, **kwargs
+    ) -> Optional[httpx.Response]:
+        headers = {STEP_HEADER: step}
+        if token:
+            headers["Authorization"] = f"Bearer {token}"
+        start = time.perf_counter()
+        try:
+            response = await client.request(method, url, headers=headers, **kwargs)
+        except httpx.HTTPError as exc:
+            response = None
+            failure = f"{type(exc).__name__}: {exc}"
+        else:
+            failure = f"{response.status_code}: {response.text[:200]}" if response.is_error else None
+        self.seconds[step].append(time.perf_counter() - start)
+        if failure is not None:
+            self.failures[step] += 1
+            self.first_failure.setdefault(step, failure)
+            return None
+        return response
+
+
+async def login(client, recorder: Recorder, username: str) -> Optional[str]:
+    response = await recorder.call(
+        client, "login", "POST", "/auth/login", json={"username": username, "password": PASSWORD}
+    )
+    return response.json()["access_token"] if response else None
+
+
+async def sit_quiz(client, recorder: Recorder, token: str, quiz_id: int, batch: bool, rng: random.Random):
+    response = await recorder.call(client, "start", "POST", "/attempts/start", token, json={"quiz_id": quiz_id})
+    if not response:
+        return
+    attempt_id = response.json()["id"]
+    response = await recorder.call(
+        client, "questions", "GET", f"/quizzes/{quiz_id}/questions", token, params={"attempt_id": attempt_id}
+    )
+    if not response:
+        return
+    answers = [
+        {
+            "question_id": question["id"],
+            "selected_options": [rng.choice(question["options"])["id"]],
+            "time_spent": rng.randint(5, 60),
+        }
+        for question in response.json()
+    ]
+    if batch:
+        await recorder.call(
+            client, "batch", "POST", "/attempts/submit-batch", token,
+            json={"attempt_id": attempt_id, "answers": answers, "complete": True},
+        )
+        return
+    for answer in answers:
+        await recorder.call(client, "answer", "POST", "/attempts/answer", token, json=answer)
+    await recorder.call(client, "complete", "POST", "/attempts/complete", token, json={"attempt_id": attempt_id})
+
+
+async def student(client, recorder: Recorder, limit: asyncio.Semaphore, username: str, group: dict, seed: int):
+    rng = random.Random(f"{seed}:{username}")
+    async with limit:
+        token = await login(client, recorder, username)
+        if token is None:
+            return
+        await sit_quiz(client, recorder, token, group["paged_quiz"], False, rng)
+        await sit_quiz(client, recorder, token, group["batch_quiz"], True, rng)
+
+
+async def teacher(client, recorder: Recorder, group: dict, done: asyncio.Event, interval: float):
+    token = await login(client, recorder, group["teacher"])
+    if token is None:
+        return
+    while not done.is_set():
+        for quiz_id in (group["paged_quiz"], group["batch_quiz"]):
+            await recorder.call(client, "statuses", "GET", f"/quizzes/{quiz_id}/student-statuses", token)
+        try:
+            await asyncio.wait_for(done.wait(), interval)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def run_exam(client: httpx.AsyncClient, exam: List[dict], args) -> tuple:
+    recorder = Recorder()
+    limit = asyncio.Semaphore(args.concurrency or args.students or 1)
+    done = asyncio.Event()
+    start = time.perf_counter()
+    pollers = [
+        asyncio.create_task(teacher(client, recorder, group, done, args.poll_interval))
+        for group in exam
+    ]
+    await asyncio.gather(*(
+        student(client, recorder, limit, username, group, args.seed)
+        for group in exam
+        for username in group["students"]
+    ))
+    done.set()
+    await asyncio.gather(*pollers)
+    return recorder, time.perf_counter() - start
+
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    rank = max(1, round(p / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def report(recorder: Recorder, counts: Optional[Dict[str, List[int]]], wall: float) -> None:
+    print(
+        f"{'step':>10} {'requests':>9} {'failed':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}"
+        f" {'req/s':>8} {'stmts/req':>10} {'max':>5}"
+    )
+    total = 0
+    for step in STEPS:
+        seconds = sorted(recorder.seconds.get(step, []))
+        if not seconds:
+            continue
+        total += len(seconds)
+        line = (
+            f"{step:>10} {len(seconds):>9} {recorder.failures[step]:>7}"
+            + "".join(f" {percentile(seconds, p) * 1000:>9.1f}" for p in (50, 95, 99))
+            + f" {len(seconds) / wall:>8.1f}"
+        )
+        statements = (counts or {}).get(step)
+        if statements:
+            line += f" {sum(statements) / len(statements):>10.1f} {max(statements):>5}"
+        else:
+            line += f" {'-':>10} {'-':>5}"
+        print(line)
+    print(f"{total} requests in {wall:.2f}s, {total / wall:.1f} req/s")
+    for step, failure in recorder.first_failure.items():
+        print(f"first {step} failure: {failure}")
+
+
+async def serve_with_uvicorn(app, port: int):
+    import uvicorn
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    task = asyncio.create_task(server.serve())
+    while not server.started:
+        if task.done():
+            task.result()
+        await asyncio.sleep(0.05)
+    return server, task
+
+
+async def main(args):
+    await database.connect()
+    try:
+        exam = await seed(args)
+        print(
+            f"{args.groups} groups, {args.students} students, 2 quizzes of {args.questions}"
+            f" questions per group, concurrency {args.concurrency or args.students}"
+        )
+        timeout = httpx.Timeout(120.0)
+        if args.url:
+            async with httpx.AsyncClient(base_url=args.url, timeout=timeout) as client:
+                recorder, wall = await run_exam(client, exam, args)
+            report(recorder, None, wall)
+            return
+
+        from main import app
+
+        settings.rate_limit_login = max(settings.rate_limit_login, 2 * (args.students + args.groups))
+        counts: Dict[str, List[int]] = defaultdict(list)
+        count_statements()
+        wrapped = counting_app(app, counts)
+        if args.uvicorn:
+            server, task = await serve_with_uvicorn(wrapped, args.port)
+            try:
+                limits = httpx.Limits(max_connections=args.concurrency or args.students)
+                async with httpx.AsyncClient(
+                    base_url=f"http://127.0.0.1:{args.port}", timeout=timeout, limits=limits
+                ) as client:
+                    recorder, wall = await run_exam(client, exam, args)
+            finally:
+                server.should_exit = True
+                await task
+        else:
+            transport = httpx.ASGITransport(app=wrapped, raise_app_exceptions=False)
+            async with app.router.lifespan_context(app):
+                async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=timeout) as client:
+                    recorder, wall = await run_exam(client, exam, args)
+        report(recorder, counts, wall)
+    finally:
+        if database.is_connected:
+            await database.disconnect()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--groups", type=int, default=4)
+    parser.add_argument("--students", type=int, default=200, help="in total, spread over the groups")
+    parser.add_argument("--questions", type=int, default=20, help="per quiz")
+    parser.add_argument("--options", type=int, default=4, help="per question")
+    parser.add_argument("--concurrency", type=int, default=0, help="students in flight; 0 for all at once")
+    parser.add_argument("--poll-interval", type=float, default=2.0, help="seconds between teacher polls")
+    parser.add_argument("--bcrypt-rounds", type=int, default=settings.bcrypt_rounds)
+    parser.add_argument("--seed", type=int, default=1, help="for the students' answer choices")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--uvicorn", action="store_true", help="serve the app with uvicorn in this process")
+    mode.add_argument("--url", help="drive a running server instead")
+    parser.add_argument("--port", type=int, default=8765, help="for --uvicorn")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
@@ -0,0 +1,103 @@
+"""Item analysis benchmark.
+
+Times the vectorized statistics ("numpy", given the score matrix) and the
+full report built from query rows ("report", including option decoding) on
+synthetic data up to 10k attempts x 100 questions. "python" is a row-by-row
+baseline for difficulty and discrimination, run on the smaller sizes.
+No database is touched, but the app settings are loaded, so run it from
+backend/ with the usual .env:
+
+    python -m benchmarks.item_analysis
+"""
+import math
+import time
+
+import numpy as np
+
+from app.utils.item_analysis import _build_report, analyze_items
+from app.utils.packed_ids import pack_ids
+
+
+SIZES = [(100, 10), (1_000, 50), (10_000, 100)]
+OPTIONS_PER_QUESTION = 4
+BASELINE_MAX_CELLS = 100_000
+
+
+def synthetic_rows(n_attempts: int, n_questions: int, seed: int = 0):
+    """Rows shaped like the production query, drawn from a 2PL response model."""
+    rng = np.random.default_rng(seed)
+    ability = rng.normal(size=n_attempts)
+    difficulty = rng.normal(size=n_questions)
+    discrimination = rng.uniform(0.5, 2.0, size=n_questions)
+    p = 1 / (1 + np.exp(-discrimination * (ability[:, None] - difficulty)))
+    correct = rng.random((n_attempts, n_questions)) < p
+    wrong_choice = rng.integers(1, OPTIONS_PER_QUESTION, size=(n_attempts, n_questions))
+
+    question_rows = [(q + 1, 1.0) for q in range(n_questions)]
+    option_rows = [
+        (q * OPTIONS_PER_QUESTION + o + 1, q + 1, o == 0)
+        for q in range(n_questions)
+        for o in range(OPTIONS_PER_QUESTION)
+    ]
+    answer_rows = []
+    for a in range(n_attempts):
+        for q in range(n_questions):
+            choice = 0 if correct[a, q] else int(wrong_choice[a, q])
+            answer_rows.append((
+                a + 1,
+                q + 1,
+                1.0 if correct[a, q] else 0.0,
+                pack_ids([q * OPTIONS_PER_QUESTION + choice + 1]),
+            ))
+    return answer_rows, question_rows, option_rows
+
+
+def baseline(answer_rows, n_questions: int):
+    """Difficulty, discrimination and alpha computed row by row."""
+    by_attempt = {}
+    for attempt_id, question_id, earned, _ in answer_rows:
+        by_attempt.setdefault(attempt_id, [0.0] * n_questions)[question_id - 1] = earned
+    matrix = list(by_attempt.values())
+    n = len(matrix)
+    totals = [sum(row) for row in matrix]
+    result = []
+    for q in range(n_questions):
+        item = [row[q] for row in matrix]
+        rest = [totals[i] - item[i] for i in range(n)]
+        mi, mr = sum(item) / n, sum(rest) / n
+        cov = sum((item[i] - mi) * (rest[i] - mr) for i in range(n))
+        si = math.sqrt(sum((x - mi) ** 2 for x in item))
+        sr = math.sqrt(sum((x - mr) ** 2 for x in rest))
+        result.append((mi, cov / (si * sr) if si and sr else None))
+    return result
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    value = fn(*args)
+    return value, time.perf_counter() - start
+
+
+def main():
+    print(f"{'attempts':>8} {'questions':>9} {'rows':>9} {'numpy':>9} {'report':>9} {'python':>9}")
+    for n_attempts, n_questions in SIZES:
+        answer_rows, question_rows, option_rows = synthetic_rows(n_attempts, n_questions)
+        scores = np.array([row[2] for row in answer_rows]).reshape(n_attempts, n_questions)
+        stats, t_matrix = timed(analyze_items, scores)
+        report, t_report = timed(_build_report, answer_rows, question_rows, option_rows)
+        assert report["attempt_count"] == n_attempts
+
+        t_baseline = None
+        if n_attempts * n_questions <= BASELINE_MAX_CELLS:
+            expected, t_baseline = timed(baseline, answer_rows, n_questions)
+            assert np.allclose(stats["difficulty"], [d for d, _ in expected])
+        print(
+            f"{n_attempts:>8} {n_questions:>9} {len(answer_rows):>9} "
+            f"{t_matrix * 1000:>7.1f}ms {t_report * 1000:>7.1f}ms "
+            + (f"{t_baseline * 1000:>7.1f}ms" if t_baseline is not None else f"{'-':>9}")
+        )
+        print(f"{'':>8} alpha={stats['cronbach_alpha']:.3f}")
+
+
+if __name__ == "__main__":
+    main()
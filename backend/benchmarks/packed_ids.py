@@ -0,0 +1,93 @@
+"""Packed id list benchmark.
+
+Compares the JSON text that selected_options and questions_order used to
+hold with the packed int32 form (app.utils.packed_ids) on synthetic
+result sets: bytes stored, per-row decode as the result endpoints do it
+("json.loads" vs "unpack_ids"), and the bulk decode item analysis does
+over a whole column ("np text" parses the joined JSON with
+np.fromstring, "np packed" reads the joined bytes with np.frombuffer).
+
+Ids are drawn around 1e5-1e6, as on a database that has been in use for
+a while. Nothing is touched, but the app settings are loaded, so run it
+from backend/ with the usual .env:
+
+    python -m benchmarks.packed_ids
+"""
+import json
+import random
+import time
+
+import numpy as np
+
+from app.utils.packed_ids import pack_ids, unpack_ids
+
+
+# (label, rows, ids per row)
+CASES = [
+    ("selected_options", 1_000_000, (1, 3)),
+    ("questions_order", 10_000, (20, 200)),
+]
+REPEAT = 3
+
+
+def synthetic_lists(rows: int, per_row, seed: int = 0):
+    rng = random.Random(seed)
+    low, high = per_row
+    return [
+        [rng.randrange(100_000, 1_000_000) for _ in range(rng.randint(low, high))]
+        for _ in range(rows)
+    ]
+
+
+def best_of(fn, *args) -> float:
+    best = float("inf")
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def decode_json(texts):
+    return [json.loads(text) for text in texts]
+
+
+def decode_packed(blobs):
+    return [unpack_ids(blob) for blob in blobs]
+
+
+def bulk_json(texts):
+    flat = ",".join(texts).replace("[", "").replace("]", ",-1")
+    return np.fromstring(flat, dtype=np.int64, sep=",")
+
+
+def bulk_packed(blobs):
+    return np.frombuffer(b"".join(blobs), dtype="<i4").astype(np.int64)
+
+
+def main():
+    print(
+        f"{'column':>16} {'rows':>9} {'json MB':>8} {'packed MB':>10}"
+        f" {'json.loads':>11} {'unpack_ids':>11} {'np text':>9} {'np packed':>10}"
+    )
+    for label, rows, per_row in CASES:
+        lists = synthetic_lists(rows, per_row)
+        texts = [json.dumps(ids) for ids in lists]
+        blobs = [pack_ids(ids) for ids in lists]
+        assert decode_packed(blobs) == lists == decode_json(texts)
+
+        json_size = sum(len(text.encode()) for text in texts)
+        packed_size = sum(map(len, blobs))
+        t_json = best_of(decode_json, texts)
+        t_packed = best_of(decode_packed, blobs)
+        t_bulk_json = best_of(bulk_json, texts)
+        t_bulk_packed = best_of(bulk_packed, blobs)
+        print(
+            f"{label:>16} {rows:>9} {json_size / 1e6:>8.1f} {packed_size / 1e6:>10.1f}"
+            f" {t_json * 1000:>9.0f}ms {t_packed * 1000:>9.0f}ms"
+            f" {t_bulk_json * 1000:>7.0f}ms {t_bulk_packed * 1000:>8.0f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
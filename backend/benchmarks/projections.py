@@ -0,0 +1,219 @@
+"""Row projection benchmark.
+
+Times three ways of reading list-endpoint rows, and what they allocate:
+
+  "ormar"    QuerySet.all(), hydrating models (with select_related for
+             the joined case) and then copying the fields needed
+  "records"  Core select of just those columns, as __slots__ Records
+             (fetch_records)
+  "tuples"   the same select as plain tuples (fetch_tuples)
+
+for an audit log page (one table) and a quiz's completed attempts with
+the student's name (a join), at 50 to 5000 rows. Allocations are the
+tracemalloc peak of one call.
+
+It creates the tables and seeds its own rows, so point DATABASE_URL at a
+scratch database; it refuses to run against one that already has users.
+Run it from backend/:
+
+    DATABASE_URL=sqlite+aiosqlite:////tmp/projections.db python -m benchmarks.projections
+"""
+import asyncio
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+import sqlalchemy
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.database.database import database, metadata
+from app.database.models.audit_log import AuditLog
+from app.database.models.attempt import QuizAttempt
+from app.database.models.group import Group
+from app.database.models.quiz import Quiz
+from app.database.models.user import User
+from app.utils.rows import Record, fetch_records, fetch_tuples
+from config import settings
+from schemas import AuditLogResponse
+
+
+SIZES = [50, 500, 5000]
+SEED_ROWS = max(SIZES)
+REPEAT = 5
+
+
+class AuditLogRow(Record):
+    __slots__ = tuple(AuditLogResponse.model_fields)
+
+
+class ResultRow(Record):
+    __slots__ = ("id", "student", "first_name", "last_name", "score", "max_score", "completed_at")
+
+
+async def seed() -> int:
+    engine = create_async_engine(settings.database_url)
+    async with engine.begin() as conn:
+        await conn.run_sync(metadata.create_all)
+    await engine.dispose()
+    if await User.objects.count():
+        raise SystemExit("DATABASE_URL already has users; use a scratch database")
+
+    start = datetime(2026, 3, 1, 9, 0, 0)
+    users = User.ormar_config.table
+    await database.execute(
+        sqlalchemy.insert(users).values([
+            {
+                "id": i + 1,
+                "username": f"user{i}",
+                "email": f"user{i}@example.com",
+                "first_name": f"First{i}",
+                "last_name": f"Last{i}",
+                "hashed_password": "x",
+                "role": "teacher" if i == 0 else "student",
+                "is_active": True,
+                "created_at": start,
+                "updated_at": start,
+            }
+            for i in range(SEED_ROWS + 1)
+        ])
+    )
+    group = await Group.objects.create(name="Benchmark", code="000000", teacher=1)
+    quiz = await Quiz.objects.create(title="Benchmark", group=group, teacher=1)
+    await database.execute(
+        sqlalchemy.insert(QuizAttempt.ormar_config.table).values([
+            {
+                "quiz": quiz.id,
+                "student": i + 2,
+                "score": float(i % 20),
+                "max_score": 20.0,
+                "started_at": start,
+                "completed_at": start + timedelta(minutes=30, seconds=i),
+                "time_spent": 1800 + i,
+                "is_completed": True,
+            }
+            for i in range(SEED_ROWS)
+        ])
+    )
+    await database.execute(
+        sqlalchemy.insert(AuditLog.ormar_config.table).values([
+            {
+                "created_at": start + timedelta(seconds=i),
+                "user_id": i % 100 + 1,
+                "username": f"user{i % 100}",
+                "action": "quiz_attempt_started",
+                "resource_type": "attempt",
+                "resource_id": str(i),
+                "details": '{"quiz_id": 1}',
+                "ip_address": "203.0.113.7",
+                "user_agent": "Mozilla/5.0 (X11; Linux x86_64) benchmark",
+            }
+            for i in range(SEED_ROWS)
+        ])
+    )
+    return quiz.id
+
+
+def audit_log_readers(limit: int):
+    table = AuditLog.ormar_config.table
+    query = (
+        sqlalchemy.select(*AuditLogRow.columns(table))
+        .order_by(table.c.created_at.desc())
+        .limit(limit)
+    )
+
+    async def ormar():
+        logs = await AuditLog.objects.order_by("-created_at").limit(limit).all()
+        return [AuditLogResponse.model_validate(log).model_dump() for log in logs]
+
+    async def records():
+        return [row.as_dict() for row in await fetch_records(AuditLogRow, query)]
+
+    async def tuples():
+        names = AuditLogRow.__slots__
+        return [dict(zip(names, row)) for row in await fetch_tuples(query)]
+
+    return ormar, records, tuples
+
+
+def result_readers(quiz_id: int, limit: int):
+    attempts = QuizAttempt.ormar_config.table
+    users = User.ormar_config.table
+    query = (
+        sqlalchemy.select(
+            attempts.c.id,
+            attempts.c.student,
+            users.c.first_name,
+            users.c.last_name,
+            attempts.c.score,
+            attempts.c.max_score,
+            attempts.c.completed_at,
+        )
+        .select_from(attempts.join(users, attempts.c.student == users.c.id))
+        .where(attempts.c.quiz == quiz_id, attempts.c.is_completed == True)
+        .order_by(attempts.c.score.desc(), attempts.c.id)
+        .limit(limit)
+    )
+
+    async def ormar():
+        rows = await QuizAttempt.objects.select_related("student").filter(
+            quiz=quiz_id, is_completed=True
+        ).order_by(["-score", "id"]).limit(limit).all()
+        return [
+            (a.id, a.student.id, f"{a.student.first_name} {a.student.last_name}", a.score, a.completed_at)
+            for a in rows
+        ]
+
+    async def records():
+        return [
+            (r.id, r.student, f"{r.first_name} {r.last_name}", r.score, r.completed_at)
+            for r in await fetch_records(ResultRow, query)
+        ]
+
+    async def tuples():
+        return [
+            (id_, student, f"{first} {last}", score, completed_at)
+            for id_, student, first, last, score, max_score, completed_at in await fetch_tuples(query)
+        ]
+
+    return ormar, records, tuples
+
+
+async def measure(reader):
+    best = float("inf")
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        await reader()
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    await reader()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak
+
+
+async def main():
+    await database.connect()
+    try:
+        quiz_id = await seed()
+        print(f"{'case':>8} {'rows':>5} " + " ".join(
+            f"{name + ' ms':>11} {name + ' KiB':>12}" for name in ("ormar", "records", "tuples")
+        ))
+        for case, readers in (
+            ("audit", audit_log_readers),
+            ("results", lambda n: result_readers(quiz_id, n)),
+        ):
+            for n in SIZES:
+                ormar, records, tuples = readers(n)
+                expected = await ormar()
+                assert await records() == expected and await tuples() == expected
+                line = f"{case:>8} {n:>5}"
+                for reader in (ormar, records, tuples):
+                    seconds, peak = await measure(reader)
+                    line += f" {seconds * 1000:>11.2f} {peak / 1024:>12.0f}"
+                print(line)
+    finally:
+        await database.disconnect()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
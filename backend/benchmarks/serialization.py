@@ -0,0 +1,125 @@
+"""Response serialization benchmark.
+
+Times three ways of turning an attempt result sheet (QuizResultResponse)
+into response bytes, for 10 to 500 questions:
+
+  "stdlib"   response_model validation, then the stdlib json encoder
+             (FastAPI's default path)
+  "orjson"   response_model validation, then orjson (orjson_responses=True)
+  "trusted"  orjson on the endpoint's own dict, skipping validation
+             (trusted_json)
+
+No database is touched, but the app settings are loaded, so run it from
+backend/ with the usual .env:
+
+    python -m benchmarks.serialization
+"""
+import json
+import random
+import time
+from datetime import datetime, timedelta
+
+from app.utils.serialization import dumps
+from schemas import QuizResultResponse
+
+
+SIZES = [10, 100, 500]
+OPTIONS_PER_QUESTION = 4
+
+
+def result_sheet(n_questions: int, seed: int = 0) -> dict:
+    """Payload shaped like get_attempt_results for one completed attempt."""
+    rng = random.Random(seed)
+    started_at = datetime(2026, 3, 1, 9, 0, 0, 123456)
+    answers = []
+    for q in range(n_questions):
+        option_ids = [q * OPTIONS_PER_QUESTION + o + 1 for o in range(OPTIONS_PER_QUESTION)]
+        selected = [rng.choice(option_ids)]
+        is_correct = selected[0] == option_ids[0]
+        answers.append({
+            "question_id": q + 1,
+            "question_text": f"Question {q + 1}: " + "lorem ipsum dolor sit amet " * 4,
+            "question_image_url": None,
+            "input_type": "select",
+            "selected_options": selected,
+            "selected_texts": [f"Option {selected[0]}"],
+            "text_answer": None,
+            "correct_options": option_ids[:1],
+            "correct_option_texts": [f"Option {option_ids[0]}"],
+            "correct_text_answer": None,
+            "is_correct": is_correct,
+            "points_earned": 1.0 if is_correct else 0.0,
+            "max_points": 1.0,
+        })
+    score = sum(a["points_earned"] for a in answers)
+    return {
+        "attempt": {
+            "id": 1,
+            "quiz_id": 1,
+            "student_id": 1,
+            "score": score,
+            "max_score": float(n_questions),
+            "started_at": started_at,
+            "completed_at": started_at + timedelta(minutes=40),
+            "time_spent": 2400,
+            "is_completed": True,
+            "status": "completed",
+            "questions_order": rng.sample(range(1, n_questions + 1), n_questions),
+            "needs_manual_grading": False,
+        },
+        "answers": answers,
+        "percentage": score / n_questions * 100,
+        "allow_show_answers": True,
+        "show_results": True,
+        "allow_math": False,
+    }
+
+
+def validated(payload: dict):
+    # what FastAPI's serialize_response does with a response_model
+    return QuizResultResponse.model_validate(payload).model_dump(mode="json")
+
+
+def stdlib(payload: dict) -> bytes:
+    content = validated(payload)
+    return json.dumps(
+        content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def validated_orjson(payload: dict) -> bytes:
+    return dumps(validated(payload))
+
+
+def trusted(payload: dict) -> bytes:
+    return dumps(payload)
+
+
+def timeit(fn, payload, repeat: int = 5) -> float:
+    best = float("inf")
+    loops = max(1, 2000 // len(payload["answers"]))
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(loops):
+            fn(payload)
+        best = min(best, (time.perf_counter() - start) / loops)
+    return best
+
+
+def main():
+    print(f"{'questions':>9} {'bytes':>8} {'stdlib ms':>10} {'orjson ms':>10} {'trusted ms':>11} {'speedup':>8}")
+    for n_questions in SIZES:
+        payload = result_sheet(n_questions)
+        assert json.loads(stdlib(payload)) == json.loads(trusted(payload))
+        size = len(trusted(payload))
+        t_std = timeit(stdlib, payload)
+        t_orjson = timeit(validated_orjson, payload)
+        t_trusted = timeit(trusted, payload)
+        print(
+            f"{n_questions:>9} {size:>8} {t_std * 1000:>10.3f} {t_orjson * 1000:>10.3f}"
+            f" {t_trusted * 1000:>11.3f} {t_std / t_trusted:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -17,6 +17,11 @@ class Settings(BaseSettings):
     admin_init_enabled: bool = True
     max_image_size: int = 5 * 1024 * 1024
     allowed_image_types: list = ["image/jpeg", "image/png", "image/gif", "image/webp"]
+    max_image_pixels: int = 40_000_000
+    image_derivative_format: str = "webp"
+    image_workers: int = 2
+    # internal proxy location for uploads (X-Accel-Redirect); empty serves them directly
+    upload_accel_redirect: str = ""
     cors_origins: list = [
         "http://localhost:5173",
         "http://localhost:4173",
@@ -24,6 +29,19 @@ class Settings(BaseSettings):
         "http://192.168.68.108:5173",
         "https://quizzez.site",
     ]
+    background_jobs_enabled: bool = True
+    timer_grace_seconds: int = 15
+    timer_poll_seconds: float = 5.0
+    quiz_closer_interval: float = 30.0
+    counter_reconcile_interval: float = 3600.0
+    blob_collector_interval: float = 3600.0
+    blob_grace_seconds: int = 600
+    registration_approval_batch_size: int = 1000
+    registration_approver_interval: float = 60.0
+    max_roster_size: int = 5000
+    group_code_refill_size: int = 10000
+    question_payload_cache_size: int = 256
+    orjson_responses: bool = False
     env: str = "dev"
     api_version: str = "v1" 
     
@@ -1,17 +1,17 @@
-from pathlib import Path
-
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
 from app.database.database import lifespan
 from app.middleware.maintenance import MaintenanceMiddleware
+from app.utils.serialization import DEFAULT_RESPONSE_CLASS
+from app.utils.uploads import UPLOADS_DIR, BLOBS_DIR
+from app.routes import uploads
 
 from config import settings
 
-UPLOADS_DIR = Path(__file__).resolve().parent / "static" / "uploads"
 UPLOADS_DIR.mkdir(parents=True, exist_ok=True)
 (UPLOADS_DIR / "questions").mkdir(parents=True, exist_ok=True)
 (UPLOADS_DIR / "avatars").mkdir(parents=True, exist_ok=True)
+BLOBS_DIR.mkdir(parents=True, exist_ok=True)
 
 if settings.api_version == "v2":
     from app.routes.v2 import auth, admin, groups, quizzes, attempts, contact, blog
@@ -23,6 +23,7 @@ app = FastAPI(
     title=str(settings.title),
     version=str(settings.version),
     lifespan=lifespan,
+    default_response_class=DEFAULT_RESPONSE_CLASS,
     docs_url="/docs" if settings.env == "dev" else None,
     redoc_url="/redoc" if settings.env == "dev" else None,
     openapi_url="/openapi.json" if settings.env == "dev" else None
@@ -44,8 +45,7 @@ app.include_router(quizzes.router)
 app.include_router(attempts.router)
 app.include_router(contact.router)
 app.include_router(blog.router)
-
-app.mount("/uploads", StaticFiles(directory=str(UPLOADS_DIR)), name="uploads")
+app.include_router(uploads.router)
 
 
 @app.get("/")
@@ -51,6 +51,7 @@ class UserResponse(BaseModel):
     role: str
     is_active: bool
     avatar_url: Optional[str] = None
+    avatar_thumb_url: Optional[str] = None
     registration_ip: Optional[str] = None
     created_at: datetime
 
@@ -120,6 +121,31 @@ class ReviewRegistrationRequest(BaseModel):
     role: Optional[UserRole] = UserRole.STUDENT
 
 
+class SkippedRegistrationRequest(BaseModel):
+    request_id: int
+    username: str
+    reason: str
+
+
+class BulkApprovalResponse(BaseModel):
+    message: str
+    approved: int
+    skipped: List[SkippedRegistrationRequest] = []
+
+
+class ApprovalRunResponse(BaseModel):
+    id: int
+    role: str
+    status: str
+    total: int
+    processed: int
+    approved: int
+    skipped: int
+    error: Optional[str] = None
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+
+
 class AdminSettingsResponse(BaseModel):
     auto_registration_enabled: bool
     registration_enabled: bool = True
@@ -183,6 +209,26 @@ class GroupUpdate(BaseModel):
     color: Optional[str] = Field(None, pattern=r'^#[0-9A-Fa-f]{6}$')
 
 
+class BulkEnrollRequest(BaseModel):
+    user_ids: List[int] = []
+    usernames: List[str] = []
+    emails: List[str] = []
+
+
+class RosterRowResult(BaseModel):
+    row: int
+    value: str
+    status: str
+    user_id: Optional[int] = None
+
+
+class BulkEnrollResponse(BaseModel):
+    enrolled: int
+    already_member: int
+    skipped: int
+    results: List[RosterRowResult]
+
+
 class GroupResponse(BaseModel):
     id: int
     name: str
@@ -308,6 +354,7 @@ class QuestionResponse(BaseModel):
     points: float
     correct_text_answer: Optional[str] = None
     image_url: Optional[str] = None
+    image_display_url: Optional[str] = None
     options: List[OptionResponse]
     is_multiple_choice: bool = False 
 
@@ -381,6 +428,48 @@ class StudentAttemptStatus(BaseModel):
     avg_time_per_answer: Optional[float] = None 
 
 
+class QuestionStatistics(BaseModel):
+    question_id: int
+    answered_count: int = 0
+    correct_count: int = 0
+    correct_rate: Optional[float] = None
+
+
+class QuizStatisticsResponse(BaseModel):
+    quiz_id: int
+    attempt_count: int = 0
+    mean_percentage: Optional[float] = None
+    median_percentage: Optional[float] = None
+    std_percentage: Optional[float] = None
+    histogram: List[int] = []
+    avg_time_spent: Optional[float] = None
+    questions: List[QuestionStatistics] = []
+    updated_at: Optional[datetime] = None
+
+
+class OptionFrequency(BaseModel):
+    option_id: int
+    is_correct: bool = False
+    count: int = 0
+    proportion: Optional[float] = None
+    upper_proportion: Optional[float] = None
+    lower_proportion: Optional[float] = None
+
+
+class ItemStatistics(BaseModel):
+    question_id: int
+    difficulty: Optional[float] = None
+    discrimination: Optional[float] = None
+    options: List[OptionFrequency] = []
+
+
+class ItemAnalysisResponse(BaseModel):
+    attempt_count: int = 0
+    question_count: int = 0
+    cronbach_alpha: Optional[float] = None
+    questions: List[ItemStatistics] = []
+
+
 class AntiCheatingEventCreate(BaseModel):
     event_type: str = "tab_switch"
     details: Optional[dict] = None
@@ -410,6 +499,8 @@ class AntiCheatingLogResponse(BaseModel):
 class ReissueQuizRequest(BaseModel):
     student_ids: List[int]
     new_available_until: Optional[datetime] = None
+    # keep the old attempts in the *_archive tables instead of deleting them
+    archive: bool = False
     
     @field_validator("new_available_until", mode="after")
     @classmethod
@@ -417,6 +508,19 @@ class ReissueQuizRequest(BaseModel):
         return _naive_utc(v)
 
 
+class CloneQuizRequest(BaseModel):
+    group_id: int
+    # defaults to the source quiz's title
+    title: Optional[str] = Field(None, min_length=1, max_length=255)
+    available_until: Optional[datetime] = None
+    manual_close: bool = False
+
+    @field_validator("available_until", mode="after")
+    @classmethod
+    def available_until_naive_utc(cls, v: Optional[datetime]) -> Optional[datetime]:
+        return _naive_utc(v)
+
+
 class ContactMessageCreate(BaseModel):
     message: str = Field(..., min_length=1, max_length=5000)
 
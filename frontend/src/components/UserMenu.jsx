@@ -40,7 +40,7 @@ export default function UserMenu() {
   }, [open]);
 
   const userRole = user?.role;
-  const avatarUrl = user?.avatar_url ? `${API_BASE}${user.avatar_url}` : null;
+  const avatarUrl = user?.avatar_url ? `${API_BASE}${user.avatar_thumb_url || user.avatar_url}` : null;
 
   const handleDashboard = () => {
     setOpen(false);
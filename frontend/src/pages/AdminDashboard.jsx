@@ -1119,7 +1119,7 @@ export default function AdminDashboard() {
                             >
                               {user.avatar_url ? (
                                 <img
-                                  src={`${API_BASE}${user.avatar_url}`}
+                                  src={`${API_BASE}${user.avatar_thumb_url || user.avatar_url}`}
                                   alt=""
                                   className="h-full w-full object-cover"
                                 />
@@ -151,7 +151,7 @@ export default function Profile() {
     else navigate("/dashboard/student");
   };
 
-  const avatarUrl = user?.avatar_url ? `${API_BASE}${user.avatar_url}` : null;
+  const avatarUrl = user?.avatar_url ? `${API_BASE}${user.avatar_thumb_url || user.avatar_url}` : null;
 
   const handleAvatarChange = async (e) => {
     const file = e.target.files?.[0];
@@ -260,7 +260,7 @@ export default function StudentGroupPage() {
         questionsOrder = started.questions_order;
       }
 
-      const qs = await quizzesApi.getQuestions(quiz.id);
+      const qs = await quizzesApi.getQuestions(quiz.id, attemptId);
       const questions = Array.isArray(qs) ? qs : [];
       const answered = cur.has_attempt ? cur.answered_questions || [] : [];
 
@@ -710,7 +710,7 @@ export default function StudentGroupPage() {
                         {a.question_image_url && (
                           <div className="mt-2">
                             <img
-                              src={`${import.meta.env.VITE_API_URL || ""}${a.question_image_url}`}
+                              src={`${import.meta.env.VITE_API_URL || ""}${a.question_image_display_url || a.question_image_url}`}
                               alt=""
                               className="max-h-48 w-auto rounded-lg border border-[var(--border)] object-contain bg-[var(--bg-card)]"
                             />
@@ -813,7 +813,7 @@ export default function StudentGroupPage() {
                             {q.image_url && (
                               <div className="mt-3">
                                 <img
-                                  src={`${import.meta.env.VITE_API_URL || ""}${q.image_url}`}
+                                  src={`${import.meta.env.VITE_API_URL || ""}${q.image_display_url || q.image_url}`}
                                   alt=""
                                   className="max-h-64 w-auto rounded-lg border border-[var(--border)] object-contain bg-[var(--bg-card)]"
                                 />
@@ -1201,7 +1201,7 @@ export default function StudentGroupPage() {
                               {ans.question_image_url && (
                                 <div className="mt-2">
                                   <img
-                                    src={`${import.meta.env.VITE_API_URL || ""}${ans.question_image_url}`}
+                                    src={`${import.meta.env.VITE_API_URL || ""}${ans.question_image_display_url || ans.question_image_url}`}
                                     alt=""
                                     className="max-h-48 w-auto rounded-lg border border-[var(--border)] object-contain bg-[var(--bg-card)]"
                                   />
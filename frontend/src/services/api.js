@@ -381,8 +381,9 @@ export const quizzesApi = {
   async deleteQuiz(id) {
     return request(`/quizzes/${id}`, { method: "DELETE" });
   },
-  async getQuestions(quizId) {
-    return request(`/quizzes/${quizId}/questions`);
+  async getQuestions(quizId, attemptId) {
+    const query = attemptId ? `?attempt_id=${attemptId}` : "";
+    return request(`/quizzes/${quizId}/questions${query}`);
   },
   async createQuestion(quizId, data) {
     return request(`/quizzes/${quizId}/questions`, {